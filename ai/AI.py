@@ -1,56 +1,206 @@
 import requests
 import json
+import codecs
 import os
-import pandas as pd
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-SECRET_PATH = os.path.join(BASE_DIR, '../backend/secret_ibm.json')
-
-try:
-    with open(SECRET_PATH, 'r', encoding='utf-8') as f:
-        secrets = json.load(f)
-except FileNotFoundError:
-    print(f"Error: {SECRET_PATH} not found.")
-    secrets = {}
-
-API_KEY = secrets.get("API_KEY", "")
-SERVICE_URL = secrets.get("SERVICE_URL", "")
-classifier_AGENT_ID = secrets.get("classifier_AGENT_ID", "")
-Privacy_AGENT_ID = secrets.get("Privacy_AGENT_ID", "")
-CHECKLIST_TITLES = secrets.get("CHECKLIST_TITLES", [])
-
-def classifier(input_data):
-
-    # IAM 토큰 발급
-    token = requests.post(
-        "https://iam.cloud.ibm.com/identity/token",
-        headers={
-            "Content-Type": "application/x-www-form-urlencoded",
-            "Accept": "application/json"
-        },
-        data={
-            "grant_type": "urn:ibm:params:oauth:grant-type:apikey",
-            "apikey": API_KEY.strip()
-        },
-    ).json()["access_token"]
-
-    # Watson Orchestrate 호출
-    res = requests.post(
-        f"{SERVICE_URL.rstrip('/')}/v1/orchestrate/{classifier_AGENT_ID}/chat/completions",
-        headers={
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        },
-        json={
-            "messages": [
-                {"role": "user", "content": json.dumps(input_data, ensure_ascii=False)}
-            ],
-            "stream": False
-        },
-    ).json()
-
-    content = res["choices"][0]["message"]["content"]
+# 벤치마크/로컬 실행 시 MAI1_IBM_SECRET_PATH로 다른 설정 파일(가짜 IAM/Orchestrate 주소 등)을 지정할 수 있습니다.
+SECRET_PATH = os.environ.get("MAI1_IBM_SECRET_PATH") or os.path.join(BASE_DIR, '../backend/secret_ibm.json')
+
+_secrets = None
+_secrets_lock = threading.Lock()
+
+
+def load_secrets():
+    """secret_ibm.json은 import 시점이 아니라 첫 AI 호출 때 한 번만 읽습니다."""
+    global _secrets
+    if _secrets is None:
+        with _secrets_lock:
+            if _secrets is None:
+                try:
+                    with open(SECRET_PATH, 'r', encoding='utf-8') as f:
+                        _secrets = json.load(f)
+                except FileNotFoundError:
+                    print(f"Error: {SECRET_PATH} not found.")
+                    _secrets = {}
+    return _secrets
+
+
+def get_checklist_titles():
+    return load_secrets().get("CHECKLIST_TITLES", [])
+
+
+IAM_TOKEN_URL = "https://iam.cloud.ibm.com/identity/token"
+
+# (connect, read) 타임아웃(초). LLM 응답은 오래 걸릴 수 있어 read만 넉넉하게 둡니다.
+IAM_TIMEOUT = (5, 30)
+ORCHESTRATE_TIMEOUT = (5, 120)
+
+# 토큰 만료 직전 요청이 실패하지 않도록 expires_in보다 이만큼 일찍 갱신합니다.
+TOKEN_REFRESH_MARGIN = 60
+
+# 외부 호출 실행 훅: runner(target, operation, fn)가 fn()을 실행해 결과를 반환합니다.
+# 백엔드가 load_ai() 때 재시도/서킷 브레이커/메트릭을 적용하는 함수를 등록하며, 등록 전에는 fn()을 그대로 호출합니다.
+_call_runner = None
+
+
+def set_call_runner(runner):
+    global _call_runner
+    _call_runner = runner
+
+
+def _run_call(target, operation, fn, attempt_timeout=None):
+    """attempt_timeout: 시도 하나의 최대 시간 (runner가 남은 제한 시간 안에 다시 시도할 수 있는지 판단)"""
+    if _call_runner is None:
+        return fn()
+    return _call_runner(target, operation, fn, attempt_timeout=attempt_timeout)
+
+
+class OrchestrateClient:
+    """
+    Watson Orchestrate 호출용 공용 클라이언트.
+    - IAM 토큰을 만료 직전까지 캐시하고, 갱신은 lock으로 한 스레드만 수행
+    - IAM / Orchestrate 호스트에 keep-alive 커넥션 풀 유지
+    - 모든 요청에 connect/read 타임아웃 적용
+    """
+
+    def __init__(self, api_key, service_url, pool_size=10, iam_url=IAM_TOKEN_URL):
+        self.api_key = api_key
+        self.service_url = service_url.rstrip('/')
+        self.iam_url = iam_url
+
+        self._token = None
+        self._token_expires_at = 0.0
+        self._token_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get_token(self, force_refresh=False):
+        if not force_refresh and self._token and time.time() < self._token_expires_at:
+            return self._token
+
+        with self._token_lock:
+            # lock을 기다리는 동안 다른 스레드가 이미 갱신했을 수 있습니다.
+            if not force_refresh and self._token and time.time() < self._token_expires_at:
+                return self._token
+
+            body = _run_call("iam", "token", self._request_token, attempt_timeout=sum(IAM_TIMEOUT))
+
+            self._token = body["access_token"]
+            expires_in = float(body.get("expires_in", 3600))
+            self._token_expires_at = time.time() + max(expires_in - TOKEN_REFRESH_MARGIN, 0)
+            return self._token
+
+    def _request_token(self):
+        res = self.session.post(
+            self.iam_url,
+            headers={
+                "Content-Type": "application/x-www-form-urlencoded",
+                "Accept": "application/json"
+            },
+            data={
+                "grant_type": "urn:ibm:params:oauth:grant-type:apikey",
+                "apikey": self.api_key.strip()
+            },
+            timeout=IAM_TIMEOUT,
+        )
+        res.raise_for_status()
+        return res.json()
+
+    def chat_completion(self, agent_id, messages, stream=False, on_delta=None):
+        """
+        에이전트 응답 content를 반환합니다.
+        stream=True면 SSE(data: {...} 줄)로 받은 delta를 이어 붙이며, on_delta(text)가 있으면 조각마다 호출합니다.
+        """
+        url = f"{self.service_url}/v1/orchestrate/{agent_id}/chat/completions"
+        payload = {"messages": messages, "stream": stream}
+
+        def _attempt():
+            res = self._post_completion(url, payload, self.get_token(), stream)
+            if res.status_code == 401:
+                # 서버 측에서 토큰이 먼저 만료된 경우 한 번만 재발급 후 재시도
+                res.close()
+                res = self._post_completion(url, payload, self.get_token(force_refresh=True), stream)
+            with res:
+                res.raise_for_status()
+                if stream:
+                    return _read_stream_content(res, on_delta)
+                return res.json()["choices"][0]["message"]["content"]
+
+        # 429/5xx 재시도와 서킷 브레이커는 등록된 runner(백엔드 resilience.call)가 처리합니다.
+        return _run_call("orchestrate", "completion", _attempt, attempt_timeout=sum(ORCHESTRATE_TIMEOUT))
+
+    def _post_completion(self, url, payload, token, stream=False):
+        return self.session.post(
+            url,
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json",
+                "Accept": "text/event-stream" if stream else "application/json"
+            },
+            json=payload,
+            timeout=ORCHESTRATE_TIMEOUT,
+            stream=stream,
+        )
+
+
+def _read_stream_content(res, on_delta=None):
+    """chat/completions SSE 응답의 delta.content를 이어 붙입니다. ('data: [DONE]'에서 종료)"""
+    # text/event-stream에 charset이 없으면 requests가 ISO-8859-1로 디코딩하므로 UTF-8로 고정합니다.
+    res.encoding = "utf-8"
+    parts = []
+    for line in res.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            break
+
+        choice = (json.loads(data).get("choices") or [{}])[0]
+        text = (choice.get("delta") or choice.get("message") or {}).get("content")
+        if text:
+            parts.append(text)
+            if on_delta:
+                on_delta(text)
+    return "".join(parts)
+
+
+_orchestrate_client = None
+_client_lock = threading.Lock()
+
+
+def get_orchestrate_client():
+    """프로세스 전체에서 공유하는 OrchestrateClient (첫 호출 때 생성)"""
+    global _orchestrate_client
+    if _orchestrate_client is None:
+        secrets = load_secrets()
+        with _client_lock:
+            if _orchestrate_client is None:
+                _orchestrate_client = OrchestrateClient(
+                    secrets.get("API_KEY", ""),
+                    secrets.get("SERVICE_URL", ""),
+                    iam_url=secrets.get("IAM_TOKEN_URL", IAM_TOKEN_URL)
+                )
+    return _orchestrate_client
+
+
+def classifier(input_data, stream=False):
+
+    # Watson Orchestrate 호출 (IAM 토큰은 공용 OrchestrateClient가 캐시)
+    # stream=True면 응답을 SSE로 받아 조각을 이어 붙입니다. (결과 JSON은 다 받은 뒤에 파싱)
+    content = get_orchestrate_client().chat_completion(
+        load_secrets().get("classifier_AGENT_ID", ""),
+        [{"role": "user", "content": json.dumps(input_data, ensure_ascii=False)}],
+        stream=stream
+    )
     return content
 
 
@@ -69,41 +219,77 @@ def call_classifier(input_data):
     return domains
 
 
-def analyze_privacy(path,name):
-
-    # 3️⃣ IAM 토큰 발급
-    token = requests.post(
-        "https://iam.cloud.ibm.com/identity/token",
-        headers={
-            "Content-Type": "application/x-www-form-urlencoded",
-            "Accept": "application/json"
-        },
-        data={
-            "grant_type": "urn:ibm:params:oauth:grant-type:apikey",
-            "apikey": API_KEY.strip()
-        },
-    ).json()["access_token"]
-
-    # 4️⃣ 텍스트 파일 읽기
-    with open(path, "r", encoding="utf-8") as f:
-        privacy_text = f.read()
-
-    # 5️⃣ Watson Orchestrate 호출
-    res = requests.post(
-        f"{SERVICE_URL.rstrip('/')}/v1/orchestrate/{Privacy_AGENT_ID}/chat/completions",
-        headers={
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        },
-        json={
-            "messages": [{"role": "user", "content": privacy_text}],
-            "stream": False
-        },
-    ).json()
-
-    # 6️⃣ LLM 응답 content
-    content = res["choices"][0]["message"]["content"]
+# 이 길이(문자 수)를 넘는 약관은 섹션으로 나눠 병렬로 평가한 뒤 항목별로 합칩니다. (map-reduce)
+LONG_POLICY_CHARS = 12000
+SECTION_MAX_CHARS = 8000
+SECTION_CONCURRENCY = 4
+
+# '제1조', '1.', '1.2)', '## 제목', '[수집 항목]', 'I.' 같은 약관 제목 줄
+_HEADING_PATTERN = re.compile(
+    r"^\s*(제\s*\d+\s*조|\d+(\.\d+)*[.)]\s|#{1,6}\s|\[[^\]]+\]\s*$|[IVX]+\.\s|[①-⑳])"
+)
+
+# 섹션별 결과를 합칠 때의 우선순위: 한 섹션이라도 PASS면 PASS, 아니면 N/A, 모든 섹션이 FAIL이면 FAIL
+# (섹션은 자기가 다루지 않는 항목도 FAIL로 답하므로, 그 항목을 실제로 다룬 섹션의 N/A가 FAIL보다 앞서야 합니다)
+_RESULT_PRIORITY = {"PASS": 2, "N/A": 1, "FAIL": 0}
+
+
+def split_policy_sections(privacy_text, max_chars=SECTION_MAX_CHARS):
+    """
+    약관을 제목 줄 기준으로 나누고, max_chars를 넘는 섹션은 문단(빈 줄) 기준으로 다시 자릅니다.
+    짧은 섹션은 max_chars 안에서 앞 섹션과 합쳐 LLM 호출 수를 줄입니다.
+    반환: [{"index": 1, "title": "제1조 ...", "text": "..."}, ...]
+    """
+    raw_sections = []
+    current = []
+    for line in privacy_text.splitlines():
+        if _HEADING_PATTERN.match(line) and current:
+            raw_sections.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        raw_sections.append("\n".join(current))
+
+    pieces = []
+    for section in raw_sections:
+        if len(section) <= max_chars:
+            pieces.append(section)
+            continue
+
+        buffer = ""
+        for paragraph in section.split("\n\n"):
+            while len(paragraph) > max_chars:
+                if buffer:
+                    pieces.append(buffer)
+                    buffer = ""
+                pieces.append(paragraph[:max_chars])
+                paragraph = paragraph[max_chars:]
+            if buffer and len(buffer) + len(paragraph) + 2 > max_chars:
+                pieces.append(buffer)
+                buffer = ""
+            buffer = f"{buffer}\n\n{paragraph}" if buffer else paragraph
+        if buffer:
+            pieces.append(buffer)
+
+    sections = []
+    for piece in pieces:
+        if not piece.strip():
+            continue
+        if sections and len(sections[-1]["text"]) + len(piece) + 1 <= max_chars:
+            sections[-1]["text"] += "\n" + piece
+            continue
+        title = next((line.strip() for line in piece.splitlines() if line.strip()), "")
+        sections.append({"index": len(sections) + 1, "title": title[:100], "text": piece})
+
+    return sections
+
+
+def _evaluate_privacy_text(privacy_text):
+    # 5️⃣ Watson Orchestrate 호출 (IAM 토큰은 공용 OrchestrateClient가 캐시)
+    content = get_orchestrate_client().chat_completion(
+        load_secrets().get("Privacy_AGENT_ID", ""),
+        [{"role": "user", "content": privacy_text}]
+    )
 
     # 8️⃣ JSON 파싱
     try:
@@ -119,10 +305,114 @@ def analyze_privacy(path,name):
         }
 
 
+def _merge_section_results(section_results):
+    """
+    섹션별 체크리스트 결과를 항목 단위로 합칩니다. (reduce)
+    항목 순서는 CHECKLIST_TITLES와 맞추기 위해 처음 응답한 섹션의 순서를 따릅니다.
+    각 항목에는 결과를 결정한 섹션 번호/제목을 section, section_title로 남깁니다.
+    """
+    merged = {}
+    for section, data in section_results:
+        for key, value in data.items():
+            current = merged.get(key)
+            priority = _RESULT_PRIORITY.get(value.get("result"), -1)
+            if current is None or priority > _RESULT_PRIORITY.get(current.get("result"), -1):
+                merged[key] = dict(value, section=section["index"], section_title=section["title"])
+    return merged
+
+
+# 업로드 스트림에서 약관을 읽을 때의 기본 최대 크기와 한 번에 읽는 크기
+POLICY_MAX_BYTES = 2 * 1024 * 1024
+POLICY_READ_CHUNK = 64 * 1024
+
+
+class PolicyTooLargeError(ValueError):
+    pass
+
+
+def read_policy_stream(stream, max_bytes=POLICY_MAX_BYTES, encoding="utf-8"):
+    """
+    파일 객체(업로드 스트림)에서 약관 텍스트를 조금씩 읽어 디코딩합니다.
+    max_bytes를 넘으면 끝까지 읽지 않고 PolicyTooLargeError를, 인코딩이 맞지 않으면 UnicodeDecodeError를 냅니다.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    parts = []
+    total = 0
+    while True:
+        chunk = stream.read(POLICY_READ_CHUNK)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > max_bytes:
+            raise PolicyTooLargeError(f"약관 크기가 최대 {max_bytes}바이트를 초과합니다.")
+        parts.append(decoder.decode(chunk))
+    parts.append(decoder.decode(b"", final=True))
+
+    return "".join(parts).lstrip("\ufeff")
+
+
+def analyze_privacy(path,name):
+
+    # 4️⃣ 텍스트 파일 읽기
+    with open(path, "r", encoding="utf-8") as f:
+        privacy_text = f.read()
+
+    return analyze_privacy_text(privacy_text, name)
+
+
+def analyze_privacy_text(privacy_text, name):
+
+    if len(privacy_text) <= LONG_POLICY_CHARS:
+        return _evaluate_privacy_text(privacy_text)
+
+    # 긴 약관: 섹션별로 동시에 평가(map)한 뒤 항목별로 합침(reduce)
+    sections = split_policy_sections(privacy_text)
+    print(f"📑 {name}: {len(privacy_text)}자 약관을 {len(sections)}개 섹션으로 나눠 평가합니다.")
+
+    with ThreadPoolExecutor(max_workers=max(1, min(SECTION_CONCURRENCY, len(sections)))) as pool:
+        results = list(pool.map(lambda section: _evaluate_privacy_text(section["text"]), sections))
+
+        # JSON 파싱에 실패한 섹션은 한 번 더 평가합니다.
+        failed = [i for i, result in enumerate(results) if result["status"] != "success"]
+        if failed:
+            print(f"⚠️ {name}: {len(failed)}개 섹션 응답을 해석하지 못해 다시 평가합니다.")
+            for i, result in zip(failed, pool.map(lambda i: _evaluate_privacy_text(sections[i]["text"]), failed)):
+                results[i] = result
+
+    # 한 섹션이라도 빠지면 그 섹션이 다루는 항목이 FAIL로 합쳐지므로 평가 전체를 실패로 처리합니다.
+    failed = [i for i, result in enumerate(results) if result["status"] != "success"]
+    if failed:
+        return {
+            "status": "error",
+            "raw": "\n".join(results[i].get("raw", "") for i in failed)
+        }
+
+    return {
+        "status": "success",
+        "data": _merge_section_results(list(zip(sections, (result["data"] for result in results))))
+    }
+
+
 
 def call_privacy_evaluate(path, name):
     result = analyze_privacy(path,name)
+    return _score_privacy_result(result, name)
 
+
+def call_privacy_evaluate_text(privacy_text, name):
+    """파일을 거치지 않고 약관 텍스트로 바로 평가합니다."""
+    result = analyze_privacy_text(privacy_text, name)
+    return _score_privacy_result(result, name)
+
+
+def call_privacy_evaluate_stream(stream, name, max_bytes=POLICY_MAX_BYTES):
+    """업로드 스트림을 max_bytes까지 읽어 평가합니다."""
+    return call_privacy_evaluate_text(read_policy_stream(stream, max_bytes), name)
+
+
+def _score_privacy_result(result, name):
+    if result.get("status") == "error":
+        raise ValueError(f"AI 응답을 JSON으로 해석하지 못했습니다: {result.get('raw', '')[:200]}")
     if "data" in result:
         data = result["data"]
     else:
@@ -136,9 +426,14 @@ def call_privacy_evaluate(path, name):
             "reason": value['reason']
         })
 
+    # pandas는 import가 무거워 점수 계산 때만 불러옵니다.
+    import pandas as pd
+
+    checklist_titles = get_checklist_titles()
+
     df = pd.DataFrame(rows).set_index("항목")
 
-    df['항목 이름'] = CHECKLIST_TITLES
+    df['항목 이름'] = checklist_titles
 
     df['P/F'] = df['P/F'].replace({"PASS": 1, "FAIL": 0, "N/A": 0.5}).astype(float)
 
@@ -153,8 +448,21 @@ def call_privacy_evaluate(path, name):
 
     final_statement = " ".join(filter(None, [fail_statement, na_statement]))
 
+    # 항목별 판정 근거 (긴 약관은 근거를 찾은 섹션 번호/제목 포함)
+    evidence = [
+        {
+            "item": title,
+            "result": value["result"],
+            "evidence": value.get("evidence"),
+            "section": value.get("section"),
+            "section_title": value.get("section_title")
+        }
+        for title, value in zip(checklist_titles, data.values())
+    ]
+
     return {
         "name": name,
         "score": df['P/F'].mean(),
-        "missing": final_statement
+        "missing": final_statement,
+        "evidence": evidence
     }
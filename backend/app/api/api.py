@@ -1,8 +1,9 @@
 from fastapi import APIRouter
-from app.api.endpoints import emails, users, admin, ai
+from app.api.endpoints import emails, users, admin, ai, jobs
 
 api_router = APIRouter()
 api_router.include_router(emails.router, prefix="/emails", tags=["emails"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
-api_router.include_router(ai.router, prefix="/ai", tags=["ai"])
\ No newline at end of file
+api_router.include_router(ai.router, prefix="/ai", tags=["ai"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
\ No newline at end of file
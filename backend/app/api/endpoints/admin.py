@@ -1,32 +1,37 @@
-import os
-import shutil
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from fastapi import APIRouter, Depends, HTTPException, Query, File, UploadFile, Form
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, SessionLocal
+from app.core.pagination import encode_cursor, decode_cursor, count_cache
+from app.core.resilience import ExternalServiceUnavailable, retry_after_header, breaker_states
 from app.models.service import Service
 from app.models.user import User
+from app.models.risk_summary import UserRiskSummary
 from app.schemas.common import CommonResponse
 from app.schemas.admin import (
     AdminServiceListResponse, 
     AdminServiceResponse, 
     ServiceUpdate, 
     ServiceEvaluationResponse,
+    BulkEvaluationRequest,
     AdminUserListResponse,
     AdminUserResponse,
     UserCreate,
-    UserUpdate
+    UserUpdate,
+    CircuitBreakerState
 )
 from app.services.ai_service import ai_service
+from app.services.domain_index import domain_index
+from app.services.risk_summary_service import risk_summary_service
 
 router = APIRouter()
 
-# 임시 파일 저장 경로
-TEMP_DIR = "temp_files"
-os.makedirs(TEMP_DIR, exist_ok=True)
-
 @router.get("/services", response_model=CommonResponse[AdminServiceListResponse])
 def get_admin_services(
     status: str = Query("ALL", description="평가 상태: ALL, PENDING(미평가), COMPLETED(평가됨)"),
@@ -64,11 +69,12 @@ def update_service_risk(
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
 
-    service.risk_level = update_data.risk_level
+    risk_summary_service.apply_grade(db, service, update_data.risk_level)
     service.evaluated_at = datetime.now()
     
     db.commit()
     db.refresh(service)
+    domain_index.invalidate()
 
     return {
         "status": "success",
@@ -76,12 +82,14 @@ def update_service_risk(
         "data": service
     }
 
+# 업로드 스트림을 읽고 LLM 응답을 기다리는 동안 이벤트 루프를 막지 않도록 동기 함수(스레드풀 실행)로 둡니다.
 @router.post("/services/{service_id}/evaluate", response_model=CommonResponse[ServiceEvaluationResponse])
-async def evaluate_service(
+def evaluate_service(
     service_id: int,
     type: str = Form(..., description="TEXT or FILE"),
     content: Optional[str] = Form(None),
     file: Optional[UploadFile] = File(None),
+    force: bool = Form(False, description="True면 같은 약관의 이전 평가 결과를 무시하고 다시 평가"),
     db: Session = Depends(get_db)
 ):
     # print(f"DEBUG: service_id={service_id}, type={type}, file={file}, content={content}")
@@ -90,10 +98,6 @@ async def evaluate_service(
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
 
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    temp_filename = f"{service.service_name}_{timestamp}.txt"
-    temp_file_path = os.path.join(TEMP_DIR, temp_filename)
-
     input_type = type.upper()
     is_valid_input = False
 
@@ -107,24 +111,23 @@ async def evaluate_service(
         print(f"{error_msg}")
         raise HTTPException(status_code=400, detail=error_msg)
 
+    # 업로드 파일은 Starlette가 멀티파트 본문 전체를 먼저 받아 SpooledTemporaryFile에 담습니다. (1MB가 넘으면 디스크 임시 파일)
+    # 여기서는 그 파일을 한 번에 read()하지 않고 조금씩 디코딩하며, POLICY_MAX_BYTES를 넘으면 중간에 멈춰 메모리 사용만 제한합니다.
+    # 수신 크기 자체를 막으려면 앞단 프록시의 요청 본문 크기 제한(client_max_body_size 등)을 사용합니다.
     try:
         if input_type == "FILE":
-            with open(temp_file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-        
-        elif input_type == "TEXT":
-            with open(temp_file_path, "w", encoding="utf-8") as buffer:
-                buffer.write(content)
-
-        print(f"Calling AI Evaluation for file: {temp_file_path}")
-        eval_result = ai_service.evaluate_service_security(temp_file_path, service.service_name)
-        
-        service.risk_level = eval_result["grade"]
-        service.security_score = eval_result["score"]
-        service.security_report = eval_result["report"]
-        service.evaluated_at = datetime.now()
-        
-        db.commit()
+            policy_text = ai_service.read_policy_upload(file.file)
+        else:
+            if len(content.encode("utf-8")) > settings.POLICY_MAX_BYTES:
+                raise ValueError(f"약관 크기가 최대 {settings.POLICY_MAX_BYTES}바이트를 초과합니다.")
+            policy_text = content
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="UTF-8 텍스트 파일만 평가할 수 있습니다.")
+    except ValueError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    try:
+        eval_result = ai_service.evaluate_and_apply(db, service, policy_text, force)
 
         return {
             "status": "success",
@@ -135,39 +138,159 @@ async def evaluate_service(
                 "new_risk_level": service.risk_level,
                 "security_score": service.security_score,
                 "security_report": service.security_report,
-                "evaluated_at": service.evaluated_at
+                "evaluated_at": service.evaluated_at,
+                "cached": eval_result["cached"],
+                "evidence": eval_result.get("evidence")
             }
         }
 
+    except ExternalServiceUnavailable as e:
+        raise HTTPException(status_code=503, detail=f"평가 서비스를 사용할 수 없습니다: {e}", headers=retry_after_header(e))
     except Exception as e:
         print(f"Evaluation Error: {e}")
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"평가 실패: {str(e)}")
-    
+
+def _evaluate_in_own_session(service_id: int, content: Optional[str], force: bool):
+    """일괄 평가 작업 하나. 스레드마다 별도 세션을 쓰고, 끝나는 즉시 커밋합니다."""
+    db = SessionLocal()
+    try:
+        service = db.query(Service).filter(Service.service_id == service_id).first()
+        if not service:
+            return {"service_id": service_id, "status": "error", "message": "Service not found"}
+
+        if content and len(content.encode("utf-8")) > settings.POLICY_MAX_BYTES:
+            return {
+                "service_id": service_id,
+                "service_name": service.service_name,
+                "status": "error",
+                "message": f"약관 크기가 최대 {settings.POLICY_MAX_BYTES}바이트를 초과합니다."
+            }
+
+        policy_text = content if content else ai_service.load_stored_policy(service)
+        if not policy_text:
+            return {
+                "service_id": service_id,
+                "service_name": service.service_name,
+                "status": "error",
+                "message": "평가할 약관이 없습니다. (요청 본문과 로컬 약관 저장소 모두 없음)"
+            }
+
+        # AI 평가 실패(Unrated)는 등급에 반영하지 않아 PENDING 목록에 남겨 두고 실패로 보고합니다.
+        eval_result = ai_service.evaluate_and_apply(db, service, policy_text, force, keep_grade_on_failure=True)
+        if eval_result["grade"] == "Unrated":
+            return {
+                "service_id": service_id,
+                "service_name": service.service_name,
+                "status": "error",
+                "message": eval_result["report"]
+            }
+        return {
+            "service_id": service_id,
+            "service_name": service.service_name,
+            "status": "success",
+            "risk_level": service.risk_level,
+            "security_score": service.security_score,
+            "cached": eval_result["cached"]
+        }
+    except Exception as e:
+        db.rollback()
+        print(f"Bulk Evaluation Error (service_id={service_id}): {e}")
+        return {"service_id": service_id, "status": "error", "message": str(e)}
     finally:
-        if os.path.exists(temp_file_path):
-            try:
-                os.remove(temp_file_path)
-                print(f"🗑️ Removed temp file: {temp_file_path}")
-            except Exception as e:
-                print(f"⚠️ Failed to remove temp file: {e}")
+        db.close()
+
+def _stream_bulk_evaluation(items: list, force: bool, concurrency: int):
+    """평가가 끝나는 순서대로 서비스별 결과를 NDJSON 한 줄씩 내보냅니다."""
+    yield json.dumps({"event": "start", "total": len(items), "concurrency": concurrency}, ensure_ascii=False) + "\n"
+
+    succeeded = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(_evaluate_in_own_session, service_id, content, force) for service_id, content in items]
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            if result["status"] == "success":
+                succeeded += 1
+            yield json.dumps(dict(result, event="progress", done=done, total=len(items)), ensure_ascii=False, default=str) + "\n"
+
+    yield json.dumps({
+        "event": "done",
+        "total": len(items),
+        "succeeded": succeeded,
+        "failed": len(items) - succeeded
+    }, ensure_ascii=False) + "\n"
+
+@router.post("/services/evaluate-bulk")
+def evaluate_services_bulk(
+    request: BulkEvaluationRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    여러 서비스를 동시에(최대 concurrency개) 평가하고 진행 상황을 NDJSON 스트림으로 반환합니다.
+    all_pending=True면 미평가(PENDING) 서비스를 모두 포함하며, 약관은 로컬 약관 저장소에서 읽습니다.
+    """
+    items = [(item.service_id, item.content) for item in request.items]
+
+    if request.all_pending:
+        requested_ids = {service_id for service_id, _ in items}
+        pending = db.query(Service.service_id) \
+            .filter(Service.risk_level == None) \
+            .order_by(Service.service_id.asc()) \
+            .all()
+        items += [(service_id, None) for (service_id,) in pending if service_id not in requested_ids]
+
+    if not items:
+        raise HTTPException(status_code=400, detail="평가할 서비스가 없습니다.")
+
+    concurrency = max(1, min(request.concurrency or settings.BULK_EVALUATION_CONCURRENCY, len(items)))
+
+    return StreamingResponse(
+        _stream_bulk_evaluation(items, request.force, concurrency),
+        media_type="application/x-ndjson"
+    )
+
+@router.get("/circuit-breakers", response_model=CommonResponse[List[CircuitBreakerState]])
+def get_circuit_breakers():
+    """외부 API(IAM, Orchestrate, Gmail) 서킷 브레이커 상태"""
+    return {
+        "status": "success",
+        "message": "서킷 브레이커 상태 조회 성공",
+        "data": breaker_states()
+    }
 
 @router.get("/users", response_model=CommonResponse[AdminUserListResponse])
 def get_all_users(
-    skip: int = 0,
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor (키셋 페이지네이션)"),
+    skip: int = Query(0, ge=0, description="하위 호환용 OFFSET, cursor가 있으면 무시"),
+    include_total: bool = Query(True, description="false면 total_count 계산 생략"),
     db: Session = Depends(get_db)
 ):
-    total = db.query(User).count()
-    users = db.query(User).order_by(User.user_id.desc()).offset(skip).limit(limit).all()
+    total = count_cache.get("users", db.query(User).count) if include_total else None
+
+    query = db.query(User)
+    if cursor:
+        try:
+            last_user_id = int(decode_cursor(cursor)["user_id"])
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(status_code=400, detail="잘못된 cursor 값입니다.")
+        query = query.filter(User.user_id < last_user_id)
+    elif skip:
+        query = query.offset(skip)
+
+    rows = query.order_by(User.user_id.desc()).limit(limit + 1).all()
+    users = rows[:limit]
+    next_cursor = encode_cursor({"user_id": users[-1].user_id}) if len(rows) > limit else None
 
     return {
         "status": "success",
         "message": "전체 사용자 목록을 조회했습니다.",
         "data": {
             "total_count": total,
-            "users": users
+            "users": users,
+            "next_cursor": next_cursor
         }
     }
 
@@ -187,6 +310,7 @@ def create_user(
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
+    count_cache.invalidate("users")
 
     return {
         "status": "success",
@@ -227,8 +351,10 @@ def delete_user(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    db.query(UserRiskSummary).filter(UserRiskSummary.user_id == user_id).delete(synchronize_session=False)
     db.delete(user)
     db.commit()
+    count_cache.invalidate("users")
 
     return {
         "status": "success",
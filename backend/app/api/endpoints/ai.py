@@ -1,11 +1,16 @@
+import json
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_db, SessionLocal
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 from app.schemas.common import CommonResponse
 from app.services.ai_service import ai_service
+from app.services.classification_cache_service import classification_cache_service
+from app.services.job_service import job_service
+from app.schemas.job import JobResponse
 
 router = APIRouter()
 
@@ -20,31 +25,92 @@ class AIClassifyRequest(BaseModel):
 class ClassificationResult(BaseModel):
     id: int
     classification: str
+    source: Optional[str] = None  # RULE, CACHE, LLM
 
 class AIClassifyResponse(BaseModel):
     results: List[ClassificationResult]
     failed_ids: List[int] = []
 
+class ClassificationCacheStats(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: float
+    llm_classifications_saved: int
+    entries: int
+
+def _run_classification_job(job, email_list: list):
+    db = SessionLocal()
+    try:
+        return ai_service.process_email_classification(db, email_list, progress=job.update_progress)
+    finally:
+        db.close()
+
+# LLM 응답을 기다리는 동안 이벤트 루프를 막지 않도록 동기 함수(스레드풀 실행)로 둡니다.
 @router.post("/classify-emails", response_model=CommonResponse[AIClassifyResponse])
-async def classify_emails(
+def classify_emails(
     request: AIClassifyRequest, 
     db: Session = Depends(get_db)
 ):
     try:
         email_list = [e.model_dump() for e in request.emails]
         
-        classified_results = ai_service.process_email_classification(db, email_list)
-        
+        classified = ai_service.process_email_classification(db, email_list)
+
+        # AI 서비스 장애(재시도 실패, 서킷 열림)로 분류하지 못한 메일은 기존 분류(동기화 직후라면 UNCERTAIN)를
+        # 그대로 두고 failed_ids로 알려 줍니다. 나머지 메일의 결과는 정상 반영됩니다.
+        message = "메일 분류 및 DB 반영이 완료되었습니다."
+        if classified["failed_ids"]:
+            message = f"메일 분류 중 {len(classified['failed_ids'])}건은 AI 서비스 오류로 분류하지 못했습니다. (failed_ids)"
+
         return {
             "status": "success",
-            "message": "메일 분류 및 DB 반영이 완료되었습니다.",
-            "data": {
-                "results": classified_results,
-                "failed_ids": []
-            }
+            "message": message,
+            "data": classified
         }
     except Exception as e:
         print(f"AI Classification Error: {str(e)}")
         import traceback
         traceback.print_exc()
-        raise HTTPException(status_code=500, detail="AI 분류 중 오류가 발생했습니다.")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="AI 분류 중 오류가 발생했습니다.")
+
+def _stream_classification(email_list: list):
+    """분류 이벤트를 NDJSON 한 줄씩 내보냅니다. 응답이 끝날 때까지 쓰는 세션은 요청 의존성과 따로 엽니다."""
+    db = SessionLocal()
+    try:
+        for event in ai_service.stream_email_classification(db, email_list):
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+    except Exception as e:
+        db.rollback()
+        print(f"AI Classification Stream Error: {e}")
+        yield json.dumps({"event": "error", "message": "AI 분류 중 오류가 발생했습니다."}, ensure_ascii=False) + "\n"
+    finally:
+        db.close()
+
+@router.post("/classify-emails/stream")
+def classify_emails_stream(request: AIClassifyRequest):
+    """
+    /classify-emails와 같지만 청크가 끝날 때마다 결과를 NDJSON으로 내보냅니다.
+    이벤트: start -> result(메일별 분류와 연결된 서비스)... / failed(분류 못 한 메일 ID) -> done
+    """
+    email_list = [e.model_dump() for e in request.emails]
+    return StreamingResponse(_stream_classification(email_list), media_type="application/x-ndjson")
+
+@router.post("/classify-emails/jobs", response_model=CommonResponse[JobResponse], status_code=202)
+def submit_classification_job(request: AIClassifyRequest):
+    """메일 분류를 백그라운드 작업으로 등록하고 작업 ID를 바로 반환합니다. (GET /api/jobs/{job_id}로 확인)"""
+    email_list = [e.model_dump() for e in request.emails]
+    job = job_service.submit("EMAIL_CLASSIFY", _run_classification_job, email_list)
+
+    return {
+        "status": "success",
+        "message": "메일 분류 작업이 등록되었습니다.",
+        "data": job.to_dict()
+    }
+
+@router.get("/classification-cache/stats", response_model=CommonResponse[ClassificationCacheStats])
+def get_classification_cache_stats(db: Session = Depends(get_db)):
+    return {
+        "status": "success",
+        "message": "분류 캐시 통계 조회 성공",
+        "data": classification_cache_service.stats(db)
+    }
@@ -1,50 +1,153 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_db, SessionLocal
+from app.core.pagination import encode_cursor, decode_cursor, count_cache
+from app.core.resilience import ExternalServiceUnavailable, retry_after_header
 from app.schemas.email import EmailSyncRequest, EmailListResponse, EmailResponse
 from app.services.gmail_service import GmailService
 from app.models.email import Email
 from app.models.user import User
 from app.schemas.common import CommonResponse
+from app.schemas.job import JobResponse
+from app.services.job_service import job_service
 
 router = APIRouter()
 gmail_service = GmailService()
 
-@router.post("/sync")
-def sync_emails(request: EmailSyncRequest, db: Session = Depends(get_db)):
+def _get_demo_user(db: Session):
     user = db.query(User).filter(User.user_id == 1).first()
     if not user:
         user = User(email="demo@gmail.com", nickname="DemoUser")
         db.add(user)
         db.commit()
         db.refresh(user)
+    return user
 
+def _build_sync_query(request: EmailSyncRequest):
     final_query = request.search_query
     if request.start_date:
         final_query += f" after:{request.start_date.replace('-', '/')}"
     if request.end_date:
         final_query += f" before:{request.end_date.replace('-', '/')}"
+    return final_query
+
+def _run_sync_job(job, user_id: int, query: str, limit: int, full_sync: bool, include_body: bool):
+    db = SessionLocal()
+    try:
+        return gmail_service.fetch_and_save_emails(
+            db, user_id, query, limit, full_sync=full_sync, progress=job.update_progress, include_body=include_body
+        )
+    finally:
+        db.close()
+
+@router.post("/sync")
+def sync_emails(request: EmailSyncRequest, db: Session = Depends(get_db)):
+    user = _get_demo_user(db)
+    final_query = _build_sync_query(request)
 
     try:
-        count = gmail_service.fetch_and_save_emails(db, user.user_id, final_query, request.limit)
+        sync_stats = gmail_service.fetch_and_save_emails(
+            db, user.user_id, final_query, request.limit, full_sync=request.full_sync,
+            include_body=request.include_body
+        )
         return {
             "status": "success",
             "message": "메일 동기화가 완료되었습니다.",
-            "data": {"synced_count": count}
+            "data": sync_stats
         }
+    except ExternalServiceUnavailable as e:
+        # Gmail 장애/속도 제한: 재시도 후에도 실패했거나 서킷이 열려 있으면 500 대신 503으로 알립니다.
+        raise HTTPException(status_code=503, detail=str(e), headers=retry_after_header(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/sync/jobs", response_model=CommonResponse[JobResponse], status_code=202)
+def submit_sync_job(request: EmailSyncRequest, db: Session = Depends(get_db)):
+    """메일 동기화를 백그라운드 작업으로 등록하고 작업 ID를 바로 반환합니다. (GET /api/jobs/{job_id}로 확인)"""
+    user = _get_demo_user(db)
+    job = job_service.submit(
+        "EMAIL_SYNC", _run_sync_job,
+        user.user_id, _build_sync_query(request), request.limit, request.full_sync, request.include_body
+    )
+
+    return {
+        "status": "success",
+        "message": "메일 동기화 작업이 등록되었습니다.",
+        "data": job.to_dict()
+    }
+
 @router.get("", response_model=CommonResponse[EmailListResponse])
-def get_emails(skip: int = 0, limit: int = 50, db: Session = Depends(get_db)):
-    total = db.query(Email).count()
-    emails = db.query(Email).order_by(Email.received_at.desc()).offset(skip).limit(limit).all()
+def get_emails(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor (키셋 페이지네이션)"),
+    skip: int = Query(0, ge=0, description="하위 호환용 OFFSET, cursor가 있으면 무시"),
+    user_id: Optional[int] = None,
+    classification: Optional[str] = Query(None, description="REGISTER, OTHER, UNCERTAIN"),
+    include_total: bool = Query(True, description="false면 total_count 계산 생략"),
+    db: Session = Depends(get_db)
+):
+    query = db.query(Email)
+    if user_id is not None:
+        query = query.filter(Email.user_id == user_id)
+    if classification:
+        query = query.filter(Email.classification == classification)
+
+    total = None
+    if include_total:
+        total = count_cache.get(f"emails:{user_id}:{classification}", query.count)
+
+    # (received_at, email_id) 내림차순 키셋: 마지막으로 본 행 이후부터 읽으므로 깊은 페이지도 비용이 같습니다.
+    # received_at이 NULL인 메일(Date 헤더 없음)은 날짜가 있는 메일 뒤에 email_id 내림차순으로 이어 붙입니다.
+    last_received_at = None
+    last_email_id = None
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+            if position["received_at"] is not None:
+                last_received_at = datetime.fromisoformat(position["received_at"])
+            last_email_id = int(position["email_id"])
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(status_code=400, detail="잘못된 cursor 값입니다.")
+
+    if skip and not cursor:
+        rows = query.order_by(Email.received_at.is_(None), Email.received_at.desc(), Email.email_id.desc()) \
+            .offset(skip).limit(limit + 1).all()
+    else:
+        rows = []
+        # 날짜 있는 메일 (커서가 이미 NULL 구간에 있으면 건너뜀)
+        if not cursor or last_received_at is not None:
+            dated = query.filter(Email.received_at.isnot(None))
+            if cursor:
+                # 앞의 received_at <= 조건이 있어야 OR 조건에서도 인덱스 범위 검색을 합니다.
+                dated = dated.filter(
+                    Email.received_at <= last_received_at,
+                    or_(Email.received_at < last_received_at, Email.email_id < last_email_id)
+                )
+            rows = dated.order_by(Email.received_at.desc(), Email.email_id.desc()).limit(limit + 1).all()
+
+        # 날짜 있는 메일을 다 읽었으면 NULL 구간으로 이어서 채웁니다.
+        if len(rows) <= limit:
+            undated = query.filter(Email.received_at.is_(None))
+            if cursor and last_received_at is None:
+                undated = undated.filter(Email.email_id < last_email_id)
+            rows += undated.order_by(Email.email_id.desc()).limit(limit + 1 - len(rows)).all()
+
+    emails = rows[:limit]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = emails[-1]
+        next_cursor = encode_cursor({"received_at": last.received_at, "email_id": last.email_id})
   
     return {
         "status": "success", 
         "message": "메일 목록 조회 성공",
         "data": {
             "total_count": total,
-            "emails": emails
+            "emails": emails,
+            "next_cursor": next_cursor
         }
-    }
\ No newline at end of file
+    }
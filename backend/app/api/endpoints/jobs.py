@@ -0,0 +1,32 @@
+from fastapi import APIRouter, HTTPException
+
+from app.schemas.common import CommonResponse
+from app.schemas.job import JobResponse, JobListResponse
+from app.services.job_service import job_service
+
+router = APIRouter()
+
+@router.get("", response_model=CommonResponse[JobListResponse])
+def get_jobs(limit: int = 50):
+    jobs = [job.to_dict() for job in job_service.list(limit)]
+
+    return {
+        "status": "success",
+        "message": "작업 목록 조회 성공",
+        "data": {
+            "total_count": len(jobs),
+            "jobs": jobs
+        }
+    }
+
+@router.get("/{job_id}", response_model=CommonResponse[JobResponse])
+def get_job(job_id: str):
+    job = job_service.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return {
+        "status": "success",
+        "message": "작업 상태 조회 성공",
+        "data": job.to_dict()
+    }
@@ -1,56 +1,138 @@
 from fastapi import APIRouter, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db, SessionLocal
 from app.models.user import User
 from app.models.user_service import UserService
 from app.models.service import Service
 from app.schemas.common import CommonResponse
-from app.schemas.service import UserServiceListResponse
+from app.schemas.service import UserServiceListResponse, RiskSummaryResponse
+from app.services.risk_summary_service import risk_summary_service
 
 router = APIRouter()
 
+
+def supports_window_count(db: Session):
+    """
+    func.count().over()는 MySQL 8.0+ / MariaDB 10.2+ / SQLite 3.25+에서만 동작합니다.
+    버전을 모르거나(첫 연결 전) 그보다 낮으면 개수를 별도 COUNT 쿼리로 셉니다.
+    """
+    dialect = db.get_bind().dialect
+    version = tuple(dialect.server_version_info or ())
+    if dialect.name == "mysql":
+        return version >= ((10, 2) if getattr(dialect, "is_mariadb", False) else (8, 0))
+    if dialect.name == "sqlite":
+        return version >= (3, 25)
+    return True
+
+
+def my_services_query(db: Session, user_id: int, sort: str = "latest", risk_level: Optional[str] = None,
+                      with_total: bool = True):
+    """
+    내 서비스 목록 조회 쿼리. 응답에 필요한 컬럼만 UserServiceResponse 필드 이름으로 가져오므로
+    행마다 관계(us.service)를 지연 로딩하지 않고, with_total이면 전체 개수도 윈도 함수로 같은 쿼리에서 셉니다.
+    """
+    columns = [
+        UserService.id.label("user_service_id"),
+        Service.service_id,
+        Service.service_name,
+        Service.domain,
+        Service.risk_level,
+        UserService.subscription_date,
+        UserService.email_id.label("evidence_email_id"),
+    ]
+    if with_total:
+        columns.append(func.count().over().label("total_count"))
+
+    query = db.query(*columns).join(Service, Service.service_id == UserService.service_id) \
+        .filter(UserService.user_id == user_id)
+
+    if risk_level:
+        query = query.filter(Service.risk_level == risk_level)
+
+    # 위험도 정렬은 문자열(risk_level)이 아니라 숫자 등급(risk_rank, A=1 ... F=5)으로 합니다.
+    if sort == "risk_desc":
+        query = query.order_by(Service.risk_rank.desc(), UserService.id.desc())
+    elif sort == "risk_asc":
+        query = query.order_by(Service.risk_rank.asc(), UserService.id.desc())
+    else:
+        query = query.order_by(UserService.subscription_date.desc(), UserService.id.desc())
+
+    return query
+
+
+def count_my_services(db: Session, user_id: int, risk_level: Optional[str] = None):
+    count_query = db.query(func.count(UserService.id)) \
+        .join(Service, Service.service_id == UserService.service_id) \
+        .filter(UserService.user_id == user_id)
+    if risk_level:
+        count_query = count_query.filter(Service.risk_level == risk_level)
+    return count_query.scalar()
+
 @router.get("/me/services", response_model=CommonResponse[UserServiceListResponse])
 def get_my_services(
     sort: str = Query("latest", description="정렬 기준: latest(최신순), risk_desc(위험도순), risk_asc(안전순)"),
     risk_level: Optional[str] = Query(None, description="특정 등급 필터링 (예: A, B, C)"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="생략하면 전체 목록 (잘린 경우 has_more=true)"),
+    skip: int = Query(0, ge=0),
     db: Session = Depends(get_db)
 ):
 
     user_id = 1
-    
-    query = db.query(UserService).join(Service).filter(UserService.user_id == user_id)
 
-    if risk_level:
-        query = query.filter(Service.risk_level == risk_level)
+    with_total = limit is not None and supports_window_count(db)
+    query = my_services_query(db, user_id, sort, risk_level, with_total).offset(skip)
+    if limit is not None:
+        query = query.limit(limit)
+    rows = query.all()
 
-    if sort == "risk_desc":
-        query = query.order_by(Service.risk_level.desc())
-    elif sort == "risk_asc":
-        query = query.order_by(Service.risk_level.asc())
+    if with_total and rows:
+        total = rows[0].total_count
+    elif limit is None and (rows or not skip):
+        # 전체 목록이면 받은 행 수가 곧 개수입니다.
+        total = skip + len(rows)
     else:
-        query = query.order_by(UserService.subscription_date.desc())
-
-    services = query.all()
-    
-    result_list = []
-    for us in services:
-        result_list.append({
-            "user_service_id": us.id,
-            "service_id": us.service.service_id,
-            "service_name": us.service.service_name,
-            "domain": us.service.domain,
-            "risk_level": us.service.risk_level,
-            "subscription_date": us.subscription_date,
-            "evidence_email_id": us.email_id
-        })
+        # 윈도 함수를 쓸 수 없거나, 범위를 벗어난 페이지라 윈도 함수 결과가 없으면 개수만 따로 셉니다.
+        total = count_my_services(db, user_id, risk_level)
 
+    # 행(Row)을 그대로 넘기면 응답 모델이 from_attributes로 한 번만 검증합니다.
     return {
         "status": "success",
         "message": "가입된 서비스 목록을 조회했습니다.",
         "data": {
-            "total_count": len(result_list),
-            "services": result_list
+            "total_count": total,
+            "services": rows,
+            "has_more": skip + len(rows) < total
         }
-    }
\ No newline at end of file
+    }
+
+def _get_summary_in_own_session(user_id: int):
+    db = SessionLocal()
+    try:
+        return risk_summary_service.get_summary(db, user_id)
+    finally:
+        db.close()
+
+@router.get("/me/risk-summary", response_model=CommonResponse[RiskSummaryResponse])
+async def get_my_risk_summary(db=Depends(get_async_db)):
+    """
+    대시보드(보안 점수, 등급별 서비스 수)용 집계. 미리 집계된 user_risk_summaries 한 행만 읽습니다.
+    대시보드가 가장 자주 부르는 조회라 DB_ASYNC_ENABLED면 비동기 세션으로 읽어 스레드풀을 쓰지 않습니다.
+    """
+
+    user_id = 1
+
+    if db is not None:
+        summary = await risk_summary_service.get_summary_async(db, user_id)
+    else:
+        # 동기 세션은 이벤트 루프를 막지 않도록 스레드풀에서 읽습니다.
+        summary = await run_in_threadpool(_get_summary_in_own_session, user_id)
+
+    return {
+        "status": "success",
+        "message": "보안 요약을 조회했습니다.",
+        "data": summary
+    }
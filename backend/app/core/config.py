@@ -15,11 +15,100 @@ class Settings(BaseSettings):
     DB_NAME: str = ""
     DATABASE_URL: str = ""
 
+    # DB 종류: mysql(secret_db.json 사용) 또는 sqlite(로컬 실행/벤치마크용, MySQL 없이 전체 스택 실행)
+    DB_BACKEND: str = "mysql"
+    SQLITE_PATH: str = "mai1.db"  # 상대 경로는 backend/ 기준
+
+    # 커넥션 풀 (SQLite에는 적용하지 않음)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    # MySQL wait_timeout/프록시 유휴 종료보다 짧게 잡아 끊긴 연결을 재사용하지 않도록 합니다. (초)
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_ECHO: bool = False
+
+    # True면 async 라우트(/readyz, GET /api/users/me/risk-summary)에서 비동기 엔진(aiomysql / aiosqlite)을 사용합니다.
+    DB_ASYNC_ENABLED: bool = False
+    # True면 서버 시작 시 마이그레이션(alembic upgrade head) 실행 (기본은 `python -m app.core.init_db`로 직접 실행)
+    DB_CREATE_TABLES_ON_STARTUP: bool = False
+
+    # Gmail 동기화 설정 (GMAIL_API_ENDPOINT를 지정하면 로컬 가짜 Gmail API로 요청을 보냅니다)
+    GMAIL_API_ENDPOINT: str = ""
+    GMAIL_BATCH_SIZE: int = 50
+    # 본문 포함 동기화(include_body)에서 저장할 본문 앞부분의 최대 크기 (바이트)
+    GMAIL_BODY_MAX_BYTES: int = 4096
+
+    # AI 메일 분류 설정 (한 번의 LLM 호출에 넣을 메일 수 / 동시 호출 수)
+    AI_CLASSIFY_CHUNK_SIZE: int = 20
+    AI_CLASSIFY_CONCURRENCY: int = 4
+    # True면 Orchestrate 응답을 SSE("stream": true)로 받아 이어 붙입니다.
+    AI_CLASSIFY_STREAM: bool = False
+
+    # 규칙 기반 사전 분류 (확신도가 임계값 이상인 메일은 LLM을 호출하지 않음)
+    RULE_CLASSIFIER_ENABLED: bool = True
+    RULE_CLASSIFIER_THRESHOLD: float = 0.9
+
+    # 목록 API total_count 캐시 유지 시간 (초)
+    COUNT_CACHE_TTL_SECONDS: int = 30
+
+    # 백그라운드 작업 (메일 동기화 / 분류)
+    JOB_WORKERS: int = 4
+    JOB_HISTORY_LIMIT: int = 200
+
+    # 발송자-서비스 매칭 인덱스 재적재 주기 (다른 워커에서 바뀐 서비스를 반영)
+    DOMAIN_INDEX_TTL_SECONDS: int = 300
+
+    # 개인정보 처리방침 평가 캐시 (비워두면 CHECKLIST_TITLES의 해시를 체크리스트 버전으로 사용)
+    PRIVACY_CHECKLIST_VERSION: str = ""
+    # 평가용 약관 업로드/텍스트의 최대 크기 (바이트)
+    POLICY_MAX_BYTES: int = 2 * 1024 * 1024
+    # 일괄 평가: 서비스별 약관 파일('{service_id}.txt' 또는 '{domain}.txt') 위치와 동시 평가 수
+    POLICY_STORE_DIR: str = "policies"
+    BULK_EVALUATION_CONCURRENCY: int = 4
+
+    # 분류 결과 캐시 (발송 도메인 + 제목 템플릿 기준)
+    CLASSIFICATION_CACHE_TTL_DAYS: int = 30
+    CLASSIFICATION_CACHE_MAX_ENTRIES: int = 50000
+
+    # 외부 호출(IAM/Orchestrate/Gmail) 재시도: 429/5xx/네트워크 오류만, 지수 백오프 + jitter (Retry-After 우선)
+    EXTERNAL_RETRY_ATTEMPTS: int = 3
+    EXTERNAL_RETRY_BASE_DELAY: float = 0.5
+    EXTERNAL_RETRY_MAX_DELAY: float = 10.0
+    # 재시도를 포함한 호출 하나의 전체 제한 시간 (초)
+    ORCHESTRATE_DEADLINE_SECONDS: float = 180.0
+    GMAIL_DEADLINE_SECONDS: float = 60.0
+    # Gmail 요청 하나의 소켓 타임아웃 (초, googleapiclient 기본값은 무제한)
+    GMAIL_TIMEOUT_SECONDS: float = 30.0
+    # 서킷 브레이커: 연속 실패가 이만큼 쌓이면 CIRCUIT_RESET_SECONDS 동안 호출하지 않고 바로 실패
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RESET_SECONDS: float = 30.0
+
+    # 관측: GET /metrics(Prometheus) 노출, OpenTelemetry trace (opentelemetry-sdk 설치 필요, console 또는 otlp로 내보냄)
+    METRICS_ENABLED: bool = True
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "console"
+    TRACING_SERVICE_NAME: str = "mai1-backend"
+
     def __init__(self):
         super().__init__()
         self._load_secrets()
 
+    @property
+    def ASYNC_DATABASE_URL(self):
+        """DATABASE_URL의 드라이버만 비동기 드라이버로 바꾼 URL"""
+        drivers = {"mysql+pymysql://": "mysql+aiomysql://", "sqlite:///": "sqlite+aiosqlite:///"}
+        for sync_prefix, async_prefix in drivers.items():
+            if self.DATABASE_URL.startswith(sync_prefix):
+                return async_prefix + self.DATABASE_URL[len(sync_prefix):]
+        return self.DATABASE_URL
+
     def _load_secrets(self):
+        if self.DB_BACKEND == "sqlite":
+            path = self.SQLITE_PATH if os.path.isabs(self.SQLITE_PATH) else os.path.join(BASE_DIR, self.SQLITE_PATH)
+            self.DATABASE_URL = f"sqlite:///{path}"
+            return
+
         try:
             with open(SECRET_FILE_PATH, "r", encoding="utf-8") as f:
                 secrets = json.load(f)
@@ -1,12 +1,50 @@
-from sqlalchemy import create_engine
+import threading
+from sqlalchemy import create_engine, event, insert
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+
+def engine_options(url: str):
+    """
+    create_engine / create_async_engine 공통 옵션.
+    - MySQL: 풀 크기, pre_ping(끊긴 연결 감지), recycle(유휴 종료 전에 연결 교체)
+    - SQLite: 파일 잠금 기반이라 풀 옵션 없이 스레드 간 연결 공유만 허용
+    """
+    if url.startswith("sqlite"):
+        return {"echo": settings.DB_ECHO, "connect_args": {"check_same_thread": False}}
+
+    return {
+        "echo": settings.DB_ECHO,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def _configure_sqlite(sync_engine):
+    # 백그라운드 작업 스레드와 API 요청이 동시에 읽고 쓸 수 있도록 WAL 모드 사용
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+if engine.dialect.name == "sqlite":
+    _configure_sqlite(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+_async_lock = threading.Lock()
+_async_engine = None
+_AsyncSessionLocal = None
+
 Base = declarative_base()
 
 def get_db():
@@ -14,4 +52,69 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_async_engine():
+    """
+    DB_ASYNC_ENABLED일 때 async 라우트(/readyz, get_async_db)에서 쓰는 비동기 엔진. 첫 사용 시점에 만듭니다.
+    드라이버(aiomysql / aiosqlite)가 없으면 ImportError가 납니다.
+    """
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        with _async_lock:
+            if _async_engine is None:
+                from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+                url = settings.ASYNC_DATABASE_URL
+                async_engine = create_async_engine(url, **engine_options(url))
+                if async_engine.dialect.name == "sqlite":
+                    _configure_sqlite(async_engine.sync_engine)
+
+                _AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+                _async_engine = async_engine
+    return _async_engine
+
+async def get_async_db():
+    """
+    async 라우트용 세션 의존성. DB_ASYNC_ENABLED가 꺼져 있으면 None을 넘기므로,
+    라우트는 None일 때 동기 세션으로 스레드풀에서 처리합니다. (/readyz와 같은 방식)
+    """
+    if not settings.DB_ASYNC_ENABLED:
+        yield None
+        return
+
+    get_async_engine()
+    async with _AsyncSessionLocal() as db:
+        yield db
+
+async def dispose_engines():
+    """서버 종료 시 풀에 남은 연결을 정리합니다."""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    engine.dispose()
+
+def insert_ignore(db, model, rows: list):
+    """
+    UNIQUE 제약에 걸리는 행은 건너뛰는 다중 행 INSERT (한 문장).
+    MySQL은 ON DUPLICATE KEY UPDATE pk=pk, SQLite/PostgreSQL은 ON CONFLICT DO NOTHING을 사용합니다.
+    (MySQL INSERT IGNORE는 FK 위반/값 잘림까지 경고로 바꿔 버리므로 중복 키 충돌만 무시하도록 쓰지 않습니다)
+    """
+    if not rows:
+        return
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        pk_name = model.__table__.primary_key.columns.values()[0].name
+        stmt = mysql_insert(model).values(rows)
+        stmt = stmt.on_duplicate_key_update({pk_name: model.__table__.c[pk_name]})
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        stmt = sqlite_insert(model).values(rows).on_conflict_do_nothing()
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        stmt = pg_insert(model).values(rows).on_conflict_do_nothing()
+    else:
+        stmt = insert(model).values(rows)
+
+    db.execute(stmt)
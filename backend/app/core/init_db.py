@@ -0,0 +1,51 @@
+"""
+DB 스키마 생성/업그레이드. 서버 import 시점에 자동으로 실행하지 않고, 배포/개발 시 명시적으로 실행합니다.
+스키마는 migrations/ 아래 Alembic 마이그레이션으로 관리합니다. (create_all은 사용하지 않습니다)
+
+    cd backend
+    python -m app.core.init_db      # alembic upgrade head 와 같습니다
+
+마이그레이션 도입 전(create_all)에 만든 기존 DB를 처음 올릴 때는 테이블이 이미 있으므로
+0001(기준 스키마)을 적용하지 말고 버전만 표시한 뒤 upgrade 합니다. (한 번만)
+
+    cd backend
+    alembic stamp 0001
+    python -m app.core.init_db
+"""
+import os
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _check_unversioned_schema():
+    """alembic_version 없이 테이블만 있는 DB(create_all 시절)면 0001이 실패하기 전에 안내와 함께 멈춥니다."""
+    from sqlalchemy import inspect
+    from app.core.database import engine
+
+    tables = set(inspect(engine).get_table_names())
+    if "users" in tables and "alembic_version" not in tables:
+        raise RuntimeError(
+            "마이그레이션 버전 정보 없이 만든 기존 DB입니다. "
+            "`cd backend && alembic stamp 0001`을 한 번 실행한 뒤 다시 마이그레이션하세요."
+        )
+
+
+def init_db(revision: str = "head"):
+    """
+    alembic upgrade를 실행합니다. (서버 시작 시 DB_CREATE_TABLES_ON_STARTUP이면 lifespan에서 호출)
+    create_all로 만든 기존 DB는 먼저 `alembic stamp 0001`이 필요합니다. (모듈 설명 참고)
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    _check_unversioned_schema()
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    # 작업 디렉터리와 상관없이 backend/migrations를 사용
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    command.upgrade(config, revision)
+
+
+if __name__ == "__main__":
+    init_db()
+    print("✅ DB 스키마 마이그레이션 완료")
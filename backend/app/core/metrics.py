@@ -0,0 +1,226 @@
+"""
+Prometheus 메트릭과 (선택) OpenTelemetry trace span.
+
+- HTTP: 라우트별 요청 지연 시간, 요청당 DB 쿼리 수/DB 시간
+- 외부 호출: IAM 토큰, Orchestrate completion, Gmail list/get 지연 시간과 오류 수
+- DB: SQLAlchemy 엔진 이벤트로 쿼리 수/시간 집계
+
+GET /metrics가 Prometheus 텍스트 형식으로 노출합니다.
+TRACING_ENABLED면 요청 하나(/emails/sync, /ai/classify-emails 등)와 그 아래의 외부 호출이 한 trace로 이어집니다.
+"""
+import time
+import contextvars
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+
+from app.core.config import settings
+
+# LLM 응답처럼 수십 초 걸리는 호출까지 구분할 수 있도록 버킷을 넓게 잡습니다.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "mai1_http_request_duration_seconds", "라우트별 HTTP 요청 처리 시간",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "mai1_http_request_db_queries", "요청 하나가 실행한 DB 쿼리 수",
+    ["route"], buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "mai1_http_request_db_seconds", "요청 하나의 DB 쿼리 시간 합계",
+    ["route"], buckets=LATENCY_BUCKETS
+)
+
+EXTERNAL_CALL_SECONDS = Histogram(
+    "mai1_external_call_duration_seconds", "외부 API 호출 시간 (iam, orchestrate, gmail)",
+    ["target", "operation", "outcome"], buckets=LATENCY_BUCKETS
+)
+EXTERNAL_CALL_ERRORS = Counter(
+    "mai1_external_call_errors_total", "외부 API 호출 오류 수",
+    ["target", "operation", "error"]
+)
+EXTERNAL_CALL_RETRIES = Counter(
+    "mai1_external_call_retries_total", "429/5xx/네트워크 오류로 다시 시도한 외부 API 호출 수",
+    ["target", "operation"]
+)
+CIRCUIT_STATE = Gauge(
+    "mai1_circuit_state", "외부 API 서킷 브레이커 상태 (0=CLOSED, 1=HALF_OPEN, 2=OPEN)",
+    ["target"]
+)
+
+DB_QUERIES = Counter("mai1_db_queries_total", "실행한 DB 쿼리 수 (백그라운드 작업 포함)")
+DB_QUERY_SECONDS = Histogram(
+    "mai1_db_query_duration_seconds", "DB 쿼리 하나의 실행 시간",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+)
+
+
+class RequestStats:
+    """현재 요청의 DB 사용량. 스레드풀에서 실행되는 동기 라우트도 같은 객체를 공유합니다."""
+
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_request_stats = contextvars.ContextVar("mai1_request_stats", default=None)
+
+_tracer = None
+
+
+def background_context():
+    """
+    작업/청크 스레드에서 실행할 context 사본. trace context는 이어받고 현재 요청의 RequestStats는 떼어 냅니다.
+    (이미 기록이 끝난 요청에 백그라운드 쿼리가 더해지거나, 여러 스레드가 잠금 없이 같은 객체를 고치지 않도록)
+    """
+    context = contextvars.copy_context()
+    context.run(_request_stats.set, None)
+    return context
+
+
+def init_tracing():
+    """
+    TRACING_ENABLED일 때 OpenTelemetry TracerProvider를 설정합니다.
+    opentelemetry-sdk가 없으면 경고만 출력하고 span 없이 동작합니다.
+    (OTLP 내보내기는 opentelemetry-exporter-otlp가 있을 때 OTEL_EXPORTER_OTLP_* 환경 변수를 따릅니다)
+    """
+    global _tracer
+    if not settings.TRACING_ENABLED or _tracer is not None:
+        return
+
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    except ImportError:
+        print("⚠️ TRACING_ENABLED이지만 opentelemetry-sdk가 설치되어 있지 않아 trace를 기록하지 않습니다.")
+        return
+
+    exporter = ConsoleSpanExporter()
+    if settings.TRACING_EXPORTER == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            exporter = OTLPSpanExporter()
+        except ImportError:
+            print("⚠️ opentelemetry-exporter-otlp가 없어 콘솔로 trace를 출력합니다.")
+
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("mai1")
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """trace가 켜져 있으면 현재 span 아래에 자식 span을 만들고, 아니면 아무것도 하지 않습니다."""
+    if _tracer is None:
+        yield None
+        return
+
+    with _tracer.start_as_current_span(name, attributes=attributes) as current:
+        yield current
+
+
+@contextmanager
+def external_call(target: str, operation: str):
+    """
+    외부 API 호출 하나를 감싸 지연 시간/오류를 기록하고 trace span을 만듭니다.
+        with external_call("gmail", "messages.list"):
+            page = request.execute()
+    """
+    started = time.perf_counter()
+    outcome = "success"
+    with span(f"{target}.{operation}", target=target, operation=operation):
+        try:
+            yield
+        except Exception as e:
+            outcome = "error"
+            EXTERNAL_CALL_ERRORS.labels(target, operation, _error_label(e)).inc()
+            raise
+        finally:
+            EXTERNAL_CALL_SECONDS.labels(target, operation, outcome).observe(time.perf_counter() - started)
+
+
+def record_external_error(target: str, operation: str, error: Exception):
+    """배치 요청의 개별 응답처럼 예외로 올라오지 않는 실패를 오류 수에 더합니다."""
+    EXTERNAL_CALL_ERRORS.labels(target, operation, _error_label(error)).inc()
+
+
+def _error_label(error: Exception):
+    """HTTP 오류는 상태 코드, 그 외에는 예외 클래스 이름 (라벨 종류가 무한히 늘지 않도록)"""
+    # 재시도 판단과 같은 기준으로 상태 코드를 읽습니다. (resilience가 이 모듈을 import하므로 호출 시점에 import)
+    from app.core.resilience import error_status
+
+    status = error_status(error)
+    if status is not None:
+        return str(status)
+    return type(error).__name__
+
+
+def instrument_engine(engine):
+    """SQLAlchemy 엔진 이벤트로 쿼리 수/시간을 전역 메트릭과 현재 요청(RequestStats)에 더합니다."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("mai1_query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["mai1_query_started"].pop()
+        elapsed = time.perf_counter() - started
+
+        DB_QUERIES.inc()
+        DB_QUERY_SECONDS.observe(elapsed)
+
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+
+def _route_label(request):
+    """
+    경로 파라미터가 들어간 실제 URL 대신 라우트 템플릿(/api/jobs/{job_id})을 라벨로 사용합니다.
+    include_router로 붙인 라우트는 scope["route"].path에 prefix가 빠져 있을 수 있어,
+    실제 경로에서 템플릿의 세그먼트 수만큼을 떼어 낸 앞부분을 prefix로 붙입니다.
+    """
+    route = request.scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+
+    path = request.url.path.rstrip("/")
+    depth = template.count("/")
+    prefix = path.rsplit("/", depth)[0] if depth else path
+    return (prefix + template) or "/"
+
+
+async def metrics_middleware(request, call_next):
+    """
+    라우트별 요청 시간과 요청당 DB 쿼리 수/시간을 기록합니다.
+    StreamingResponse는 응답 시작까지의 시간만 측정됩니다.
+    """
+    stats = RequestStats()
+    token = _request_stats.set(stats)
+    started = time.perf_counter()
+    status = 500
+    try:
+        with span(f"HTTP {request.method}", **{"http.method": request.method, "http.target": request.url.path}) as current:
+            response = await call_next(request)
+            status = response.status_code
+            if current is not None:
+                current.set_attribute("http.route", _route_label(request))
+                current.set_attribute("http.status_code", status)
+                current.set_attribute("db.queries", stats.queries)
+        return response
+    finally:
+        _request_stats.reset(token)
+        route = _route_label(request)
+        HTTP_REQUEST_SECONDS.labels(request.method, route, str(status)).observe(time.perf_counter() - started)
+        HTTP_REQUEST_DB_QUERIES.labels(route).observe(stats.queries)
+        HTTP_REQUEST_DB_SECONDS.labels(route).observe(stats.db_seconds)
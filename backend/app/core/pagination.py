@@ -0,0 +1,55 @@
+import json
+import time
+import base64
+import threading
+from datetime import datetime
+
+from app.core.config import settings
+
+
+def encode_cursor(values: dict):
+    """키셋 페이지네이션 위치를 클라이언트에 넘길 불투명 문자열로 인코딩합니다."""
+    raw = json.dumps(values, default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """encode_cursor의 역변환. 형식이 잘못되면 ValueError를 냅니다."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except Exception:
+        raise ValueError("잘못된 cursor 값입니다.")
+    if not isinstance(values, dict):
+        raise ValueError("잘못된 cursor 값입니다.")
+    return values
+
+
+class CountCache:
+    """
+    목록 API의 total_count를 COUNT_CACHE_TTL_SECONDS 동안 재사용합니다.
+    페이지를 넘길 때마다 테이블 전체 COUNT를 다시 세지 않기 위한 근사값입니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def get(self, key: str, count_fn):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._counts.get(key)
+            if cached and now - cached[1] < settings.COUNT_CACHE_TTL_SECONDS:
+                return cached[0]
+
+        count = count_fn()
+        with self._lock:
+            self._counts[key] = (count, now)
+        return count
+
+    def invalidate(self, prefix: str = ""):
+        with self._lock:
+            for key in [k for k in self._counts if k.startswith(prefix)]:
+                del self._counts[key]
+
+count_cache = CountCache()
@@ -0,0 +1,268 @@
+"""
+외부 호출(IAM, Orchestrate, Gmail) 보호 계층.
+
+- 재시도: 429/5xx/네트워크 오류만 지수 백오프 + full jitter로 재시도하고, Retry-After가 있으면 그 값을 따릅니다.
+- 제한 시간: 재시도를 포함한 호출 하나의 전체 시간(deadline)을 넘기면 더 기다리지 않고 포기합니다.
+- 서킷 브레이커: 대상별로 연속 실패가 CIRCUIT_FAILURE_THRESHOLD번 쌓이면 CIRCUIT_RESET_SECONDS 동안
+  호출하지 않고 바로 CircuitOpenError를 냅니다. 그 뒤에는 한 번만 시험 호출(HALF_OPEN)해 회복 여부를 봅니다.
+
+포기한 호출은 ExternalServiceUnavailable로 올라가며, 엔드포인트는 500 대신 503 또는 부분 결과(failed_ids)로 응답합니다.
+"""
+import math
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from app.core.config import settings
+from app.core.metrics import CIRCUIT_STATE, EXTERNAL_CALL_RETRIES, external_call, record_external_error
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+TARGETS = ("iam", "orchestrate", "gmail")
+
+CLOSED = "CLOSED"
+OPEN = "OPEN"
+HALF_OPEN = "HALF_OPEN"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class ExternalServiceUnavailable(Exception):
+    """재시도/제한 시간 안에 외부 호출이 성공하지 못했습니다."""
+
+    def __init__(self, target: str, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.target = target
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(ExternalServiceUnavailable):
+    """서킷이 열려 있어 호출하지 않았습니다."""
+
+
+def error_status(error: Exception):
+    """requests.HTTPError(.response.status_code) / googleapiclient HttpError(.resp.status)의 HTTP 상태 코드"""
+    response = getattr(error, "response", None)
+    if response is None:
+        response = getattr(error, "resp", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        status = getattr(response, "status", None)
+    return int(status) if status is not None else None
+
+
+def retry_after_seconds(error: Exception):
+    """응답의 Retry-After 헤더(초 또는 HTTP 날짜)를 초 단위로 반환합니다."""
+    response = getattr(error, "response", None)
+    if response is not None and getattr(response, "headers", None) is not None:
+        value = response.headers.get("Retry-After")
+    else:
+        # httplib2.Response는 헤더 이름이 소문자인 dict입니다.
+        resp = getattr(error, "resp", None)
+        value = resp.get("retry-after") if hasattr(resp, "get") else None
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: Exception):
+    status = error_status(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    # 연결 실패/소켓 타임아웃 (requests의 ConnectionError/Timeout도 OSError 하위 클래스)
+    return isinstance(error, OSError)
+
+
+def is_unavailable(error: Exception):
+    """서킷 브레이커 실패로 셀 오류: 5xx와 네트워크 오류 (429는 속도 제한일 뿐이므로 제외)"""
+    status = error_status(error)
+    if status is not None:
+        return status >= 500
+    return isinstance(error, OSError)
+
+
+def backoff_delay(attempt: int, error: Exception = None):
+    """attempt번째(1부터) 재시도 전 대기 시간. Retry-After가 있으면 우선합니다."""
+    retry_after = retry_after_seconds(error) if error is not None else None
+    if retry_after is not None:
+        return retry_after
+    ceiling = min(settings.EXTERNAL_RETRY_MAX_DELAY, settings.EXTERNAL_RETRY_BASE_DELAY * (2 ** (attempt - 1)))
+    return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    def __init__(self, target: str, failure_threshold: int, reset_seconds: float):
+        self.target = target
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._last_error = None
+        CIRCUIT_STATE.labels(target).set(_STATE_VALUES[CLOSED])
+
+    def _set_state(self, state: str):
+        if state != self._state:
+            print(f"🔌 {self.target} 서킷 {self._state} -> {state}")
+        self._state = state
+        CIRCUIT_STATE.labels(self.target).set(_STATE_VALUES[state])
+
+    def before_call(self):
+        """호출해도 되면 그대로 반환하고, 아니면 CircuitOpenError를 냅니다."""
+        with self._lock:
+            if self._state == OPEN:
+                remaining = self._opened_at + self.reset_seconds - time.monotonic()
+                if remaining > 0:
+                    raise CircuitOpenError(
+                        self.target, f"{self.target} 서킷이 열려 있습니다. ({remaining:.0f}초 후 재시도)", remaining
+                    )
+                self._set_state(HALF_OPEN)
+
+            if self._state == HALF_OPEN:
+                # 회복 확인은 한 호출만 하고 나머지는 결과가 나올 때까지 바로 실패시킵니다.
+                if self._probe_in_flight:
+                    raise CircuitOpenError(self.target, f"{self.target} 서킷 회복 확인 중입니다.", self.reset_seconds)
+                self._probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            self._set_state(CLOSED)
+
+    def release_probe(self):
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self, error: Exception):
+        with self._lock:
+            self._failures += 1
+            self._last_error = f"{type(error).__name__}: {error}"[:300]
+            self._probe_in_flight = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def snapshot(self):
+        with self._lock:
+            retry_in = None
+            if self._state == OPEN:
+                retry_in = round(max(0.0, self._opened_at + self.reset_seconds - time.monotonic()), 1)
+            return {
+                "target": self.target,
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "retry_in_seconds": retry_in,
+                "last_error": self._last_error,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(target: str):
+    with _breakers_lock:
+        breaker = _breakers.get(target)
+        if breaker is None:
+            breaker = _breakers[target] = CircuitBreaker(
+                target, settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_RESET_SECONDS
+            )
+        return breaker
+
+
+def breaker_states():
+    """호출 전이라 아직 만들어지지 않은 브레이커도 CLOSED로 함께 보여 줍니다."""
+    for target in TARGETS:
+        get_breaker(target)
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [breaker.snapshot() for breaker in breakers]
+
+
+def _deadline_seconds(target: str):
+    if target == "gmail":
+        return settings.GMAIL_DEADLINE_SECONDS
+    return settings.ORCHESTRATE_DEADLINE_SECONDS
+
+
+def _attempt_timeout_seconds(target: str):
+    if target == "gmail":
+        return settings.GMAIL_TIMEOUT_SECONDS
+    return 0.0
+
+
+def call(target: str, operation: str, fn, attempt_timeout: float = None):
+    """
+    fn()을 서킷 브레이커/재시도/제한 시간 아래에서 실행합니다. (시도마다 external_call 메트릭 기록)
+    재시도할 수 없는 오류(4xx, 응답 파싱 오류 등)는 그대로 올라가고,
+    재시도 가능한 오류로 끝까지 실패하면 ExternalServiceUnavailable이 올라갑니다.
+    attempt_timeout은 시도 하나가 걸릴 수 있는 최대 시간(요청 타임아웃)입니다. 대기 후 다음 시도가 이만큼 걸려도
+    제한 시간 안에 끝나지 않으면 시도하지 않고 포기합니다. (시간 초과로 끝난 시도 뒤에 또 한 번 전체 타임아웃을 기다리지 않도록)
+    """
+    breaker = get_breaker(target)
+    deadline_at = time.monotonic() + _deadline_seconds(target)
+    if attempt_timeout is None:
+        attempt_timeout = _attempt_timeout_seconds(target)
+    attempts = max(1, settings.EXTERNAL_RETRY_ATTEMPTS)
+
+    for attempt in range(1, attempts + 1):
+        try:
+            breaker.before_call()
+        except CircuitOpenError as e:
+            record_external_error(target, operation, e)
+            raise
+
+        try:
+            with external_call(target, operation):
+                result = fn()
+        except ExternalServiceUnavailable:
+            # fn 안에서 다른 대상(예: Orchestrate 호출 전 IAM 토큰 발급)이 포기한 경우: 이 대상의 상태는 모릅니다.
+            breaker.release_probe()
+            raise
+        except Exception as e:
+            if not is_retryable(e):
+                # 상대 서버는 응답했으므로 서킷 입장에서는 정상입니다.
+                breaker.record_success()
+                raise
+            if is_unavailable(e):
+                breaker.record_failure(e)
+            else:
+                breaker.record_success()
+
+            if attempt == attempts:
+                raise ExternalServiceUnavailable(
+                    target, f"{target} {operation} {attempts}회 시도 모두 실패: {e}", retry_after_seconds(e)
+                ) from e
+
+            delay = backoff_delay(attempt, e)
+            if time.monotonic() + delay + attempt_timeout >= deadline_at:
+                raise ExternalServiceUnavailable(
+                    target, f"{target} {operation} 제한 시간 안에 재시도할 수 없습니다: {e}", delay
+                ) from e
+
+            EXTERNAL_CALL_RETRIES.labels(target, operation).inc()
+            print(f"⚠️ {target} {operation} 실패 ({e}), {delay:.2f}초 후 재시도 ({attempt}/{attempts - 1})")
+            time.sleep(delay)
+            continue
+
+        breaker.record_success()
+        return result
+
+
+def retry_after_header(error: ExternalServiceUnavailable):
+    """503 응답에 붙일 Retry-After 헤더"""
+    if error.retry_after is None:
+        return None
+    return {"Retry-After": str(max(1, math.ceil(error.retry_after)))}
@@ -1,16 +1,34 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from sqlalchemy import text
 
 from app.api.api import api_router
-from app.core.database import engine, Base
-from app.models import user, service, email, user_service
+from app.core.config import settings
+from app.core.database import engine, get_async_engine, dispose_engines
+from app.core.init_db import init_db
+from app.core.metrics import init_tracing, instrument_engine, metrics_middleware
+from app.services.job_service import job_service
+from app.models import user, service, email, user_service, sync_state, classification_cache, policy_evaluation, risk_summary
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 스키마 생성은 `python -m app.core.init_db`로 따로 실행합니다. (개발 편의용 옵션만 제공)
+    if settings.DB_CREATE_TABLES_ON_STARTUP:
+        init_db()
+    init_tracing()
+    yield
+    job_service.shutdown()
+    await dispose_engines()
 
 app = FastAPI(
     title="Mai1 Security Service",
     description="이메일 분석을 통한 가입 서비스 보안 평가 서비스",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 origins = [
@@ -26,8 +44,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.METRICS_ENABLED:
+    # 라우트별 요청 시간 + 요청당 DB 쿼리 수/시간 (GET /metrics)
+    instrument_engine(engine)
+    if settings.DB_ASYNC_ENABLED:
+        instrument_engine(get_async_engine().sync_engine)
+    app.middleware("http")(metrics_middleware)
+
 @app.get("/")
 def read_root():
     return {"status": "success", "message": "Mai1 API Server is running!"}
 
-app.include_router(api_router, prefix="/api")
\ No newline at end of file
+@app.get("/healthz")
+def liveness():
+    """프로세스가 살아 있는지만 확인 (외부 의존성 확인 없음)"""
+    return {"status": "success", "message": "alive"}
+
+def _check_db():
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+@app.get("/readyz")
+async def readiness():
+    """DB에 연결할 수 있어야 트래픽을 받을 준비가 된 것으로 봅니다."""
+    try:
+        if settings.DB_ASYNC_ENABLED:
+            async with get_async_engine().connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        else:
+            # 동기 엔진은 이벤트 루프를 막지 않도록 스레드풀에서 확인
+            await run_in_threadpool(_check_db)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"DB 연결 실패: {e}")
+
+    return {"status": "success", "message": "ready"}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus 텍스트 형식의 메트릭"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="메트릭이 비활성화되어 있습니다.")
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+app.include_router(api_router, prefix="/api")
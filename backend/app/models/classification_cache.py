@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.core.database import Base
+
+class ClassificationCache(Base):
+    __tablename__ = "classification_cache"
+
+    # sha256(발송 도메인 + 정규화된 제목 템플릿)
+    fingerprint = Column(String(64), primary_key=True)
+    sender_domain = Column(String(255))
+    subject_template = Column(String(255))
+
+    # REGISTER, OTHER
+    classification = Column(String(50), nullable=False)
+    hit_count = Column(Integer, default=0)
+
+    created_at = Column(DateTime, nullable=False, index=True)
+    last_hit_at = Column(DateTime, nullable=False, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -14,10 +14,21 @@ class Email(Base):
     sender = Column(String(255))
     subject = Column(String(255))
     snippet = Column(Text)
+    # 본문 포함 동기화 때만 채우는 본문 앞부분 (기본 동기화는 metadata 형식이라 NULL)
+    body_excerpt = Column(Text, nullable=True)
     received_at = Column(DateTime)
     
     # REGISTER, OTHER
     classification = Column(String(50), default="OTHER") 
+    # 분류 출처: RULE(규칙 기반), CACHE(분류 캐시), LLM
+    classification_source = Column(String(10), nullable=True)
+
+    # GET /api/emails 키셋 페이지네이션: (received_at, email_id) 순서 + 사용자/분류 필터
+    __table_args__ = (
+        Index("ix_emails_received", "received_at", "email_id"),
+        Index("ix_emails_user_received", "user_id", "received_at", "email_id"),
+        Index("ix_emails_class_received", "classification", "received_at", "email_id"),
+    )
 
     owner = relationship("User", back_populates="emails")
     related_service_link = relationship("UserService", back_populates="email_evidence", uselist=False)
\ No newline at end of file
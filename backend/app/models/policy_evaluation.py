@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Float, UniqueConstraint
+from app.core.database import Base
+
+class PolicyEvaluationCache(Base):
+    __tablename__ = "policy_evaluation_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # sha256(정규화된 약관 텍스트), 체크리스트가 바뀌면 이전 결과는 재사용하지 않습니다.
+    content_hash = Column(String(64), nullable=False)
+    checklist_version = Column(String(64), nullable=False)
+
+    risk_level = Column(String(10), nullable=False)
+    security_score = Column(Float, nullable=False)
+    security_report = Column(Text, nullable=True)
+    # 항목별 판정 근거 목록(JSON) - 긴 약관은 근거를 찾은 섹션 번호/제목 포함
+    evidence = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("content_hash", "checklist_version", name="uq_policy_eval_hash_version"),
+    )
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from app.core.database import Base
+
+class UserRiskSummary(Base):
+    __tablename__ = "user_risk_summaries"
+
+    # 사용자별 가입 서비스 등급 집계 (대시보드 보안 점수/등급별 개수)
+    # 서비스 연결 추가, 관리자 등급 변경 시 증감으로 갱신합니다. (risk_summary_service 참고)
+    user_id = Column(Integer, ForeignKey("users.user_id"), primary_key=True)
+
+    service_count = Column(Integer, nullable=False, default=0)
+    grade_a_count = Column(Integer, nullable=False, default=0)
+    grade_b_count = Column(Integer, nullable=False, default=0)
+    grade_c_count = Column(Integer, nullable=False, default=0)
+    grade_d_count = Column(Integer, nullable=False, default=0)
+    grade_f_count = Column(Integer, nullable=False, default=0)
+    unrated_count = Column(Integer, nullable=False, default=0)
+
+    # 평가된 서비스의 등급 점수 합 (A=100, B=80, C=60, D=40, F=20), 평균은 조회 시 계산
+    score_sum = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, nullable=True)
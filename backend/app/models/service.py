@@ -8,7 +8,9 @@ class Service(Base):
     service_id = Column(Integer, primary_key=True, index=True)
     service_name = Column(String(100), nullable=False)
     domain = Column(String(255), index=True)
-    risk_level = Column(String(10), nullable=True)
+    risk_level = Column(String(10), nullable=True, index=True)
+    # 정렬용 숫자 등급 (A=1 ... F=5, 미평가/Unrated는 NULL)
+    risk_rank = Column(Integer, nullable=True, index=True)
     security_score = Column(Float, nullable=True)
     security_report = Column(Text, nullable=True)
     
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from app.core.database import Base
+
+class GmailSyncState(Base):
+    __tablename__ = "gmail_sync_states"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)
+
+    # 검색 조건(q)마다 커서를 따로 관리합니다. (sha256 hex)
+    query_hash = Column(String(64), nullable=False)
+    history_id = Column(String(32), nullable=True)
+    last_synced_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "query_hash", name="uq_gmail_sync_user_query"),
+    )
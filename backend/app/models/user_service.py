@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Date, String
+from sqlalchemy import Column, Integer, ForeignKey, Date, String, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -13,6 +13,12 @@ class UserService(Base):
     subscription_date = Column(Date, nullable=True)
     status = Column(String(20), default="Active")
 
+    __table_args__ = (
+        UniqueConstraint("user_id", "service_id", name="uq_user_service"),
+        # 내 서비스 목록: user_id 필터 + 가입일 정렬
+        Index("ix_user_services_user_subscribed", "user_id", "subscription_date"),
+    )
+
     user = relationship("User", back_populates="user_services")
     service = relationship("Service", back_populates="user_services")
     email_evidence = relationship("Email", back_populates="related_service_link")
\ No newline at end of file
@@ -5,6 +5,13 @@ from datetime import datetime
 class ServiceUpdate(BaseModel):
     risk_level: str
 
+class PolicyItemEvidence(BaseModel):
+    item: str
+    result: str  # PASS, FAIL, N/A
+    evidence: Optional[str] = None
+    section: Optional[int] = None  # 긴 약관을 섹션별로 평가했을 때 근거를 찾은 섹션 번호
+    section_title: Optional[str] = None
+
 class ServiceEvaluationResponse(BaseModel):
     service_id: int
     service_name: str
@@ -12,6 +19,18 @@ class ServiceEvaluationResponse(BaseModel):
     security_score: float
     security_report: str
     evaluated_at: datetime
+    cached: bool = False  # 같은 약관의 이전 평가 결과를 재사용했는지 여부
+    evidence: Optional[List[PolicyItemEvidence]] = None
+
+class BulkEvaluationItem(BaseModel):
+    service_id: int
+    content: Optional[str] = None  # 비우면 로컬 약관 저장소(POLICY_STORE_DIR)에서 읽음
+
+class BulkEvaluationRequest(BaseModel):
+    items: List[BulkEvaluationItem] = []
+    all_pending: bool = False  # True면 미평가(PENDING) 서비스를 모두 포함
+    force: bool = False
+    concurrency: Optional[int] = None  # 비우면 BULK_EVALUATION_CONCURRENCY
 
 class AdminServiceResponse(BaseModel):
     service_id: int
@@ -46,5 +65,14 @@ class AdminUserResponse(BaseModel):
         from_attributes = True
 
 class AdminUserListResponse(BaseModel):
-    total_count: int
-    users: List[AdminUserResponse]
\ No newline at end of file
+    total_count: Optional[int] = None  # include_total=false면 생략 (캐시된 근사값)
+    users: List[AdminUserResponse]
+    next_cursor: Optional[str] = None  # 다음 페이지 요청 시 cursor로 전달, 마지막 페이지면 None
+
+class CircuitBreakerState(BaseModel):
+    target: str  # iam, orchestrate, gmail
+    state: str  # CLOSED, OPEN, HALF_OPEN
+    consecutive_failures: int
+    failure_threshold: int
+    retry_in_seconds: Optional[float] = None  # OPEN일 때 다음 시험 호출까지 남은 시간
+    last_error: Optional[str] = None
@@ -15,19 +15,24 @@ class EmailCreate(EmailBase):
     classification: str = "UNCERTAIN"
 
 class EmailResponse(EmailBase):
+    received_at: Optional[datetime] = None  # Date 헤더 없이 저장된 메일은 NULL (목록 맨 뒤에 옵니다)
     email_id: int
     provider: str
     classification: str
+    classification_source: Optional[str] = None
 
     class Config:
         from_attributes = True
 
 class EmailListResponse(BaseModel):
-    total_count: int
+    total_count: Optional[int] = None  # include_total=false면 생략 (캐시된 근사값)
     emails: List[EmailResponse]
+    next_cursor: Optional[str] = None  # 다음 페이지 요청 시 cursor로 전달, 마지막 페이지면 None
 
 class EmailSyncRequest(BaseModel):
     search_query: str = "subject:가입 OR subject:welcome OR subject:verify"
-    limit: int = 50
+    limit: int = 50  # 전체 스캔 시 여러 페이지에 걸친 최대 조회 건수
+    full_sync: bool = False  # True면 historyId 커서를 무시하고 전체 스캔
+    include_body: bool = False  # True면 본문 앞부분(GMAIL_BODY_MAX_BYTES)까지 받아 저장, 본문 없이 저장된 메일도 보강 (기본은 제목/발신자/날짜 헤더만)
     start_date: Optional[str] = None # YYYY-MM-DD
     end_date: Optional[str] = None   # YYYY-MM-DD
\ No newline at end of file
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Optional, List, Any
+from datetime import datetime
+
+class JobResponse(BaseModel):
+    job_id: str
+    job_type: str  # EMAIL_SYNC, EMAIL_CLASSIFY
+    status: str    # QUEUED, RUNNING, SUCCEEDED, FAILED
+    progress: float
+    message: Optional[str] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class JobListResponse(BaseModel):
+    total_count: int
+    jobs: List[JobResponse]
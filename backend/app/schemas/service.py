@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional, List
-from datetime import date
+from typing import Optional, List, Dict
+from datetime import date, datetime
 
 class ServiceBase(BaseModel):
     service_name: str
@@ -18,4 +18,17 @@ class UserServiceResponse(ServiceBase):
 
 class UserServiceListResponse(BaseModel):
     total_count: int
-    services: List[UserServiceResponse]
\ No newline at end of file
+    services: List[UserServiceResponse]
+    has_more: bool = False
+
+class RiskSummaryResponse(BaseModel):
+    user_id: int
+    service_count: int
+    rated_count: int
+    grade_counts: Dict[str, int]  # A, B, C, D, F, Unrated
+    safe_count: int  # A, B
+    warning_count: int  # C, D
+    danger_count: int  # F
+    score: int  # 평가된 서비스의 평균 점수 (A=100 ... F=20)
+    grade: Optional[str] = None  # 평가된 서비스가 없으면 None
+    updated_at: Optional[datetime] = None
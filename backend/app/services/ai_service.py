@@ -1,115 +1,397 @@
 import sys
 import os
+import re
 import json
 import shutil
+import hashlib
+import unicodedata
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from sqlalchemy.orm import Session
 from datetime import datetime
 
+from app.core.config import settings
+from app.core.database import insert_ignore
+from app.core import resilience
+from app.core.resilience import ExternalServiceUnavailable
+from app.core.metrics import background_context
 from app.models.email import Email
+from app.models.policy_evaluation import PolicyEvaluationCache
 from app.models.service import Service
 from app.models.user_service import UserService
+from app.services.classification_cache_service import classification_cache_service
+from app.services.domain_index import domain_index
+from app.services.risk_summary_service import risk_summary_service
+from app.services.rule_classifier import rule_classifier, RULE_SOURCE
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
+AI_PACKAGE_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
 
-try:
-    from ai.AI import classifier, call_privacy_evaluate
-except ImportError:
-    print("Warning: ai.AI module not found. Using dummy functions.")
-    def classifier(data): return {"results": []}
-    def call_privacy_evaluate(path, name): 
+
+class _DummyAI:
+    """ai.AI 모듈을 불러올 수 없을 때 사용하는 대체 구현"""
+
+    @staticmethod
+    def classifier(data, stream=False): return {"results": []}
+
+    @staticmethod
+    def call_privacy_evaluate_text(privacy_text, name): 
         return {'name': name, 'score': 0.5, 'missing': 'AI module not connected'}
 
+    @staticmethod
+    def read_policy_stream(stream, max_bytes):
+        data = stream.read(max_bytes + 1)
+        if len(data) > max_bytes:
+            raise ValueError(f"약관 크기가 최대 {max_bytes}바이트를 초과합니다.")
+        return data.decode("utf-8")
+
+    @staticmethod
+    def get_checklist_titles(): return []
+
+
+_ai_module = None
+
+
+def load_ai():
+    """
+    ai.AI(requests, IBM 비밀 설정)는 서버 시작 시점이 아니라 첫 AI 호출 때 불러옵니다.
+    """
+    global _ai_module
+    if _ai_module is None:
+        if AI_PACKAGE_ROOT not in sys.path:
+            sys.path.append(AI_PACKAGE_ROOT)
+        try:
+            from ai import AI as module
+            module.set_call_runner(resilience.call)
+        except ImportError:
+            print("Warning: ai.AI module not found. Using dummy functions.")
+            module = _DummyAI
+        _ai_module = module
+    return _ai_module
+
+_INLINE_SPACE_PATTERN = re.compile(r"[ \t\u00a0\u3000]+")
+_BLANK_LINES_PATTERN = re.compile(r"\n{2,}")
+
+
+def normalize_policy_text(text: str):
+    """줄바꿈/공백 차이만 있는 같은 약관이 같은 해시를 갖도록 정규화합니다."""
+    text = unicodedata.normalize("NFC", text or "").replace("\r\n", "\n").replace("\r", "\n")
+    lines = [_INLINE_SPACE_PATTERN.sub(" ", line).strip() for line in text.split("\n")]
+    return _BLANK_LINES_PATTERN.sub("\n\n", "\n".join(lines)).strip()
+
+
+def policy_content_hash(text: str):
+    return hashlib.sha256(normalize_policy_text(text).encode("utf-8")).hexdigest()
+
+
+def privacy_checklist_version():
+    if settings.PRIVACY_CHECKLIST_VERSION:
+        return settings.PRIVACY_CHECKLIST_VERSION
+    titles = json.dumps(load_ai().get_checklist_titles(), ensure_ascii=False)
+    return hashlib.sha256(titles.encode("utf-8")).hexdigest()[:16]
+
 class AIService:
-    def process_email_classification(self, db: Session, email_list: list):
+    def process_email_classification(self, db: Session, email_list: list, progress=None):
+        """
+        1. 키워드 규칙 + 등록된 서비스 도메인으로 확신도가 높은 메일은 로컬에서 분류 (RULE)
+        2. 분류 캐시(발송 도메인 + 제목 템플릿)에 있는 메일은 캐시 결과 사용 (CACHE)
+        3. 나머지를 AI_CLASSIFY_CHUNK_SIZE개씩 나눠 AI_CLASSIFY_CONCURRENCY개까지 동시에 분류하고 캐시에 저장 (LLM)
+           (본문 포함 동기화로 body_excerpt가 저장된 메일은 본문 앞부분도 함께 전달)
+        4. Emails 테이블에 classification 결과와 출처를 일괄 업데이트
+        5. 'REGISTER'인 경우 발송자 도메인과 Services 테이블 매칭
+        6. 매칭되면 UserServices 테이블에 관계를 일괄 생성 (이미 있으면 건너뜀)
+        배치 크기와 관계없이 DB 왕복 횟수는 일정합니다.
+        실패한 청크(호출 오류, JSON 파싱 오류)나 응답에서 빠진 메일의 ID는 failed_ids로 반환합니다.
+        """
+
+        decisions, uncached = self._local_decisions(db, email_list)
+
+        llm_decisions, failed_ids = self._classify_in_chunks(uncached, progress)
+        classification_cache_service.store(db, uncached, llm_decisions)
+        decisions.update({email_id: (c, "LLM") for email_id, c in llm_decisions.items()})
+
+        self._apply_classifications(db, decisions)
+        db.commit()
+
+        final_results = [
+            {"id": email_id, "classification": classification, "source": source}
+            for email_id, (classification, source) in decisions.items()
+        ]
+        return {
+            "results": final_results,
+            "failed_ids": failed_ids
+        }
+
+    def stream_email_classification(self, db: Session, email_list: list):
         """
-        1. AI로 메일 분류
-        2. Emails 테이블에 classification 결과 업데이트
-        3. 'REGISTER'인 경우 발송자 도메인과 Services 테이블 매칭
-        4. 매칭되면 UserServices 테이블에 관계 생성
+        process_email_classification과 같은 단계를 거치되, 결과를 끝날 때마다 이벤트(dict)로 내보냅니다.
+        - start: 전체 메일 수와 LLM으로 보낼 청크 수
+        - result: 메일 하나의 분류 결과와 연결된 서비스 (규칙/캐시 결과는 LLM 호출 전에 바로)
+        - failed: 분류하지 못한 청크의 메일 ID와 오류
+        - done: 요약
+        LLM 청크는 끝나는 순서대로 DB에 반영/커밋하므로 첫 결과까지의 시간은 청크 하나의 지연 시간입니다.
         """
+        decisions, uncached = self._local_decisions(db, email_list)
+        chunk_size = max(1, settings.AI_CLASSIFY_CHUNK_SIZE)
+        yield {
+            "event": "start",
+            "total": len(email_list),
+            "local": len(decisions),
+            "llm_chunks": (len(uncached) + chunk_size - 1) // chunk_size
+        }
+
+        services = self._apply_classifications(db, decisions)
+        db.commit()
+        for event in self._result_events(decisions, services):
+            yield event
+
+        classified = len(decisions)
+        failed_ids = []
+        for chunk, chunk_decisions, error in self._iter_llm_chunks(uncached):
+            chunk_ids = [email["id"] for email in chunk]
+            if error is not None:
+                failed_ids.extend(chunk_ids)
+                yield {"event": "failed", "ids": chunk_ids, "error": str(error)}
+                continue
+
+            missing = [email_id for email_id in chunk_ids if email_id not in chunk_decisions]
+            classification_cache_service.store(db, chunk, chunk_decisions)
+            chunk_results = {email_id: (c, "LLM") for email_id, c in chunk_decisions.items() if email_id in chunk_ids}
+            services = self._apply_classifications(db, chunk_results)
+            db.commit()
+
+            classified += len(chunk_results)
+            for event in self._result_events(chunk_results, services):
+                yield event
+            if missing:
+                failed_ids.extend(missing)
+                yield {"event": "failed", "ids": missing, "error": "AI 응답에 분류 결과가 없습니다."}
+
+        yield {"event": "done", "total": len(email_list), "classified": classified, "failed_ids": failed_ids}
+
+    def _result_events(self, decisions: dict, services: dict):
+        for email_id, (classification, source) in decisions.items():
+            yield {
+                "event": "result",
+                "id": email_id,
+                "classification": classification,
+                "source": source,
+                "service": services.get(email_id)
+            }
+
+    def _local_decisions(self, db: Session, email_list: list):
+        """
+        LLM 없이 정할 수 있는 분류: 키워드 규칙(RULE) -> 분류 캐시(CACHE).
+        ({email_id: (classification, source)}, LLM으로 보낼 메일 목록)을 반환합니다.
+        """
+        decisions = {}
+
+        remaining = email_list
+        if settings.RULE_CLASSIFIER_ENABLED:
+            rule_decisions, remaining = rule_classifier.classify(
+                email_list, domain_index.known_domains(db), settings.RULE_CLASSIFIER_THRESHOLD
+            )
+            decisions.update({email_id: (c, RULE_SOURCE) for email_id, c in rule_decisions.items()})
+
+        cached_decisions = classification_cache_service.lookup(db, remaining)
+        decisions.update({email_id: (c, "CACHE") for email_id, c in cached_decisions.items()})
+        uncached = [email for email in remaining if email["id"] not in cached_decisions]
+        return decisions, self._with_body_excerpts(db, uncached)
+
+    def _with_body_excerpts(self, db: Session, email_list: list):
+        """본문 포함 동기화(include_body)로 저장된 본문 앞부분이 있으면 LLM 입력에 함께 넣습니다. (IN 쿼리 1회)"""
+        if not email_list:
+            return email_list
+
+        excerpts = dict(
+            db.query(Email.email_id, Email.body_excerpt)
+            .filter(Email.email_id.in_([email["id"] for email in email_list]), Email.body_excerpt.isnot(None))
+            .all()
+        )
+        if not excerpts:
+            return email_list
+        return [dict(email, body_excerpt=excerpts[email["id"]]) if email["id"] in excerpts else email
+                for email in email_list]
+
+    def _iter_llm_chunks(self, email_list: list):
+        """
+        AI_CLASSIFY_CHUNK_SIZE개씩 나눈 청크를 AI_CLASSIFY_CONCURRENCY개까지 동시에 분류하고,
+        끝나는 순서대로 (chunk, {email_id: classification}, error)를 내보냅니다.
+        """
+        chunk_size = max(1, settings.AI_CLASSIFY_CHUNK_SIZE)
+        chunks = [email_list[i:i + chunk_size] for i in range(0, len(email_list), chunk_size)]
+        if not chunks:
+            return
+
+        max_workers = max(1, min(settings.AI_CLASSIFY_CONCURRENCY, len(chunks)))
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            # 청크 스레드마다 현재 context를 복사해 LLM 호출 span이 요청/작업 span 아래에 이어지도록 합니다.
+            futures = {
+                pool.submit(background_context().run, self._classify_chunk, chunk): chunk
+                for chunk in chunks
+            }
+
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    chunk_decisions = future.result()
+                except Exception as e:
+                    print(f"AI Classification Chunk Error ({len(chunk)}건): {e}")
+                    yield chunk, {}, e
+                    continue
+                yield chunk, chunk_decisions, None
+        finally:
+            # 스트리밍 중 클라이언트가 끊기면 아직 시작하지 않은 청크는 호출하지 않습니다.
+            pool.shutdown(wait=True, cancel_futures=True)
 
+    def _classify_in_chunks(self, email_list: list, progress=None):
+        chunk_size = max(1, settings.AI_CLASSIFY_CHUNK_SIZE)
+        total_chunks = (len(email_list) + chunk_size - 1) // chunk_size
+
+        decisions = {}
+        failed_ids = []
+        for done, (chunk, chunk_decisions, error) in enumerate(self._iter_llm_chunks(email_list), start=1):
+            if progress:
+                progress(done, total_chunks, f"LLM 분류 {done}/{total_chunks} 청크 완료")
+            for email in chunk:
+                email_id = email["id"]
+                if email_id in chunk_decisions:
+                    decisions[email_id] = chunk_decisions[email_id]
+                else:
+                    failed_ids.append(email_id)
+
+        return decisions, failed_ids
+
+    def _classify_chunk(self, chunk: list):
+        """청크 하나를 classifier()로 분류해 {email_id: classification}을 반환합니다."""
         ai_input = {"emails": []}
-        for email in email_list:
-            ai_input["emails"].append({
+        for email in chunk:
+            item = {
                 "id": email["id"],
                 "subject": email["subject"],
                 "sender": email["sender"]
-            })
+            }
+            if email.get("body_excerpt"):
+                item["body"] = email["body_excerpt"]
+            ai_input["emails"].append(item)
 
-        ai_response = classifier(ai_input)
+        ai_response = load_ai().classifier(ai_input, stream=settings.AI_CLASSIFY_STREAM)
 
         if isinstance(ai_response, str):
+            clean_response = ai_response.replace("```json", "").replace("```", "").strip()
             try:
-                clean_response = ai_response.replace("```json", "").replace("```", "").strip()
                 ai_response = json.loads(clean_response)
             except json.JSONDecodeError:
-                print(f"JSON Parsing Error: {ai_response}")
-                return []
+                raise ValueError(f"JSON Parsing Error: {ai_response}")
 
-        raw_results = ai_response.get("results", [])
-        final_results = []
+        # LLM이 id를 문자열("12")로 돌려주는 경우가 많아 정수로 맞추고, 청크에 없는 id는 버립니다.
+        chunk_ids = {email["id"] for email in chunk}
+        chunk_decisions = {}
+        for item in ai_response.get("results", []):
+            if not isinstance(item, dict): continue
 
-        for item in raw_results:
-            if isinstance(item, str): continue
+            try:
+                email_id = int(item.get("id"))
+            except (TypeError, ValueError):
+                continue
+            if email_id not in chunk_ids:
+                continue
 
-            email_id = item.get("id")
             signup_yn = item.get("signup")
-            classification = "REGISTER" if signup_yn == "Y" else "OTHER"
-            
-            email_obj = db.query(Email).filter(Email.email_id == email_id).first()
-            if email_obj:
-                email_obj.classification = classification
-                
-                if classification == "REGISTER":
-                    self._link_user_to_service(db, email_obj)
-
-            final_results.append({
-                "id": email_id,
-                "classification": classification
-            })
-        
-        db.commit()
-        return final_results
+            chunk_decisions[email_id] = "REGISTER" if signup_yn == "Y" else "OTHER"
 
-    def _link_user_to_service(self, db: Session, email: Email):
-        sender_email = email.sender
-        if not sender_email or "@" not in sender_email:
-            return
+        return chunk_decisions
+
+    def _apply_classifications(self, db: Session, decisions: dict):
+        """
+        {email_id: (classification, source)}를 DB에 반영합니다.
+        - 대상 메일 조회: IN 쿼리 1회
+        - 분류 업데이트: (classification, source) 조합마다 UPDATE ... WHERE email_id IN (...) 1회
+        - REGISTER 메일의 서비스 연결: 기존 연결 조회 1회 + INSERT IGNORE 1회 + 연결이 추가된 사용자의 위험도 집계 재계산
+        서비스와 매칭된 REGISTER 메일의 {email_id: {"service_id", "service_name"}}을 반환합니다.
+        """
+        if not decisions:
+            return {}
+
+        emails = db.query(Email.email_id, Email.user_id, Email.sender, Email.received_at) \
+            .filter(Email.email_id.in_(list(decisions.keys()))) \
+            .all()
+        if not emails:
+            return {}
+
+        groups = defaultdict(list)
+        for email in emails:
+            groups[decisions[email.email_id]].append(email.email_id)
+
+        for (classification, source), email_ids in groups.items():
+            db.query(Email).filter(Email.email_id.in_(email_ids)).update({
+                Email.classification: classification,
+                Email.classification_source: source
+            }, synchronize_session=False)
+
+        register_emails = [email for email in emails if decisions[email.email_id][0] == "REGISTER"]
+        return self._link_users_to_services(db, register_emails)
+
+    def _link_users_to_services(self, db: Session, emails: list):
+        if not emails:
+            return {}
+
+        matches = domain_index.match_many(db, [email.sender for email in emails])
+        services = {
+            email.email_id: {"service_id": matches[email.sender][0], "service_name": matches[email.sender][1]}
+            for email in emails if email.sender in matches
+        }
+
+        # 같은 (user, service)에 여러 메일이 있으면 가장 먼저 받은 메일을 근거로 사용합니다.
+        links = {}
+        for email in sorted(emails, key=lambda e: (e.received_at is None, e.received_at or datetime.min)):
+            match = matches.get(email.sender)
+            if not match:
+                continue
+            service_id = match[0]
+            if (email.user_id, service_id) in links:
+                continue
+            links[(email.user_id, service_id)] = {
+                "user_id": email.user_id,
+                "service_id": service_id,
+                "email_id": email.email_id,
+                "subscription_date": email.received_at.date() if email.received_at else datetime.now().date(),
+                "status": "Active"
+            }
+
+        if not links:
+            return services
+
+        # 이미 있는 연결은 위험도 집계에 다시 더하지 않도록 제외합니다.
+        user_ids = {user_id for user_id, _ in links}
+        service_ids = {service_id for _, service_id in links}
+        existing = db.query(UserService.user_id, UserService.service_id) \
+            .filter(UserService.user_id.in_(user_ids), UserService.service_id.in_(service_ids)) \
+            .all()
+        for pair in existing:
+            links.pop((pair.user_id, pair.service_id), None)
+        if not links:
+            return services
+
+        insert_ignore(db, UserService, list(links.values()))
+        for link in links.values():
+            print(f"[매칭 성공] {link['user_id']}번 유저 -> {services[link['email_id']]['service_name']} 서비스 연결됨")
+
+        risk_summary_service.add_links(db, {user_id for user_id, _ in links})
+        return services
 
-        domain_part = sender_email.split("@")[1].lower()
-        matched_service = db.query(Service).filter(Service.domain != None).all()
-        
-        target_service = None
-        for service in matched_service:
-            if service.domain in domain_part:
-                target_service = service
-                break
-        
-        if target_service:
-            existing_link = db.query(UserService).filter(
-                UserService.user_id == email.user_id,
-                UserService.service_id == target_service.service_id
-            ).first()
-
-            if not existing_link:
-                new_link = UserService(
-                    user_id=email.user_id,
-                    service_id=target_service.service_id,
-                    email_id=email.email_id,
-                    subscription_date=email.received_at.date() if email.received_at else datetime.now().date(),
-                    status="Active"
-                )
-                db.add(new_link)
-                print(f"[매칭 성공] {email.user_id}번 유저 -> {target_service.service_name} 서비스 연결됨")
-
-    def evaluate_service_security(self, file_path: str, service_name: str):
-        """
-        저장된 약관 파일 경로와 서비스명을 받아 AI 평가(call_privacy_evaluate)를 수행합니다.
-        """
-        print(f"🔍 Analyzing Privacy Policy: {file_path} for {service_name}")
+    def read_policy_upload(self, stream):
+        """업로드 스트림을 POLICY_MAX_BYTES까지 조금씩 읽어 약관 텍스트로 디코딩합니다. (업로드 파일을 따로 저장하지 않음)"""
+        return load_ai().read_policy_stream(stream, settings.POLICY_MAX_BYTES)
+
+    def evaluate_service_security(self, policy_text: str, service_name: str):
+        """
+        약관 텍스트와 서비스명을 받아 AI 평가(call_privacy_evaluate_text)를 수행합니다.
+        """
+        print(f"🔍 Analyzing Privacy Policy: {len(policy_text)} chars for {service_name}")
 
         try:
-            result = call_privacy_evaluate(file_path, service_name)
+            result = load_ai().call_privacy_evaluate_text(policy_text, service_name)
             
             score = float(result.get("score", 0.0))
             missing_info = result.get("missing", "")
@@ -123,9 +405,13 @@ class AIService:
             return {
                 "grade": grade,
                 "score": score,
-                "report": missing_info
+                "report": missing_info,
+                "evidence": result.get("evidence")
             }
 
+        except ExternalServiceUnavailable:
+            # Orchestrate 장애는 평가 실패(Unrated)로 기록하지 않고 올려 보내 기존 등급을 유지합니다.
+            raise
         except Exception as e:
             print(f"Privacy Evaluation Error: {e}")
             return {
@@ -134,4 +420,91 @@ class AIService:
                 "report": f"AI evaluation failed: {str(e)}"
             }
 
+    def evaluate_and_apply(self, db: Session, service: Service, policy_text: str, force: bool = False,
+                           keep_grade_on_failure: bool = False):
+        """
+        약관을 평가(같은 약관의 이전 결과가 있으면 재사용)하고 서비스 등급에 반영한 뒤 커밋합니다.
+        keep_grade_on_failure면 평가 실패(Unrated)를 반영하지 않고 기존 등급을 그대로 둡니다.
+        반환값에는 cached(이전 결과 재사용 여부)가 포함됩니다.
+        """
+        content_hash = policy_content_hash(policy_text)
+        eval_result = None if force else self.get_cached_evaluation(db, content_hash)
+        is_cached = eval_result is not None
+
+        if not is_cached:
+            print(f"Calling AI Evaluation for {service.service_name}")
+            eval_result = self.evaluate_service_security(policy_text, service.service_name)
+            self.store_evaluation(db, content_hash, eval_result)
+        else:
+            print(f"♻️ Reusing cached evaluation for {service.service_name} ({content_hash[:12]})")
+
+        if keep_grade_on_failure and eval_result["grade"] == "Unrated":
+            return dict(eval_result, cached=is_cached)
+
+        risk_summary_service.apply_grade(db, service, eval_result["grade"])
+        service.security_score = eval_result["score"]
+        service.security_report = eval_result["report"]
+        service.evaluated_at = datetime.now()
+
+        db.commit()
+        domain_index.invalidate()
+
+        return dict(eval_result, cached=is_cached)
+
+    def load_stored_policy(self, service: Service):
+        """
+        로컬 약관 저장소(POLICY_STORE_DIR)에서 '{service_id}.txt' 또는 '{domain}.txt'를 찾아 읽습니다.
+        없으면 None을 반환합니다.
+        """
+        candidates = [f"{service.service_id}.txt"]
+        if service.domain:
+            candidates.append(f"{service.domain.strip().lower()}.txt")
+
+        for filename in candidates:
+            path = os.path.join(settings.POLICY_STORE_DIR, filename)
+            if os.path.isfile(path):
+                with open(path, "rb") as f:
+                    return self.read_policy_upload(f)
+        return None
+
+    def get_cached_evaluation(self, db: Session, content_hash: str):
+        """같은 약관(정규화 후 해시)과 체크리스트 버전으로 평가한 결과가 있으면 반환합니다."""
+        cached = db.query(PolicyEvaluationCache).filter(
+            PolicyEvaluationCache.content_hash == content_hash,
+            PolicyEvaluationCache.checklist_version == privacy_checklist_version()
+        ).first()
+        if not cached:
+            return None
+
+        return {
+            "grade": cached.risk_level,
+            "score": cached.security_score,
+            "report": cached.security_report,
+            "evidence": json.loads(cached.evidence) if cached.evidence else None
+        }
+
+    def store_evaluation(self, db: Session, content_hash: str, eval_result: dict):
+        """
+        평가 결과를 캐시에 저장합니다. AI 평가 실패(Unrated)는 저장하지 않습니다.
+        같은 약관을 동시에 평가한 요청(일괄 평가 등)이 먼저 저장했어도 UNIQUE 충돌 없이 최신 결과로 덮어씁니다.
+        """
+        if eval_result["grade"] == "Unrated":
+            return
+
+        version = privacy_checklist_version()
+        values = {
+            "risk_level": eval_result["grade"],
+            "security_score": eval_result["score"],
+            "security_report": eval_result["report"],
+            "evidence": json.dumps(eval_result.get("evidence"), ensure_ascii=False) if eval_result.get("evidence") else None,
+            "created_at": datetime.now()
+        }
+
+        # 행이 없을 때만 INSERT (content_hash + checklist_version 충돌 무시), 있으면 아래 UPDATE가 덮어씁니다.
+        insert_ignore(db, PolicyEvaluationCache, [dict(values, content_hash=content_hash, checklist_version=version)])
+        db.query(PolicyEvaluationCache).filter(
+            PolicyEvaluationCache.content_hash == content_hash,
+            PolicyEvaluationCache.checklist_version == version
+        ).update(values, synchronize_session=False)
+
 ai_service = AIService()
\ No newline at end of file
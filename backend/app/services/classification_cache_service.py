@@ -0,0 +1,173 @@
+import re
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import insert_ignore
+from app.models.classification_cache import ClassificationCache
+from app.services.sender import sender_host, registrable_domain
+
+_EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(\.[\w-]+)+")
+_URL_PATTERN = re.compile(r"https?://\S+")
+_DIGIT_PATTERN = re.compile(r"\d+")
+_SPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_subject(subject: str):
+    """
+    '[Netflix] 홍길동님, 가입을 환영합니다! (2024-01-05)' 같은 제목에서
+    메일 주소, URL, 숫자를 치환해 같은 템플릿끼리 같은 문자열이 되도록 만듭니다.
+    """
+    text = (subject or "").lower()
+    text = _URL_PATTERN.sub("<url>", text)
+    text = _EMAIL_PATTERN.sub("<email>", text)
+    text = _DIGIT_PATTERN.sub("#", text)
+    text = _SPACE_PATTERN.sub(" ", text).strip(" .!?~-_:")
+    return text[:255]
+
+
+def classification_fingerprint(sender: str, subject: str):
+    domain = registrable_domain(sender_host(sender)) or ""
+    template = normalize_subject(subject)
+    fingerprint = hashlib.sha256(f"{domain}\n{template}".encode("utf-8")).hexdigest()
+    return fingerprint, domain, template
+
+
+class ClassificationCacheService:
+    """
+    (발송 도메인, 제목 템플릿) 단위로 LLM 분류 결과를 DB에 저장해 재사용합니다.
+    - TTL(CLASSIFICATION_CACHE_TTL_DAYS)이 지난 항목은 사용하지 않고 정리
+    - CLASSIFICATION_CACHE_MAX_ENTRIES를 넘으면 가장 오래 사용되지 않은 항목부터 삭제
+    - 프로세스 단위 hit/miss 카운터로 절약한 LLM 분류 건수를 확인
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, db: Session, email_list: list):
+        """캐시에 있는 메일의 {email_id: classification}을 반환합니다. (IN 쿼리 1회)"""
+        if not email_list:
+            return {}
+
+        fingerprints = {}
+        for email in email_list:
+            fingerprint, domain, _ = classification_fingerprint(email.get("sender"), email.get("subject"))
+            if domain:
+                fingerprints[email["id"]] = fingerprint
+        expire_before = datetime.now() - timedelta(days=settings.CLASSIFICATION_CACHE_TTL_DAYS)
+
+        entries = {
+            entry.fingerprint: entry.classification
+            for entry in db.query(ClassificationCache).filter(
+                ClassificationCache.fingerprint.in_(set(fingerprints.values())),
+                ClassificationCache.created_at >= expire_before
+            ).all()
+        }
+
+        cached = {
+            email_id: entries[fingerprint]
+            for email_id, fingerprint in fingerprints.items()
+            if fingerprint in entries
+        }
+
+        if entries:
+            db.query(ClassificationCache).filter(
+                ClassificationCache.fingerprint.in_(list(entries.keys()))
+            ).update({
+                ClassificationCache.hit_count: ClassificationCache.hit_count + 1,
+                ClassificationCache.last_hit_at: datetime.now()
+            }, synchronize_session=False)
+
+        with self._lock:
+            self.hits += len(cached)
+            self.misses += len(email_list) - len(cached)
+
+        return cached
+
+    def store(self, db: Session, email_list: list, decisions: dict):
+        """LLM이 분류한 결과를 캐시에 저장(갱신)하고 용량을 넘으면 정리합니다."""
+        now = datetime.now()
+        new_entries = {}
+        for email in email_list:
+            classification = decisions.get(email["id"])
+            if classification is None:
+                continue
+            fingerprint, domain, template = classification_fingerprint(email.get("sender"), email.get("subject"))
+            # 발송 도메인을 알 수 없으면 모든 발송자가 제목 템플릿 하나를 공유하게 되므로 저장하지 않습니다.
+            if not domain:
+                continue
+            new_entries[fingerprint] = (domain, template, classification)
+
+        if not new_entries:
+            return
+
+        existing = {
+            entry.fingerprint: entry
+            for entry in db.query(ClassificationCache).filter(
+                ClassificationCache.fingerprint.in_(list(new_entries.keys()))
+            ).all()
+        }
+
+        rows = []
+        for fingerprint, (domain, template, classification) in new_entries.items():
+            entry = existing.get(fingerprint)
+            if entry:
+                entry.classification = classification
+                entry.created_at = now
+                entry.last_hit_at = now
+            else:
+                rows.append({
+                    "fingerprint": fingerprint,
+                    "sender_domain": domain[:255],
+                    "subject_template": template,
+                    "classification": classification,
+                    "hit_count": 0,
+                    "created_at": now,
+                    "last_hit_at": now
+                })
+        db.flush()
+        # 비슷한 메일을 동시에 분류한 다른 요청이 먼저 저장했으면 그 항목을 그대로 둡니다. (fingerprint 충돌 무시)
+        insert_ignore(db, ClassificationCache, rows)
+
+        self._evict(db, now)
+
+    def _evict(self, db: Session, now: datetime):
+        expire_before = now - timedelta(days=settings.CLASSIFICATION_CACHE_TTL_DAYS)
+        db.query(ClassificationCache).filter(
+            ClassificationCache.created_at < expire_before
+        ).delete(synchronize_session=False)
+
+        overflow = db.query(func.count(ClassificationCache.fingerprint)).scalar() - settings.CLASSIFICATION_CACHE_MAX_ENTRIES
+        if overflow <= 0:
+            return
+
+        stale = [
+            row[0] for row in
+            db.query(ClassificationCache.fingerprint)
+            .order_by(ClassificationCache.last_hit_at.asc())
+            .limit(overflow)
+            .all()
+        ]
+        db.query(ClassificationCache).filter(
+            ClassificationCache.fingerprint.in_(stale)
+        ).delete(synchronize_session=False)
+
+    def stats(self, db: Session):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "llm_classifications_saved": hits,
+            "entries": db.query(func.count(ClassificationCache.fingerprint)).scalar()
+        }
+
+classification_cache_service = ClassificationCacheService()
@@ -0,0 +1,92 @@
+import time
+import threading
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.service import Service
+from app.services.sender import sender_host
+
+
+class DomainIndex:
+    """
+    services.domain으로 만든 프로세스 내 발송자 -> 서비스 매칭 인덱스.
+    - 'netflix.com'처럼 점이 있는 도메인은 접미사 사전에 넣고, 발송 호스트의 라벨을 하나씩 떼어 가며
+      가장 긴 접미사부터 찾습니다. (mailer.netflix.com -> netflix.com, O(라벨 수))
+    - 'netflix'처럼 점이 없는 값은 호스트의 라벨 중 하나와 일치하면 매칭합니다.
+    - 관리자 API에서 서비스가 바뀌면 invalidate()로 비우고, 다른 워커의 변경은 DOMAIN_INDEX_TTL_SECONDS 후 반영합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._suffixes = None
+        self._labels = None
+        self._loaded_at = 0.0
+
+    def invalidate(self):
+        with self._lock:
+            self._suffixes = None
+            self._labels = None
+
+    def _ensure_loaded(self, db: Session):
+        with self._lock:
+            fresh = time.monotonic() - self._loaded_at < settings.DOMAIN_INDEX_TTL_SECONDS
+            if self._suffixes is not None and fresh:
+                return self._suffixes, self._labels
+
+            suffixes = {}
+            labels = {}
+            rows = db.query(Service.service_id, Service.service_name, Service.domain) \
+                .filter(Service.domain != None) \
+                .order_by(Service.service_id.asc()) \
+                .all()
+            for service_id, service_name, domain in rows:
+                domain = (domain or "").strip().strip(".").lower()
+                if not domain:
+                    continue
+                target = suffixes if "." in domain else labels
+                target.setdefault(domain, (service_id, service_name))
+
+            self._suffixes, self._labels = suffixes, labels
+            self._loaded_at = time.monotonic()
+            return suffixes, labels
+
+    def _lookup(self, host: str, suffixes: dict, labels: dict):
+        parts = host.split(".")
+        for i in range(len(parts)):
+            match = suffixes.get(".".join(parts[i:]))
+            if match:
+                return match
+
+        # 최상위 도메인을 제외하고 오른쪽(등록 도메인에 가까운) 라벨부터 확인
+        for label in reversed(parts[:-1] or parts):
+            match = labels.get(label)
+            if match:
+                return match
+        return None
+
+    def match(self, db: Session, sender: str):
+        """발송자에 해당하는 (service_id, service_name)을 반환합니다. 없으면 None."""
+        host = sender_host(sender)
+        if not host:
+            return None
+
+        suffixes, labels = self._ensure_loaded(db)
+        return self._lookup(host, suffixes, labels)
+
+    def match_many(self, db: Session, senders: list):
+        """여러 발송자를 한 번에 매칭해 {sender: (service_id, service_name)}를 반환합니다."""
+        suffixes, labels = self._ensure_loaded(db)
+
+        matches = {}
+        for sender in set(senders):
+            host = sender_host(sender)
+            match = self._lookup(host, suffixes, labels) if host else None
+            if match:
+                matches[sender] = match
+        return matches
+
+    def known_domains(self, db: Session):
+        suffixes, labels = self._ensure_loaded(db)
+        return set(suffixes) | set(labels)
+
+domain_index = DomainIndex()
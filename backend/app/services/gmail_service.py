@@ -1,84 +1,503 @@
 import os.path
 import base64
+import json
+import hashlib
+import re
+import threading
+import time
 from datetime import datetime
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from email.utils import parsedate_to_datetime
 from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import insert_ignore
+from app.core import resilience
+from app.core.metrics import record_external_error
 from app.models.email import Email
+from app.models.sync_state import GmailSyncState
 from app.models.user import User
 
+# google-auth / googleapiclient는 import가 무거워 서버 시작 시점이 아니라 실제 Gmail 호출 때 불러옵니다.
+
 SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
 
+# Gmail 배치 엔드포인트가 한 번에 허용하는 최대 요청 수 (GMAIL_BATCH_SIZE의 상한)
+# 50개를 넘기면 동시 요청 rate limit(429)에 걸리기 쉬워 GMAIL_BATCH_SIZE 기본값은 50입니다.
+MAX_BATCH_SIZE = 100
+# messages().list / history().list 한 페이지의 최대 크기
+MAX_PAGE_SIZE = 500
+# 기본 동기화는 format='metadata'로 이 헤더와 snippet만 받습니다. (본문/첨부 정보 없이)
+METADATA_HEADERS = ['Subject', 'From', 'Date']
+
+_HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
 class GmailService:
+    """
+    사용자별 Gmail 클라이언트 캐시.
+    - 자격 증명은 메모리에 두고 만료됐을 때만 갱신하며, 토큰 파일은 갱신/최초 발급 시에만 원자적으로 씁니다.
+    - discovery 문서는 라이브러리에 포함된 정적 사본을 한 번만 읽어 재사용합니다.
+    - httplib2 기반 클라이언트는 스레드 안전하지 않으므로 (스레드, 사용자)마다 하나씩 만들어 재사용합니다.
+    """
+
     def __init__(self):
-        self.creds = None
         self.creds_file = "secret_credentials.json"
         self.token_file = "token.json"
+        self.token_dir = "tokens"
+
+        self._creds = {}
+        self._user_locks = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._discovery_doc = None
+
+    def _token_path(self, user_id: int):
+        # 1번(데모) 유저는 기존 token.json을 그대로 사용합니다.
+        if user_id == 1:
+            return self.token_file
+        return os.path.join(self.token_dir, f"token_{user_id}.json")
+
+    def _user_lock(self, user_id: int):
+        with self._lock:
+            return self._user_locks.setdefault(user_id, threading.Lock())
+
+    def _write_token(self, path: str, creds):
+        """임시 파일에 쓴 뒤 교체해 다른 워커가 반쯤 쓰인 토큰 파일을 읽지 않도록 합니다."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as token:
+            token.write(creds.to_json())
+        os.replace(tmp_path, path)
 
-    def authenticate(self):
+    def get_credentials(self, user_id: int = 1):
         """OAuth 2.0 인증 처리 (최초 1회 브라우저 로그인 필요)"""
-        if os.path.exists(self.token_file):
-            self.creds = Credentials.from_authorized_user_file(self.token_file, SCOPES)
-        
-        if not self.creds or not self.creds.valid:
-            if self.creds and self.creds.expired and self.creds.refresh_token:
-                self.creds.refresh(Request())
+        creds = self._creds.get(user_id)
+        if creds and creds.valid:
+            return creds
+
+        with self._user_lock(user_id):
+            creds = self._creds.get(user_id)
+            if creds and creds.valid:
+                return creds
+
+            from google.auth.transport.requests import Request
+            from google.oauth2.credentials import Credentials
+            from google_auth_oauthlib.flow import InstalledAppFlow
+
+            token_path = self._token_path(user_id)
+            if creds is None and os.path.exists(token_path):
+                creds = Credentials.from_authorized_user_file(token_path, SCOPES)
+
+            if not creds or not creds.valid:
+                if creds and creds.expired and creds.refresh_token:
+                    creds.refresh(Request())
+                else:
+                    flow = InstalledAppFlow.from_client_secrets_file(self.creds_file, SCOPES)
+                    creds = flow.run_local_server(port=0)
+
+                self._write_token(token_path, creds)
+
+            self._creds[user_id] = creds
+            return creds
+
+    def _get_discovery_doc(self):
+        if self._discovery_doc is None:
+            from googleapiclient.discovery_cache import get_static_doc
+            doc = get_static_doc('gmail', 'v1')
+            self._discovery_doc = json.loads(doc) if doc else False
+        return self._discovery_doc
+
+    def authenticate(self, user_id: int = 1):
+        creds = self.get_credentials(user_id)
+
+        clients = getattr(self._local, "clients", None)
+        if clients is None:
+            clients = self._local.clients = {}
+
+        cached = clients.get(user_id)
+        if cached and cached[0] is creds:
+            return cached[1]
+
+        from googleapiclient.discovery import build, build_from_document
+
+        import httplib2
+        from google_auth_httplib2 import AuthorizedHttp
+
+        # googleapiclient 기본 httplib2 클라이언트는 타임아웃이 없어 응답 없는 요청이 워커를 계속 붙잡습니다.
+        http = AuthorizedHttp(creds, http=httplib2.Http(timeout=settings.GMAIL_TIMEOUT_SECONDS))
+        doc = self._get_discovery_doc()
+        if doc:
+            service = build_from_document(doc, http=http, client_options=self._client_options())
+        else:
+            service = build('gmail', 'v1', http=http, client_options=self._client_options())
+
+        clients[user_id] = (creds, service)
+        return service
+
+    def _client_options(self):
+        if settings.GMAIL_API_ENDPOINT:
+            return {"api_endpoint": settings.GMAIL_API_ENDPOINT}
+        return None
+
+    def _new_batch(self, service, callback):
+        """
+        배치 요청 객체 생성.
+        discovery 문서의 batchPath는 api_endpoint 설정을 따르지 않으므로, 로컬 가짜 API를 쓸 때는 직접 지정합니다.
+        """
+        if settings.GMAIL_API_ENDPOINT:
+            from googleapiclient.http import BatchHttpRequest
+            batch_uri = f"{settings.GMAIL_API_ENDPOINT.rstrip('/')}/batch/gmail/v1"
+            return BatchHttpRequest(callback=callback, batch_uri=batch_uri)
+        return service.new_batch_http_request(callback=callback)
+
+    def _filter_new_message_ids(self, db: Session, msg_ids: list):
+        """이미 저장된 message_id를 한 번의 IN 쿼리로 걸러냅니다."""
+        if not msg_ids:
+            return []
+
+        existing = {
+            row[0] for row in
+            db.query(Email.message_id).filter(Email.message_id.in_(msg_ids)).all()
+        }
+
+        seen = set()
+        new_ids = []
+        for msg_id in msg_ids:
+            if msg_id in existing or msg_id in seen:
+                continue
+            seen.add(msg_id)
+            new_ids.append(msg_id)
+        return new_ids
+
+    def _message_request(self, service, msg_id: str, fmt: str):
+        if fmt == 'metadata':
+            return service.users().messages().get(
+                userId='me', id=msg_id, format='metadata', metadataHeaders=METADATA_HEADERS
+            )
+        return service.users().messages().get(userId='me', id=msg_id, format=fmt)
+
+    def _batch_get_messages(self, service, msg_ids: list, fmt: str = 'metadata'):
+        """
+        messages().get() 호출을 Gmail 배치 요청으로 묶어 상세 정보를 가져옵니다.
+        기본은 metadata 형식(Subject/From/Date 헤더 + snippet)이고, 본문이 필요하면 full,
+        수신 시각(internalDate)만 필요하면 minimal 형식으로 받습니다.
+        배치 안에서 429/5xx로 실패한 메시지가 있으면 그 메시지만 다시 요청합니다.
+        재시도 횟수/백오프/제한 시간/서킷 브레이커는 resilience.call 한 곳에서만 처리합니다. (시도 한 번 = 남은 메시지 전체 배치 전송)
+        끝까지 남은 메시지가 있으면 ExternalServiceUnavailable이 올라가 동기화 커서가 그 메시지를 건너뛰지 않습니다.
+        (404 등 재시도할 수 없는 메시지는 건너뜁니다)
+        """
+        details = {}
+        skipped = set()
+        retry_errors = {}
+
+        def _on_response(request_id, response, exception):
+            if exception is None:
+                details[request_id] = response
+                return
+            record_external_error("gmail", "messages.get", exception)
+            if resilience.is_retryable(exception):
+                retry_errors[request_id] = exception
             else:
-                flow = InstalledAppFlow.from_client_secrets_file(self.creds_file, SCOPES)
-                self.creds = flow.run_local_server(port=0)
+                skipped.add(request_id)
+                print(f"⚠️ Gmail 메시지 조회 실패 ({request_id}): {exception}")
 
-            with open(self.token_file, 'w') as token:
-                token.write(self.creds.to_json())
+        batch_size = max(1, min(settings.GMAIL_BATCH_SIZE, MAX_BATCH_SIZE))
 
-        return build('gmail', 'v1', credentials=self.creds)
+        def _execute_pending():
+            # 이전 시도에서 받았거나 건너뛴 메시지는 다시 보내지 않습니다. (배치 전송 자체가 실패한 경우 포함)
+            pending = [msg_id for msg_id in msg_ids if msg_id not in details and msg_id not in skipped]
+            retry_errors.clear()
+            for start in range(0, len(pending), batch_size):
+                batch = self._new_batch(service, _on_response)
+                for msg_id in pending[start:start + batch_size]:
+                    batch.add(self._message_request(service, msg_id, fmt), request_id=msg_id)
+                batch.execute()
 
-    def fetch_and_save_emails(self, db: Session, user_id: int, query: str, limit: int):
-        service = self.authenticate()
-        
-        results = service.users().messages().list(userId='me', q=query, maxResults=limit).execute()
-        messages = results.get('messages', [])
-        
-        saved_count = 0
-        
-        for msg in messages:
-            msg_id = msg['id']
-            
-            exists = db.query(Email).filter(Email.message_id == msg_id).first()
-            if exists:
+            if retry_errors:
+                # Retry-After가 가장 긴 오류를 올려 resilience.call이 그만큼 기다린 뒤 남은 메시지만 다시 보냅니다.
+                raise max(retry_errors.values(), key=lambda e: resilience.retry_after_seconds(e) or 0)
+
+        try:
+            resilience.call("gmail", "messages.get.batch", _execute_pending)
+        except resilience.ExternalServiceUnavailable:
+            remaining = len(msg_ids) - len(details) - len(skipped)
+            print(f"⚠️ Gmail 메시지 {remaining}건을 가져오지 못해 동기화를 중단합니다.")
+            raise
+
+        return [details[msg_id] for msg_id in msg_ids if msg_id in details]
+
+    def _extract_body_text(self, payload: dict, max_bytes: int):
+        """
+        MIME 트리에서 text/plain 본문(없으면 태그를 지운 text/html)을 최대 max_bytes만큼만 디코딩합니다.
+        첨부 파일(attachmentId만 있고 data가 없는 파트)은 건너뜁니다.
+        """
+        def _walk(part):
+            yield part
+            for child in part.get('parts', []) or []:
+                yield from _walk(child)
+
+        parts = [part for part in _walk(payload) if (part.get('body') or {}).get('data')]
+        for mime_type in ('text/plain', 'text/html'):
+            part = next((p for p in parts if p.get('mimeType') == mime_type), None)
+            if part is None:
                 continue
 
-            detail = service.users().messages().get(userId='me', id=msg_id).execute()
-            payload = detail.get('payload', {})
-            headers = payload.get('headers', [])
-            snippet = detail.get('snippet', '')
+            # base64 4글자 = 3바이트이므로 필요한 만큼만 잘라 디코딩합니다. (멀티바이트 경계에서 잘린 문자는 버림)
+            data = part['body']['data'][:(max_bytes // 3 + 1) * 4]
+            data += '=' * (-len(data) % 4)
+            raw = base64.urlsafe_b64decode(data)[:max_bytes]
+            text = raw.decode('utf-8', errors='ignore')
+            if mime_type == 'text/html':
+                text = _HTML_TAG_PATTERN.sub(' ', text)
+            return _WHITESPACE_PATTERN.sub(' ', text).strip()
+        return None
 
-            subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '(No Subject)')
-            sender = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown')
-            date_str = next((h['value'] for h in headers if h['name'] == 'Date'), None)
+    def _body_excerpt(self, payload: dict):
+        """본문을 받았지만 텍스트 파트가 없으면 빈 문자열 (NULL은 '아직 본문을 받지 않음'으로 남겨 백필 대상이 됩니다)"""
+        return self._extract_body_text(payload, settings.GMAIL_BODY_MAX_BYTES) or ""
 
-            received_at = datetime.now()
-            try:
-                from email.utils import parsedate_to_datetime
-                if date_str:
-                    received_at = parsedate_to_datetime(date_str)
-            except:
-                pass
-
-            # 4. DB 저장
-            new_email = Email(
-                user_id=user_id,
-                message_id=msg_id,
-                provider="GMAIL",
-                sender=sender,
-                subject=subject,
-                snippet=snippet,
-                received_at=received_at,
-                classification="UNCERTAIN"
+    def _parse_message(self, detail: dict, user_id: int, include_body: bool = False):
+        payload = detail.get('payload', {})
+        headers = payload.get('headers', [])
+        snippet = detail.get('snippet', '')
+
+        subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '(No Subject)')
+        sender = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown')
+        date_str = next((h['value'] for h in headers if h['name'] == 'Date'), None)
+
+        received_at = datetime.now()
+        try:
+            if date_str:
+                received_at = parsedate_to_datetime(date_str)
+        except:
+            pass
+
+        return {
+            "user_id": user_id,
+            "message_id": detail['id'],
+            "provider": "GMAIL",
+            "sender": sender,
+            "subject": subject,
+            "snippet": snippet,
+            "received_at": received_at,
+            "body_excerpt": self._body_excerpt(payload) if include_body else None,
+            "classification": "UNCERTAIN"
+        }
+
+    def _get_sync_state(self, db: Session, user_id: int, query: str):
+        query_hash = hashlib.sha256(query.encode("utf-8")).hexdigest()
+        state_query = db.query(GmailSyncState).filter(
+            GmailSyncState.user_id == user_id,
+            GmailSyncState.query_hash == query_hash
+        )
+        state = state_query.first()
+        if not state:
+            # 같은 사용자의 첫 동기화가 동시에 실행돼도 UNIQUE 충돌로 실패하지 않도록 INSERT IGNORE 후 다시 조회합니다.
+            insert_ignore(db, GmailSyncState, [{"user_id": user_id, "query_hash": query_hash}])
+            db.commit()
+            state = state_query.one()
+        return state
+
+    def _iter_query_pages(self, service, query: str, limit: int = None):
+        """messages().list를 nextPageToken이 끝날 때까지(또는 limit까지) 페이지 단위로 순회합니다."""
+        remaining = limit if limit is not None else float("inf")
+        page_token = None
+        while remaining > 0:
+            request = service.users().messages().list(
+                userId='me', q=query, maxResults=int(min(remaining, MAX_PAGE_SIZE)), pageToken=page_token
             )
-            db.add(new_email)
-            saved_count += 1
-        
+            page = resilience.call("gmail", "messages.list", request.execute)
+            msg_ids = [msg['id'] for msg in page.get('messages', [])]
+            if limit is not None:
+                msg_ids = msg_ids[:int(remaining)]
+            if msg_ids:
+                yield msg_ids
+            remaining -= len(msg_ids)
+
+            page_token = page.get('nextPageToken')
+            if not page_token or not msg_ids:
+                break
+
+    def _list_history_added(self, service, start_history_id: str):
+        """
+        startHistoryId 이후 추가된 메시지 ID와 최신 historyId를 반환합니다.
+        커서가 만료되면 Gmail이 404를 반환하며, 이 경우 HttpError가 그대로 올라갑니다.
+        """
+        added_ids = []
+        latest_history_id = start_history_id
+        page_token = None
+        while True:
+            request = service.users().history().list(
+                userId='me',
+                startHistoryId=start_history_id,
+                historyTypes=['messageAdded'],
+                maxResults=MAX_PAGE_SIZE,
+                pageToken=page_token
+            )
+            page = resilience.call("gmail", "history.list", request.execute)
+            for record in page.get('history', []):
+                for added in record.get('messagesAdded', []):
+                    added_ids.append(added['message']['id'])
+            latest_history_id = page.get('historyId', latest_history_id)
+
+            page_token = page.get('nextPageToken')
+            if not page_token:
+                break
+        return added_ids, latest_history_id
+
+    def _iter_incremental_pages(self, db: Session, service, query: str, limit: int, added_ids: list, status: dict):
+        """
+        history로 받은 추가 메시지 중 아직 저장되지 않았고 검색 조건(q)에 맞는 것을 최대 limit건까지 돌려줍니다.
+        Gmail 검색식은 로컬에서 재현할 수 없으므로 q 검색 결과와 교집합을 구하되,
+        검색 범위는 추가된 메시지 중 가장 오래된 수신 시각(internalDate) 하루 전 이후로 좁힙니다.
+        limit 때문에 남은 메시지가 있으면 status["complete"]를 False로 바꿔 커서를 옮기지 않게 합니다.
+        (다음 동기화는 같은 커서에서 다시 시작하고, 이미 저장된 메시지는 건너뜁니다)
+        """
+        pending = []
+        for start in range(0, len(added_ids), MAX_PAGE_SIZE):
+            pending.extend(self._filter_new_message_ids(db, added_ids[start:start + MAX_PAGE_SIZE]))
+        pending = list(dict.fromkeys(pending))
+        if not pending:
+            return
+
+        if not query.strip():
+            if len(pending) > limit:
+                status["complete"] = False
+            for start in range(0, min(len(pending), limit), MAX_PAGE_SIZE):
+                yield pending[start:min(start + MAX_PAGE_SIZE, limit)]
+            return
+
+        # 그 사이 삭제된 메시지(404)는 결과에서 빠지므로 더 확인할 필요가 없습니다.
+        received = {
+            detail['id']: int(detail.get('internalDate') or 0) // 1000
+            for detail in self._batch_get_messages(service, pending, 'minimal')
+        }
+        if not received:
+            return
+        query = f"{query} after:{min(received.values()) - 86400}"
+
+        remaining = set(received)
+        saved = 0
+        for msg_ids in self._iter_query_pages(service, query):
+            matched = [msg_id for msg_id in msg_ids if msg_id in remaining][:limit - saved]
+            if matched:
+                yield matched
+            remaining.difference_update(matched)
+            saved += len(matched)
+            if not remaining:
+                return
+            if saved >= limit:
+                # 남은 메시지가 q에 맞는지 확인하지 못했습니다.
+                status["complete"] = False
+                return
+
+    def _stored_without_body(self, db: Session, user_id: int, msg_ids: list):
+        """이미 저장됐지만 본문을 받지 않은(body_excerpt IS NULL) 메일의 {message_id: email_id} (IN 쿼리 1회)"""
+        if not msg_ids:
+            return {}
+        return dict(
+            db.query(Email.message_id, Email.email_id)
+            .filter(Email.user_id == user_id, Email.message_id.in_(msg_ids), Email.body_excerpt.is_(None))
+            .all()
+        )
+
+    def _save_page(self, db: Session, service, user_id: int, msg_ids: list, include_body: bool = False):
+        """
+        새 메일을 저장하고 (저장 건수, 본문 백필 건수)를 반환합니다.
+        include_body면 이미 저장된 메일 중 본문이 없는 것도 같은 배치에서 full 형식으로 받아 body_excerpt를 채웁니다.
+        """
+        new_ids = self._filter_new_message_ids(db, msg_ids)
+        backfill = self._stored_without_body(db, user_id, msg_ids) if include_body else {}
+        details = self._batch_get_messages(service, new_ids + list(backfill), 'full' if include_body else 'metadata')
+
+        rows = []
+        excerpts = []
+        for detail in details:
+            if detail['id'] in backfill:
+                excerpts.append({"email_id": backfill[detail['id']], "body_excerpt": self._body_excerpt(detail.get('payload', {}))})
+            else:
+                rows.append(self._parse_message(detail, user_id, include_body))
+
+        # 같은 메일함을 동시에 동기화하는 작업이 있어도 message_id UNIQUE 충돌로 실패하지 않도록 INSERT IGNORE
+        insert_ignore(db, Email, rows)
+        if excerpts:
+            db.bulk_update_mappings(Email, excerpts)
         db.commit()
-        return saved_count
\ No newline at end of file
+        return len(rows), len(excerpts)
+
+    def fetch_and_save_emails(self, db: Session, user_id: int, query: str, limit: int,
+                              service=None, full_sync: bool = False, progress=None, include_body: bool = False):
+        """
+        1. 저장된 historyId 커서가 있으면 history().list로 그 이후 추가된 메시지만 조회
+           (커서가 없거나 만료(404)되었거나 full_sync면 messages().list 전체 페이지 스캔)
+        2. 페이지마다 이미 저장된 ID를 한 번의 IN 쿼리로 제외
+        3. 나머지 상세 정보를 배치 요청으로 조회
+           (기본은 metadata 형식, include_body면 full 형식으로 받아 본문 앞 GMAIL_BODY_MAX_BYTES만 body_excerpt로 저장)
+        4. 새 Email 행을 한 번에 INSERT
+           (include_body면 조회된 메일 중 이미 저장됐지만 body_excerpt가 없는 메일도 본문을 받아 채움.
+            증분 동기화는 새 메일만 조회하므로 기존 메일 보강은 full_sync로 요청)
+        5. 다음 동기화를 위해 historyId 커서 갱신 (증분 동기화에서 limit 때문에 남긴 메시지가 있으면 커서 유지)
+        service를 넘기면 인증 없이 해당 클라이언트(로컬 가짜 API 등)를 사용합니다.
+        progress(done, total, message)를 넘기면 페이지마다 진행 상황을 보고합니다.
+        """
+        from googleapiclient.errors import HttpError
+
+        started = time.perf_counter()
+        service = service or self.authenticate(user_id)
+        state = self._get_sync_state(db, user_id, query)
+
+        mode = None
+        pages = None
+        next_history_id = None
+        status = {"complete": True}
+
+        if state.history_id and not full_sync:
+            try:
+                added_ids, next_history_id = self._list_history_added(service, state.history_id)
+                pages = self._iter_incremental_pages(db, service, query, limit, added_ids, status)
+                mode = "incremental"
+            except HttpError as e:
+                if e.resp.status != 404:
+                    raise
+                print(f"⚠️ historyId 커서 만료 (user={user_id}), 전체 스캔으로 전환합니다.")
+
+        if pages is None:
+            # 스캔 도중 도착한 메일을 놓치지 않도록 스캔 시작 전의 historyId를 커서로 사용합니다.
+            profile = resilience.call("gmail", "getProfile", service.users().getProfile(userId='me').execute)
+            next_history_id = profile.get('historyId')
+            pages = self._iter_query_pages(service, query, limit)
+            mode = "full"
+
+        listed_count = 0
+        saved_count = 0
+        backfilled_count = 0
+        for msg_ids in pages:
+            listed_count += len(msg_ids)
+            saved, backfilled = self._save_page(db, service, user_id, msg_ids, include_body)
+            saved_count += saved
+            backfilled_count += backfilled
+            if progress:
+                progress(min(listed_count, limit), limit, f"{listed_count}건 조회, {saved_count}건 저장")
+
+        if status["complete"] and next_history_id:
+            state.history_id = str(next_history_id)
+        elif not status["complete"]:
+            print(f"⚠️ 추가된 메일이 limit({limit})보다 많아 커서를 유지합니다. 다음 동기화에서 이어서 가져옵니다. (user={user_id})")
+        state.last_synced_at = datetime.now()
+        db.commit()
+
+        elapsed = time.perf_counter() - started
+        throughput = listed_count / elapsed if elapsed > 0 else 0.0
+        print(f"📬 Gmail 동기화({mode}): {listed_count}건 조회, {saved_count}건 저장, 본문 {backfilled_count}건 보강 "
+              f"({elapsed:.2f}s, {throughput:.1f} msg/s)")
+
+        return {
+            "mode": mode,
+            "synced_count": saved_count,
+            "backfilled_count": backfilled_count,
+            "listed_count": listed_count,
+            "elapsed_sec": round(elapsed, 3),
+            "messages_per_sec": round(throughput, 1)
+        }
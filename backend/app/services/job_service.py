@@ -0,0 +1,117 @@
+import uuid
+import threading
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from app.core.config import settings
+from app.core.metrics import background_context, span
+
+
+class Job:
+    """백그라운드 작업 하나의 상태. 작업 함수는 update_progress()로 진행률을 보고합니다."""
+
+    def __init__(self, job_type: str):
+        self.job_id = uuid.uuid4().hex
+        self.job_type = job_type
+        self.status = "QUEUED"  # QUEUED, RUNNING, SUCCEEDED, FAILED
+        self.progress = 0.0
+        self.message = None
+        self.result = None
+        self.error = None
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+
+    def update_progress(self, done: int, total: int, message: str = None):
+        self.progress = round(done / total, 4) if total else 1.0
+        if message:
+            self.message = message
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "job_type": self.job_type,
+            "status": self.status,
+            "progress": self.progress,
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class JobService:
+    """
+    프로세스 내 작업 큐. 메일 동기화/분류처럼 오래 걸리는 작업을 JOB_WORKERS개의 스레드에서 실행하고,
+    API는 작업 ID만 바로 반환합니다. 작업 이력은 최근 JOB_HISTORY_LIMIT개까지 메모리에 보관합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(1, settings.JOB_WORKERS), thread_name_prefix="mai1-job"
+                )
+            return self._executor
+
+    def submit(self, job_type: str, fn, *args, **kwargs):
+        """fn(job, *args, **kwargs)를 백그라운드에서 실행하고 Job을 바로 반환합니다."""
+        job = Job(job_type)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._trim()
+
+        # 작업 스레드에서도 요청의 trace context를 이어받아 작업 span이 요청 span 아래에 붙도록 합니다.
+        context = background_context()
+        self._get_executor().submit(context.run, self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job: Job, fn, args, kwargs):
+        job.status = "RUNNING"
+        job.started_at = datetime.now()
+        try:
+            with span(f"job {job.job_type}", job_id=job.job_id):
+                job.result = fn(job, *args, **kwargs)
+            job.progress = 1.0
+            job.status = "SUCCEEDED"
+        except Exception as e:
+            print(f"Job Error ({job.job_type} {job.job_id}): {e}")
+            traceback.print_exc()
+            job.error = str(e)
+            job.status = "FAILED"
+        finally:
+            job.finished_at = datetime.now()
+
+    def _trim(self):
+        overflow = len(self._jobs) - settings.JOB_HISTORY_LIMIT
+        if overflow <= 0:
+            return
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in ("SUCCEEDED", "FAILED")]
+        for job_id in finished[:overflow]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self, limit: int = 50):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return list(reversed(jobs))[:limit]
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+job_service = JobService()
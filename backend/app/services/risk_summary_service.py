@@ -0,0 +1,153 @@
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.database import insert_ignore
+from app.models.risk_summary import UserRiskSummary
+from app.models.service import Service
+from app.models.user_service import UserService
+
+# 등급 -> (정렬 순위, 집계 컬럼, 점수). 점수는 프론트엔드 security-overview의 gradeScores와 같습니다.
+GRADES = {
+    "A": (1, "grade_a_count", 100),
+    "B": (2, "grade_b_count", 80),
+    "C": (3, "grade_c_count", 60),
+    "D": (4, "grade_d_count", 40),
+    "E": (5, "grade_f_count", 20),
+    "F": (5, "grade_f_count", 20),
+}
+# 미평가(NULL), Unrated, 알 수 없는 등급
+UNRATED = (None, "unrated_count", 0)
+
+COUNT_COLUMNS = ["service_count", "grade_a_count", "grade_b_count", "grade_c_count",
+                 "grade_d_count", "grade_f_count", "unrated_count", "score_sum"]
+
+
+def _grade_info(grade: str):
+    return GRADES.get((grade or "").strip().upper(), UNRATED)
+
+
+def risk_rank(grade: str):
+    """services.risk_rank에 저장할 숫자 등급 (A=1 ... F=5, 미평가는 None)"""
+    return _grade_info(grade)[0]
+
+
+def overall_grade(score: int):
+    """평균 점수를 대시보드 등급으로 변환합니다. (security-overview와 같은 기준)"""
+    if score >= 90:
+        return "A"
+    if score >= 70:
+        return "B"
+    if score >= 50:
+        return "C"
+    if score >= 30:
+        return "D"
+    return "F"
+
+
+class RiskSummaryService:
+    """
+    사용자별 서비스 등급 집계(user_risk_summaries)를 관리합니다.
+    - 연결 추가: 해당 사용자의 요약 행을 잠그고 연결 목록을 다시 세어 덮어씀 (동시에 같은 연결을 추가해도 중복 집계 없음)
+    - 등급 변경: 그 서비스를 쓰는 모든 사용자에 대해 UPDATE 1회 (증감)
+    """
+
+    def add_links(self, db: Session, user_ids):
+        """
+        연결이 추가된 사용자들의 집계를 다시 셉니다. 커밋은 호출한 쪽에서 합니다.
+        INSERT 직전에 확인한 '새 연결'로 증감하면, 같은 연결을 동시에 추가한 두 트랜잭션이 모두 더해
+        집계가 어긋나므로 실제로 저장된 연결을 기준으로 셉니다.
+        """
+        user_ids = sorted(set(user_ids))
+        if not user_ids:
+            return
+
+        insert_ignore(db, UserRiskSummary, [
+            dict({column: 0 for column in COUNT_COLUMNS}, user_id=user_id) for user_id in user_ids
+        ])
+
+        # 요약 행을 user_id 순서로 잠가 같은 사용자를 갱신하는 트랜잭션을 차례로 세웁니다.
+        db.query(UserRiskSummary.user_id) \
+            .filter(UserRiskSummary.user_id.in_(user_ids)) \
+            .order_by(UserRiskSummary.user_id) \
+            .with_for_update() \
+            .all()
+
+        # 잠금 읽기(FOR SHARE)는 트랜잭션 스냅샷이 아니라 최신 커밋 값을 읽으므로 먼저 커밋한 연결도 셉니다.
+        links = db.query(UserService.user_id, Service.risk_level) \
+            .join(Service, Service.service_id == UserService.service_id) \
+            .filter(UserService.user_id.in_(user_ids)) \
+            .with_for_update(read=True) \
+            .all()
+
+        counts = {user_id: {column: 0 for column in COUNT_COLUMNS} for user_id in user_ids}
+        for user_id, grade in links:
+            _, column, points = _grade_info(grade)
+            user_counts = counts[user_id]
+            user_counts["service_count"] += 1
+            user_counts[column] += 1
+            user_counts["score_sum"] += points
+
+        now = datetime.now()
+        for user_id, user_counts in counts.items():
+            values = {getattr(UserRiskSummary, column): amount for column, amount in user_counts.items()}
+            values[UserRiskSummary.updated_at] = now
+            db.query(UserRiskSummary).filter(UserRiskSummary.user_id == user_id) \
+                .update(values, synchronize_session=False)
+
+    def apply_grade(self, db: Session, service: Service, grade: str):
+        """서비스 등급(risk_level, risk_rank)을 바꾸고 구독 사용자들의 집계를 옮깁니다. 커밋은 호출한 쪽에서 합니다."""
+        old_grade = service.risk_level
+        service.risk_level = grade
+        service.risk_rank = risk_rank(grade)
+
+        _, old_column, old_points = _grade_info(old_grade)
+        _, new_column, new_points = _grade_info(grade)
+        if old_column == new_column and old_points == new_points:
+            return
+
+        subscribers = select(UserService.user_id).where(UserService.service_id == service.service_id)
+        db.query(UserRiskSummary).filter(UserRiskSummary.user_id.in_(subscribers)).update({
+            getattr(UserRiskSummary, old_column): getattr(UserRiskSummary, old_column) - 1,
+            getattr(UserRiskSummary, new_column): getattr(UserRiskSummary, new_column) + 1,
+            UserRiskSummary.score_sum: UserRiskSummary.score_sum + (new_points - old_points),
+            UserRiskSummary.updated_at: datetime.now()
+        }, synchronize_session=False)
+
+    def get_summary(self, db: Session, user_id: int):
+        """대시보드 응답용 집계. 요약 행이 없으면(연결된 서비스 없음) 0으로 채웁니다."""
+        summary = db.query(UserRiskSummary).filter(UserRiskSummary.user_id == user_id).first()
+        return self._summary_response(user_id, summary)
+
+    async def get_summary_async(self, db, user_id: int):
+        """get_summary의 비동기 세션(get_async_db) 버전"""
+        result = await db.execute(select(UserRiskSummary).where(UserRiskSummary.user_id == user_id))
+        return self._summary_response(user_id, result.scalars().first())
+
+    def _summary_response(self, user_id: int, summary):
+        counts = {column: getattr(summary, column) if summary else 0 for column in COUNT_COLUMNS}
+
+        rated_count = counts["service_count"] - counts["unrated_count"]
+        score = round(counts["score_sum"] / rated_count) if rated_count else 0
+
+        return {
+            "user_id": user_id,
+            "service_count": counts["service_count"],
+            "rated_count": rated_count,
+            "grade_counts": {
+                "A": counts["grade_a_count"],
+                "B": counts["grade_b_count"],
+                "C": counts["grade_c_count"],
+                "D": counts["grade_d_count"],
+                "F": counts["grade_f_count"],
+                "Unrated": counts["unrated_count"],
+            },
+            "safe_count": counts["grade_a_count"] + counts["grade_b_count"],
+            "warning_count": counts["grade_c_count"] + counts["grade_d_count"],
+            "danger_count": counts["grade_f_count"],
+            "score": score,
+            "grade": overall_grade(score) if rated_count else None,
+            "updated_at": summary.updated_at if summary else None
+        }
+
+risk_summary_service = RiskSummaryService()
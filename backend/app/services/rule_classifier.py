@@ -0,0 +1,94 @@
+import re
+from app.services.sender import sender_host, registrable_domain
+
+# 가입 메일에 자주 나오는 제목 키워드
+REGISTER_KEYWORDS = [
+    "가입", "환영", "계정 생성", "계정이 생성",
+    "welcome", "confirm your email", "confirm your account",
+    "activate your account", "account created", "thanks for signing up", "sign up", "signup",
+]
+# 로그인 OTP/본인확인 메일에도 나오는 키워드: 가입 메일로 확정하지 않고 LLM에 넘깁니다.
+WEAK_REGISTER_KEYWORDS = ["인증", "본인확인", "verify", "verification"]
+
+# 뉴스레터, 영수증, 광고 등 가입 메일이 아닌 경우가 확실한 제목 키워드
+OTHER_KEYWORDS = [
+    "(광고)", "[광고]", "뉴스레터", "영수증", "주문", "배송", "청구서", "할인", "쿠폰", "이벤트",
+    "newsletter", "receipt", "invoice", "your order", "order confirmation", "shipped", "shipping",
+    "digest", "weekly", "% off", "webinar",
+]
+# 결제 수단 등록/세일즈 담당자 메일 등에도 나오는 키워드: OTHER로 확정하지 않고 LLM에 넘깁니다.
+WEAK_OTHER_KEYWORDS = ["결제", "payment", "sale"]
+
+# 약한 키워드만 걸린 메일의 확신도 (기본 RULE_CLASSIFIER_THRESHOLD 0.9보다 낮게)
+WEAK_CONFIDENCE = 0.6
+
+
+def _keyword_pattern(keywords: list):
+    """
+    영문 키워드는 단어 경계에서만 맞도록 합니다. ('sale'이 wholesale/Salesforce에 걸리지 않게)
+    한글은 조사가 바로 붙으므로('가입을') 부분 문자열로 찾습니다.
+    """
+    parts = []
+    for keyword in keywords:
+        part = re.escape(keyword)
+        if keyword[0].isascii() and keyword[0].isalnum():
+            part = r"(?<![a-z0-9])" + part
+        if keyword[-1].isascii() and keyword[-1].isalnum():
+            part += r"(?![a-z0-9])"
+        parts.append(part)
+    return re.compile("|".join(parts))
+
+
+_REGISTER_PATTERN = _keyword_pattern(REGISTER_KEYWORDS)
+_WEAK_REGISTER_PATTERN = _keyword_pattern(WEAK_REGISTER_KEYWORDS)
+_OTHER_PATTERN = _keyword_pattern(OTHER_KEYWORDS)
+_WEAK_OTHER_PATTERN = _keyword_pattern(WEAK_OTHER_KEYWORDS)
+
+RULE_SOURCE = "RULE"
+
+
+class RuleClassifier:
+    """
+    LLM 호출 전에 키워드 규칙과 등록된 서비스 도메인으로 명확한 메일을 미리 분류합니다.
+    score()는 (classification, confidence)를 반환하며, confidence가 threshold 이상인 메일만 로컬에서 확정합니다.
+    DB에 의존하지 않으므로 라벨링된 샘플로 바로 벤치마크할 수 있습니다.
+    """
+
+    def score(self, email: dict, known_domains: set):
+        subject = (email.get("subject") or "").lower()
+        domain = registrable_domain(sender_host(email.get("sender")))
+
+        is_known = bool(domain) and (domain in known_domains or domain.split(".")[0] in known_domains)
+        register_hit = bool(_REGISTER_PATTERN.search(subject))
+        other_hit = bool(_OTHER_PATTERN.search(subject))
+        weak_register_hit = bool(_WEAK_REGISTER_PATTERN.search(subject))
+        weak_other_hit = bool(_WEAK_OTHER_PATTERN.search(subject))
+
+        if (register_hit or weak_register_hit) and (other_hit or weak_other_hit):
+            return "UNCERTAIN", 0.5
+        if register_hit:
+            return "REGISTER", 0.95 if is_known else 0.8
+        if other_hit:
+            return "OTHER", 0.9
+        if weak_register_hit:
+            return "REGISTER", WEAK_CONFIDENCE
+        if weak_other_hit:
+            return "OTHER", WEAK_CONFIDENCE
+        return "UNCERTAIN", 0.0
+
+    def classify(self, email_list: list, known_domains: set, threshold: float):
+        """
+        확신도가 threshold 이상인 메일의 {email_id: classification}과
+        LLM으로 보내야 할 나머지 메일 목록을 반환합니다.
+        """
+        decisions = {}
+        remaining = []
+        for email in email_list:
+            classification, confidence = self.score(email, known_domains)
+            if classification != "UNCERTAIN" and confidence >= threshold:
+                decisions[email["id"]] = classification
+            else:
+                remaining.append(email)
+        return decisions, remaining
+
+rule_classifier = RuleClassifier()
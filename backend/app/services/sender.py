@@ -0,0 +1,30 @@
+from email.utils import parseaddr
+
+# co.kr, ac.kr, com.au 처럼 두 단계가 공용 접미사인 국가 도메인
+_SECOND_LEVEL_LABELS = {"co", "or", "ne", "ac", "go", "re", "pe", "com", "net", "org", "edu", "gov"}
+
+
+def sender_host(sender: str):
+    """'Netflix <info@mailer.netflix.com>' -> 'mailer.netflix.com' (주소가 아니면 None)"""
+    if not sender:
+        return None
+
+    _, address = parseaddr(sender)
+    if "@" not in address:
+        address = sender
+    if "@" not in address:
+        return None
+
+    host = address.rsplit("@", 1)[1].strip().strip(">").strip(".").lower()
+    return host or None
+
+
+def registrable_domain(host: str):
+    """'mailer.netflix.com' -> 'netflix.com', 'mail.coupang.co.kr' -> 'coupang.co.kr'"""
+    if not host:
+        return None
+
+    labels = host.split(".")
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in _SECOND_LEVEL_LABELS:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
@@ -0,0 +1,69 @@
+"""
+서버 콜드 스타트(import app.main) 시간 벤치마크.
+
+새 파이썬 프로세스에서 app.main을 import하는 데 걸린 시간을 여러 번 재고,
+-X importtime 결과에서 누적 시간이 가장 큰 모듈을 보여 줍니다.
+
+    cd backend
+    python benchmarks/bench_import_time.py --runs 10 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 측정용 하위 프로세스도 이 환경을 물려받습니다. secret_db.json 없이도 app을 import할 수 있게 SQLite 설정을 기본값으로 둡니다.
+os.environ.setdefault("DB_BACKEND", "sqlite")
+
+MEASURE_SNIPPET = (
+    "import time; started = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def measure_once():
+    out = subprocess.run(
+        [sys.executable, "-c", MEASURE_SNIPPET],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(top):
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+
+    rows = []
+    for line in out.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace("import time:", "|", 1).split("|")]
+        rows.append((int(cumulative_us), int(self_us), name))
+
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    samples = [measure_once() for _ in range(args.runs)]
+    print(f"import app.main ({args.runs} runs)")
+    print(f"  median : {statistics.median(samples) * 1000:.1f} ms")
+    print(f"  min    : {min(samples) * 1000:.1f} ms")
+    print(f"  max    : {max(samples) * 1000:.1f} ms")
+
+    print(f"\nslowest imports (cumulative)")
+    for cumulative_us, self_us, name in slowest_imports(args.top):
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name.strip()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+GET /api/users/me/services 쿼리 수 점검.
+
+사용자의 서비스 수를 바꿔 가며 get_my_services를 직접 호출하고, 실행된 SQL 문 수와 소요 시간을 출력합니다.
+서비스 수와 상관없이 쿼리 수가 같아야 하며, 달라지면 종료 코드 1로 끝납니다.
+비교를 위해 관계(us.service)를 행마다 지연 로딩하던 이전 방식의 쿼리 수도 함께 보여 줍니다.
+마지막으로 정렬 순서, total_count/has_more, limit 생략(전체 목록), 윈도 함수를 못 쓰는 DB용 COUNT 경로가
+이전 방식과 같은 결과를 내는지 assert로 확인합니다.
+
+    cd backend
+    python benchmarks/bench_my_services_queries.py --sizes 1,10,100,1000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+# 벤치마크는 자체 엔진을 쓰므로 secret_db.json 없이도 app을 import할 수 있게 SQLite 설정을 기본값으로 둡니다.
+os.environ.setdefault("DB_BACKEND", "sqlite")
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models import user, service, email, user_service, sync_state, classification_cache, policy_evaluation, risk_summary
+from app.api.endpoints import users as users_endpoint
+from app.api.endpoints.users import get_my_services
+from app.services.risk_summary_service import risk_rank
+
+RISK_LEVELS = ["A", "B", "C", "D", "E", None]
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def seed(session_factory, n_services):
+    db = session_factory()
+    db.add(user.User(user_id=1, email="demo@example.com", nickname="demo"))
+    for i in range(1, n_services + 1):
+        db.add(service.Service(
+            service_id=i, service_name=f"Service {i}", domain=f"service{i}.com",
+            risk_level=RISK_LEVELS[i % len(RISK_LEVELS)], risk_rank=risk_rank(RISK_LEVELS[i % len(RISK_LEVELS)])
+        ))
+        db.add(user_service.UserService(
+            user_id=1, service_id=i, subscription_date=date(2026, 1, 1) - timedelta(days=i)
+        ))
+    db.commit()
+    db.close()
+
+
+def legacy_lazy_load(db):
+    """이전 구현: UserService만 조회한 뒤 행마다 us.service를 읽어 dict를 만듭니다."""
+    rows = db.query(user_service.UserService).join(service.Service) \
+        .filter(user_service.UserService.user_id == 1) \
+        .order_by(user_service.UserService.subscription_date.desc()).all()
+    return [{"service_name": us.service.service_name, "risk_level": us.service.risk_level} for us in rows]
+
+
+def make_session_factory(n_services):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    seed(session_factory, n_services)
+    return engine, session_factory
+
+
+def expected_order(db, sort):
+    """이전 방식(ORM 객체 전체 조회 후 파이썬 정렬)으로 계산한 기대 순서 (service_id 목록)"""
+    links = db.query(user_service.UserService).filter(user_service.UserService.user_id == 1).all()
+    if sort == "latest":
+        key = lambda us: (us.subscription_date, us.id)
+        return [us.service_id for us in sorted(links, key=key, reverse=True)]
+
+    # risk_rank가 NULL(미평가)인 서비스는 SQLite 정렬처럼 가장 작은 값으로 취급합니다.
+    rank = lambda us: us.service.risk_rank if us.service.risk_rank is not None else -1
+    by_id = sorted(links, key=lambda us: us.id, reverse=True)
+    return [us.service_id for us in sorted(by_id, key=rank, reverse=(sort == "risk_desc"))]
+
+
+def check_results(n_services=25):
+    engine, session_factory = make_session_factory(n_services)
+    db = session_factory()
+    try:
+        for sort in ("latest", "risk_desc", "risk_asc"):
+            expected = expected_order(db, sort)
+            assert len(expected) == n_services
+
+            data = get_my_services(sort=sort, risk_level=None, limit=None, skip=0, db=db)["data"]
+            assert [row.service_id for row in data["services"]] == expected, sort
+            assert data["total_count"] == n_services and data["has_more"] is False
+
+            page = get_my_services(sort=sort, risk_level=None, limit=10, skip=10, db=db)["data"]
+            assert [row.service_id for row in page["services"]] == expected[10:20], sort
+            assert page["total_count"] == n_services and page["has_more"] is True
+
+            beyond = get_my_services(sort=sort, risk_level=None, limit=10, skip=n_services, db=db)["data"]
+            assert beyond["services"] == [] and beyond["total_count"] == n_services
+
+        # MySQL 5.7처럼 윈도 함수를 쓸 수 없을 때의 COUNT 경로
+        original = users_endpoint.supports_window_count
+        users_endpoint.supports_window_count = lambda db: False
+        try:
+            page = get_my_services(sort="latest", risk_level=None, limit=10, skip=0, db=db)["data"]
+            assert [row.service_id for row in page["services"]] == expected_order(db, "latest")[:10]
+            assert page["total_count"] == n_services and page["has_more"] is True
+        finally:
+            users_endpoint.supports_window_count = original
+
+        filtered = get_my_services(sort="latest", risk_level="A", limit=None, skip=0, db=db)["data"]
+        assert filtered["services"] and all(row.risk_level == "A" for row in filtered["services"])
+        assert filtered["total_count"] == len(filtered["services"])
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def measure(n_services, sort, limit):
+    engine, session_factory = make_session_factory(n_services)
+
+    counter = QueryCounter(engine)
+
+    db = session_factory()
+    counter.count = 0
+    started = time.perf_counter()
+    response = get_my_services(sort=sort, risk_level=None, limit=limit, skip=0, db=db)
+    elapsed = time.perf_counter() - started
+    queries = counter.count
+    db.close()
+
+    db = session_factory()
+    counter.count = 0
+    legacy_lazy_load(db)
+    legacy_queries = counter.count
+    db.close()
+
+    engine.dispose()
+    return queries, legacy_queries, elapsed, response["data"]["total_count"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1,10,100,1000", help="사용자당 서비스 수 목록")
+    parser.add_argument("--sort", default="latest", choices=["latest", "risk_desc", "risk_asc"])
+    parser.add_argument("--limit", type=int, default=500)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    counts = set()
+
+    print(f"{'services':>9} {'queries':>8} {'legacy':>8} {'elapsed':>10} {'total':>7}")
+    for n in sizes:
+        queries, legacy_queries, elapsed, total = measure(n, args.sort, args.limit)
+        counts.add(queries)
+        print(f"{n:>9} {queries:>8} {legacy_queries:>8} {elapsed * 1000:>8.1f}ms {total:>7}")
+
+    if len(counts) != 1:
+        print(f"FAIL: 서비스 수에 따라 쿼리 수가 달라졌습니다. {sorted(counts)}")
+        sys.exit(1)
+    print(f"OK: 서비스 수와 상관없이 쿼리 {counts.pop()}회")
+
+    check_results()
+    print("OK: 정렬/개수/페이지/COUNT 경로 결과 일치")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+"""
+오프라인 엔드투엔드 벤치마크.
+
+Gmail API와 IBM IAM/Watson Orchestrate를 로컬 가짜 서버(benchmarks/fakes.py)로, MySQL을 임시 SQLite 파일로 바꿔
+주요 경로를 그대로 실행하고, 엔드포인트/파이프라인 단계별 처리량과 p50/p95/p99 지연 시간을 출력합니다.
+스키마는 운영과 같은 인덱스를 쓰도록 마이그레이션(init_db)으로 만듭니다.
+
+"POST /api/...", "GET /api/..." 항목은 fastapi TestClient로 실제 앱에 요청을 보내 잰 시간입니다.
+(라우팅, 요청 검증, 응답 직렬화, 미들웨어(메트릭) 포함, 네트워크 소켓만 제외)
+Gmail OAuth만 건너뛰도록 동기화 엔드포인트의 GmailService.authenticate를 가짜 Gmail 클라이언트로 바꿉니다.
+"sync.*", "classify.*" 같은 항목은 그 요청 안에서 호출된 서비스 단계별 시간입니다.
+
+- POST /api/emails/sync            : fetch_and_save_emails (전체 스캔 + history 증분 동기화)
+- POST /api/ai/classify-emails     : process_email_classification (규칙 -> 캐시 -> LLM 청크 -> DB 반영)
+- POST /api/admin/services/{id}/evaluate : evaluate_and_apply (약관 평가 + 등급 반영)
+- GET  /api/users/me/services, /api/users/me/risk-summary, /api/emails
+
+    cd backend
+    python benchmarks/bench_offline.py --messages 2000 --gmail-latency-ms 20 --llm-latency-ms 300
+    python benchmarks/bench_offline.py --llm-failure-rate 0.05 --gmail-failure-rate 0.01
+    python benchmarks/bench_offline.py --output bench.json                          # 기준 결과 저장
+    python benchmarks/bench_offline.py --baseline bench.json --max-regression 0.2   # p95가 20% 넘게 느려지면 종료 코드 1
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from fakes import FakeGmailServer, FakeOrchestrateServer, SENDER_DOMAINS
+
+SYNC_QUERY = "category:primary"
+RISK_LEVELS = ["A", "B", "C", None]
+
+
+class Recorder:
+    """이름별 소요 시간/처리 건수/오류 수를 모읍니다. (여러 스레드에서 호출해도 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.items = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.order = []
+
+    def record(self, name, seconds, items=0, error=False):
+        with self._lock:
+            if name not in self.samples:
+                self.order.append(name)
+            self.samples[name].append(seconds)
+            self.items[name] += items
+            if error:
+                self.errors[name] += 1
+
+    @contextmanager
+    def measure(self, name):
+        """with recorder.measure(name) as m: ... m["items"] = 처리 건수"""
+        state = {"items": 0, "error": False}
+        started = time.perf_counter()
+        try:
+            yield state
+        except Exception:
+            state["error"] = True
+            raise
+        finally:
+            self.record(name, time.perf_counter() - started, state["items"], state["error"])
+
+    def wrap(self, owner, attr, name, count_items=None):
+        """owner.attr(함수/메서드)를 시간 측정 래퍼로 바꿉니다. count_items(args, result)로 처리 건수를 셉니다."""
+        original = getattr(owner, attr)
+
+        @wraps(original)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            error = False
+            result = None
+            try:
+                result = original(*args, **kwargs)
+                return result
+            except Exception:
+                error = True
+                raise
+            finally:
+                items = count_items(args, result) if count_items and not error else 0
+                self.record(name, time.perf_counter() - started, items, error)
+
+        setattr(owner, attr, timed)
+
+    def summary(self):
+        results = {}
+        for name in self.order:
+            samples = sorted(self.samples[name])
+            total = sum(samples)
+            results[name] = {
+                "calls": len(samples),
+                "errors": self.errors[name],
+                "items": self.items[name],
+                "total_sec": round(total, 4),
+                "items_per_sec": round(self.items[name] / total, 1) if total and self.items[name] else None,
+                "p50_ms": round(percentile(samples, 50) * 1000, 2),
+                "p95_ms": round(percentile(samples, 95) * 1000, 2),
+                "p99_ms": round(percentile(samples, 99) * 1000, 2),
+            }
+        return results
+
+
+def percentile(ordered, p):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def configure_environment(args, workdir, gmail, orchestrate):
+    """app 모듈을 import하기 전에 SQLite / 가짜 서버 주소를 환경 변수로 지정합니다."""
+    secret_path = os.path.join(workdir, "secret_ibm.json")
+    with open(secret_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "API_KEY": "bench-api-key",
+            "SERVICE_URL": orchestrate.url,
+            "IAM_TOKEN_URL": f"{orchestrate.url}/identity/token",
+            "classifier_AGENT_ID": "bench-classifier",
+            "Privacy_AGENT_ID": "bench-privacy",
+            "CHECKLIST_TITLES": [f"체크리스트 항목 {i}" for i in range(1, args.checklist_size + 1)],
+        }, f, ensure_ascii=False)
+
+    os.environ.update({
+        "DB_BACKEND": "sqlite",
+        "SQLITE_PATH": os.path.join(workdir, "bench.db"),
+        "MAI1_IBM_SECRET_PATH": secret_path,
+        "GMAIL_API_ENDPOINT": gmail.url,
+        "GMAIL_BATCH_SIZE": str(args.gmail_batch_size),
+        "AI_CLASSIFY_CHUNK_SIZE": str(args.chunk_size),
+        "AI_CLASSIFY_CONCURRENCY": str(args.llm_concurrency),
+        "RULE_CLASSIFIER_ENABLED": "false" if args.no_rules else "true",
+    })
+
+
+def seed(SessionLocal, User, Service):
+    db = SessionLocal()
+    db.add(User(user_id=1, email="bench@example.com", nickname="bench"))
+    # 발송 도메인 중 앞쪽 10개만 서비스로 등록 (나머지는 매칭되지 않는 뉴스레터/광고 발송자)
+    for i, domain in enumerate(SENDER_DOMAINS[:10], start=1):
+        db.add(Service(
+            service_id=i, service_name=domain.split(".")[0].capitalize(), domain=domain,
+            risk_level=RISK_LEVELS[i % len(RISK_LEVELS)]
+        ))
+    db.commit()
+    db.close()
+
+
+def build_gmail_client(gmail_service, endpoint):
+    """OAuth 없이 가짜 Gmail API를 호출하는 googleapiclient 클라이언트"""
+    import httplib2
+    from googleapiclient.discovery import build_from_document
+    from app.core.config import settings
+
+    doc = gmail_service._get_discovery_doc()
+    if not doc:
+        raise RuntimeError("googleapiclient에 Gmail 정적 discovery 문서가 없습니다.")
+    http = httplib2.Http(timeout=settings.GMAIL_TIMEOUT_SECONDS)
+    return build_from_document(doc, http=http, client_options={"api_endpoint": endpoint})
+
+
+def call_api(recorder, name, client, method, url, count_items=None, **kwargs):
+    """TestClient로 요청 하나를 보내 시간을 재고, 성공하면 응답 JSON을 반환합니다. (4xx/5xx는 오류로 기록하고 None)"""
+    with recorder.measure(name) as m:
+        response = client.request(method, url, **kwargs)
+        if response.status_code >= 400:
+            m["error"] = True
+            print(f"⚠️ {name}: {response.status_code} {response.text[:200]}")
+            return None
+        body = response.json()
+        m["items"] = count_items(body) if count_items else 1
+    return body
+
+
+def synthetic_policy(chars, salt):
+    sections = []
+    n = 1
+    while sum(len(s) for s in sections) < chars:
+        sections.append(f"제{n}조 (개인정보 처리 항목 {n})\n" + f"회사는 서비스 제공을 위해 항목 {n}을(를) 처리합니다. " * 20)
+        n += 1
+    return f"벤치마크 약관 #{salt}\n\n" + "\n\n".join(sections)
+
+
+def run(args, recorder, gmail_fake):
+    from fastapi.testclient import TestClient
+    from app.core.database import SessionLocal
+    from app.core.init_db import init_db
+    from app.main import app
+    from app.models.email import Email
+    from app.models.service import Service
+    from app.models.user import User
+    from app.api.endpoints import emails as emails_endpoint
+    from app.services import gmail_service as gmail_module
+    from app.services.ai_service import ai_service, load_ai
+    from app.services.classification_cache_service import classification_cache_service
+    from app.services.rule_classifier import rule_classifier
+
+    init_db()
+    seed(SessionLocal, User, Service)
+
+    # 동기화 엔드포인트가 쓰는 GmailService: OAuth 대신 가짜 Gmail 클라이언트를 돌려줍니다.
+    gmail = emails_endpoint.gmail_service
+    gmail_client = build_gmail_client(gmail, gmail_fake.url)
+    gmail.authenticate = lambda user_id=1: gmail_client
+
+    # 파이프라인 단계별 측정
+    recorder.wrap(gmail, "_filter_new_message_ids", "sync.dedup_query", lambda a, r: len(a[1]))
+    recorder.wrap(gmail, "_batch_get_messages", "sync.gmail_batch_get", lambda a, r: len(r))
+    recorder.wrap(gmail, "_save_page", "sync.save_page", lambda a, r: sum(r))
+    recorder.wrap(gmail_module, "insert_ignore", "sync.insert_rows", lambda a, r: len(a[2]))
+
+    recorder.wrap(rule_classifier, "classify", "classify.rule", lambda a, r: len(r[0]))
+    recorder.wrap(classification_cache_service, "lookup", "classify.cache_lookup", lambda a, r: len(r))
+    recorder.wrap(classification_cache_service, "store", "classify.cache_store")
+    recorder.wrap(ai_service, "_classify_chunk", "classify.llm_chunk", lambda a, r: len(a[0]))
+    recorder.wrap(ai_service, "_apply_classifications", "classify.apply", lambda a, r: len(a[1]))
+    recorder.wrap(ai_service, "evaluate_service_security", "evaluate.llm_and_score")
+
+    ai_module = load_ai()
+    if hasattr(ai_module, "get_orchestrate_client"):
+        client = ai_module.get_orchestrate_client()
+        recorder.wrap(client, "get_token", "orchestrate.get_token")
+        recorder.wrap(client, "_post_completion", "orchestrate.http_post")
+    else:
+        print("⚠️ ai.AI 모듈을 불러오지 못해 가짜 Orchestrate 서버를 거치지 않습니다.")
+
+    failed_total = 0
+    with TestClient(app) as api:
+        # 1. 전체 동기화 -> 새 메일 추가 -> 증분 동기화
+        sync_request = {"search_query": SYNC_QUERY, "limit": args.messages, "include_body": args.include_body}
+        listed = lambda body: body["data"]["listed_count"]
+        call_api(recorder, "POST /api/emails/sync (full)", api, "POST", "/api/emails/sync",
+                 listed, json=dict(sync_request, full_sync=True))
+
+        gmail_fake.add_messages(args.new_messages)
+        call_api(recorder, "POST /api/emails/sync (incremental)", api, "POST", "/api/emails/sync",
+                 listed, json=sync_request)
+
+        # 2. 저장된 메일 분류 (프론트엔드와 같은 요청 단위)
+        db = SessionLocal()
+        try:
+            pending = db.query(Email.email_id, Email.subject, Email.sender) \
+                .filter(Email.classification == "UNCERTAIN") \
+                .order_by(Email.email_id.asc()) \
+                .all()
+            services = [row[0] for row in db.query(Service.service_id).order_by(Service.service_id.asc()).all()]
+        finally:
+            db.close()
+
+        email_list = [{"id": e.email_id, "subject": e.subject, "sender": e.sender} for e in pending]
+        for start in range(0, len(email_list), args.classify_batch):
+            body = call_api(recorder, "POST /api/ai/classify-emails", api, "POST", "/api/ai/classify-emails",
+                            lambda body: len(body["data"]["results"]),
+                            json={"emails": email_list[start:start + args.classify_batch]})
+            if body:
+                failed_total += len(body["data"]["failed_ids"])
+
+        # 3. 약관 평가 (캐시를 거치지 않도록 매번 다른 약관)
+        for i in range(args.evaluations):
+            service_id = services[i % len(services)]
+            body = call_api(recorder, "POST /api/admin/services/{id}/evaluate", api, "POST",
+                            f"/api/admin/services/{service_id}/evaluate",
+                            data={"type": "TEXT", "content": synthetic_policy(args.policy_chars, i), "force": "true"})
+            if body and body["data"]["new_risk_level"] == "Unrated":
+                recorder.errors["POST /api/admin/services/{id}/evaluate"] += 1
+
+        # 4. 조회 API
+        for _ in range(args.runs):
+            for sort in ("latest", "risk_desc"):
+                call_api(recorder, f"GET /api/users/me/services?sort={sort}", api, "GET", "/api/users/me/services",
+                         lambda body: len(body["data"]["services"]), params={"sort": sort, "limit": 100})
+            call_api(recorder, "GET /api/users/me/risk-summary", api, "GET", "/api/users/me/risk-summary")
+
+            cursor = None
+            for _ in range(args.email_pages):
+                params = {"limit": 50}
+                if cursor:
+                    params["cursor"] = cursor
+                body = call_api(recorder, "GET /api/emails (keyset page)", api, "GET", "/api/emails",
+                                lambda body: len(body["data"]["emails"]), params=params)
+                cursor = body["data"]["next_cursor"] if body else None
+                if not cursor:
+                    break
+
+    db = SessionLocal()
+    try:
+        cache_stats = classification_cache_service.stats(db)
+    finally:
+        db.close()
+
+    return {
+        "classification_failed_ids": failed_total,
+        "classification_cache": cache_stats,
+    }
+
+
+def print_report(results):
+    header = f"{'name':<44} {'calls':>6} {'err':>4} {'items':>7} {'items/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        rate = f"{r['items_per_sec']:.1f}" if r["items_per_sec"] else "-"
+        print(f"{name:<44} {r['calls']:>6} {r['errors']:>4} {r['items']:>7} {rate:>9} "
+              f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+
+
+def compare_with_baseline(results, baseline_path, max_regression, min_ms):
+    """기준 결과보다 p95가 max_regression 비율 이상 느려진 항목 목록을 반환합니다."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base or base["p95_ms"] < min_ms:
+            continue
+        limit = base["p95_ms"] * (1 + max_regression)
+        if current["p95_ms"] > limit:
+            regressions.append((name, base["p95_ms"], current["p95_ms"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1000, help="가짜 메일함의 메일 수 (전체 동기화 대상)")
+    parser.add_argument("--new-messages", type=int, default=100, help="증분 동기화 전에 추가할 메일 수")
+    parser.add_argument("--gmail-latency-ms", type=float, default=10.0)
+    parser.add_argument("--gmail-jitter-ms", type=float, default=5.0)
+    parser.add_argument("--gmail-failure-rate", type=float, default=0.0, help="배치 내 messages.get 429 비율")
+    parser.add_argument("--gmail-batch-size", type=int, default=50)
+    parser.add_argument("--include-body", action="store_true", help="본문 포함 동기화 (기본은 metadata 형식)")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=100.0)
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0, help="chat/completions 503 비율")
+    parser.add_argument("--llm-concurrency", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=20)
+    parser.add_argument("--no-rules", action="store_true", help="규칙 기반 사전 분류 끄기")
+    parser.add_argument("--classify-batch", type=int, default=200, help="classify-emails 요청 하나에 넣을 메일 수")
+    parser.add_argument("--evaluations", type=int, default=5)
+    parser.add_argument("--policy-chars", type=int, default=6000, help="12000자를 넘으면 섹션별 평가")
+    parser.add_argument("--checklist-size", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=30, help="조회 API 반복 횟수")
+    parser.add_argument("--email-pages", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과를 JSON으로 저장할 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    parser.add_argument("--min-ms", type=float, default=5.0, help="기준 p95가 이보다 짧은 항목은 비교하지 않음")
+    parser.add_argument("--keep-workdir", action="store_true")
+    args = parser.parse_args()
+
+    gmail_fake = FakeGmailServer(
+        n_messages=args.messages, latency_ms=args.gmail_latency_ms, jitter_ms=args.gmail_jitter_ms,
+        failure_rate=args.gmail_failure_rate, seed=args.seed
+    ).start()
+    orchestrate_fake = FakeOrchestrateServer(
+        checklist_size=args.checklist_size, latency_ms=args.llm_latency_ms, jitter_ms=args.llm_jitter_ms,
+        failure_rate=args.llm_failure_rate, seed=args.seed
+    ).start()
+    workdir = tempfile.mkdtemp(prefix="mai1-bench-")
+
+    recorder = Recorder()
+    started = time.perf_counter()
+    try:
+        configure_environment(args, workdir, gmail_fake, orchestrate_fake)
+        extra = run(args, recorder, gmail_fake)
+    finally:
+        gmail_fake.stop()
+        orchestrate_fake.stop()
+        if not args.keep_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    results = recorder.summary()
+    print()
+    print_report(results)
+    print(f"\n총 소요 시간          : {time.perf_counter() - started:.1f}s")
+    print(f"가짜 Gmail           : {gmail_fake.stats()}")
+    print(f"가짜 Orchestrate     : {orchestrate_fake.stats()}")
+    print(f"분류 실패 ID         : {extra['classification_failed_ids']}")
+    print(f"분류 캐시            : {extra['classification_cache']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "config": vars(args),
+                "results": results,
+                "fakes": {"gmail": gmail_fake.stats(), "orchestrate": orchestrate_fake.stats()},
+                "extra": extra,
+            }, f, ensure_ascii=False, indent=2, default=str)
+        print(f"결과 저장: {args.output}")
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.max_regression, args.min_ms)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: p95 {before:.2f}ms -> {after:.2f}ms")
+        if regressions:
+            sys.exit(1)
+        print(f"기준 대비 p95 회귀 없음 (허용 {args.max_regression:.0%})")
+
+
+if __name__ == "__main__":
+    main()
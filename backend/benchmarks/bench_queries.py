@@ -0,0 +1,250 @@
+"""
+엔드포인트 조회 쿼리의 실행 계획/지연 시간 벤치마크.
+
+실제 규모(수백만 건의 메일)로 데이터를 채운 뒤, 각 API가 실행하는 쿼리를 그대로 돌려
+실행 계획(EXPLAIN)에서 풀 스캔/임시 정렬이 없는지 확인하고 p50/p95 지연 시간을 출력합니다.
+스키마는 모델 정의(= 마이그레이션과 같은 인덱스)로 만들며, 이미 데이터가 있으면 다시 채우지 않습니다.
+
+    cd backend
+    python benchmarks/bench_queries.py --db-url sqlite:///bench.db --emails 1000000 --users 2000
+    python benchmarks/bench_queries.py --db-url sqlite:///bench.db --drop-indexes   # 인덱스 없을 때와 비교
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+# 벤치마크는 자체 엔진을 쓰므로 secret_db.json 없이도 app을 import할 수 있게 SQLite 설정을 기본값으로 둡니다.
+os.environ.setdefault("DB_BACKEND", "sqlite")
+
+from sqlalchemy import create_engine, text
+
+from app.core.database import Base
+from app.models import user, service, email, user_service, sync_state, classification_cache, policy_evaluation, risk_summary
+from app.services.risk_summary_service import risk_rank
+
+SEED_BATCH = 10000
+PAGE_SIZE = 20
+RISK_LEVELS = [None, "A", "B", "C", "D", "E", "Unrated"]
+
+# 0003, 0004 마이그레이션에서 추가한 인덱스 (--drop-indexes 비교용)
+QUERY_INDEXES = {
+    "ix_emails_received": "emails",
+    "ix_emails_user_received": "emails",
+    "ix_emails_class_received": "emails",
+    "ix_user_services_user_subscribed": "user_services",
+    "ix_services_risk_level": "services",
+    "ix_services_risk_rank": "services",
+}
+
+EMAIL_COLUMNS = "email_id, user_id, sender, subject, received_at, classification"
+
+# (이름, 해당 엔드포인트, SQL) - 파라미터는 실행할 때마다 무작위로 채웁니다.
+QUERIES = [
+    ("emails_first_page", "GET /api/emails",
+     f"SELECT {EMAIL_COLUMNS} FROM emails WHERE received_at IS NOT NULL ORDER BY received_at DESC, email_id DESC LIMIT {PAGE_SIZE + 1}"),
+    ("emails_deep_page", "GET /api/emails?cursor=",
+     f"SELECT {EMAIL_COLUMNS} FROM emails "
+     "WHERE received_at IS NOT NULL AND received_at <= :received_at AND (received_at < :received_at OR email_id < :email_id) "
+     f"ORDER BY received_at DESC, email_id DESC LIMIT {PAGE_SIZE + 1}"),
+    ("emails_by_user", "GET /api/emails?user_id=",
+     f"SELECT {EMAIL_COLUMNS} FROM emails WHERE user_id = :user_id AND received_at IS NOT NULL "
+     f"ORDER BY received_at DESC, email_id DESC LIMIT {PAGE_SIZE + 1}"),
+    ("emails_by_classification", "GET /api/emails?classification=REGISTER",
+     f"SELECT {EMAIL_COLUMNS} FROM emails WHERE classification = 'REGISTER' AND received_at IS NOT NULL "
+     f"ORDER BY received_at DESC, email_id DESC LIMIT {PAGE_SIZE + 1}"),
+    ("emails_count_by_user", "GET /api/emails?include_total=true",
+     "SELECT COUNT(*) FROM emails WHERE user_id = :user_id"),
+    ("sync_dedup", "POST /api/emails/sync (message_id IN)",
+     "SELECT message_id FROM emails WHERE message_id IN ({message_ids})"),
+    ("my_services_latest", "GET /api/users/me/services",
+     "SELECT us.id, us.subscription_date, s.service_name, s.risk_level FROM user_services us "
+     "JOIN services s ON s.service_id = us.service_id WHERE us.user_id = :user_id "
+     "ORDER BY us.subscription_date DESC, us.id DESC"),
+    ("my_services_risk", "GET /api/users/me/services?sort=risk_desc",
+     "SELECT us.id, us.subscription_date, s.service_name, s.risk_level FROM user_services us "
+     "JOIN services s ON s.service_id = us.service_id WHERE us.user_id = :user_id "
+     "ORDER BY s.risk_rank DESC, us.id DESC"),
+    ("my_risk_summary", "GET /api/users/me/risk-summary",
+     "SELECT * FROM user_risk_summaries WHERE user_id = :user_id"),
+    ("admin_pending_services", "GET /api/admin/services?status=PENDING",
+     "SELECT service_id, service_name, domain FROM services WHERE risk_level IS NULL ORDER BY service_id ASC"),
+    ("admin_users_page", "GET /api/admin/users?cursor=",
+     f"SELECT user_id, email, nickname FROM users WHERE user_id < :user_id ORDER BY user_id DESC LIMIT {PAGE_SIZE + 1}"),
+]
+
+
+def seed(engine, n_users, n_services, n_emails, links_per_user):
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT COUNT(*) FROM emails")).scalar():
+            print("기존 데이터 사용 (다시 채우려면 DB 파일을 지우세요)")
+            return
+
+    rng = random.Random(42)
+    started = time.perf_counter()
+    now = datetime(2026, 1, 1)
+
+    with engine.begin() as conn:
+        conn.execute(user.User.__table__.insert(), [
+            {"user_id": i, "email": f"user{i}@example.com", "nickname": f"user{i}"}
+            for i in range(1, n_users + 1)
+        ])
+        grades = [rng.choice(RISK_LEVELS) for _ in range(n_services)]
+        conn.execute(service.Service.__table__.insert(), [
+            {"service_id": i, "service_name": f"Service {i}", "domain": f"service{i}.com",
+             "risk_level": grade, "risk_rank": risk_rank(grade)}
+            for i, grade in enumerate(grades, start=1)
+        ])
+
+    email_table = email.Email.__table__
+    for offset in range(0, n_emails, SEED_BATCH):
+        rows = []
+        for email_id in range(offset + 1, min(offset + SEED_BATCH, n_emails) + 1):
+            service_id = rng.randint(1, n_services)
+            rows.append({
+                "email_id": email_id,
+                "user_id": rng.randint(1, n_users),
+                "provider": "GMAIL",
+                "message_id": f"msg-{email_id:012x}",
+                "sender": f"no-reply@service{service_id}.com",
+                "subject": f"Service {service_id} 알림 #{email_id}",
+                "snippet": "",
+                "received_at": now - timedelta(seconds=rng.randint(0, 3 * 365 * 86400)),
+                "classification": "REGISTER" if rng.random() < 0.05 else "OTHER",
+            })
+        with engine.begin() as conn:
+            conn.execute(email_table.insert(), rows)
+        print(f"\r  emails {min(offset + SEED_BATCH, n_emails):,}/{n_emails:,}", end="", flush=True)
+    print()
+
+    links = []
+    for user_id in range(1, n_users + 1):
+        for service_id in rng.sample(range(1, n_services + 1), min(links_per_user, n_services)):
+            links.append({
+                "user_id": user_id, "service_id": service_id, "status": "Active",
+                "subscription_date": (now - timedelta(days=rng.randint(0, 3 * 365))).date(),
+            })
+    with engine.begin() as conn:
+        conn.execute(user_service.UserService.__table__.insert(), links)
+
+    print(f"seed 완료: {time.perf_counter() - started:.1f}s")
+
+
+def drop_query_indexes(engine):
+    with engine.begin() as conn:
+        for name, table in QUERY_INDEXES.items():
+            if engine.dialect.name == "mysql":
+                conn.execute(text(f"DROP INDEX {name} ON {table}"))
+            else:
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+def random_params(conn, rng, n_users, n_emails):
+    email_id = rng.randint(1, n_emails)
+    received_at = conn.execute(
+        text("SELECT received_at FROM emails WHERE email_id = :email_id"), {"email_id": email_id}
+    ).scalar()
+    return {
+        "user_id": rng.randint(1, n_users),
+        "email_id": email_id,
+        "received_at": received_at,
+    }
+
+
+def render(sql, rng, n_emails):
+    if "{message_ids}" not in sql:
+        return sql
+    ids = ", ".join(f"'msg-{rng.randint(1, n_emails):012x}'" for _ in range(50))
+    return sql.format(message_ids=ids)
+
+
+def explain(conn, sql, params):
+    """(실행 계획 문자열 목록, 경고 목록)을 반환합니다."""
+    dialect = conn.dialect.name
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    rows = conn.execute(text(prefix + sql), params).fetchall()
+
+    plan, warnings = [], []
+    for row in rows:
+        if dialect == "sqlite":
+            detail = row[-1]
+            plan.append(detail)
+            if detail.startswith("SCAN ") and "INDEX" not in detail:
+                warnings.append(f"full scan: {detail}")
+            if "TEMP B-TREE" in detail:
+                warnings.append(f"sort without index: {detail}")
+        elif dialect == "mysql":
+            info = dict(row._mapping)
+            plan.append(f"{info.get('table')}: type={info.get('type')} key={info.get('key')} extra={info.get('Extra')}")
+            if info.get("type") == "ALL":
+                warnings.append(f"full scan: {info.get('table')}")
+            if "filesort" in (info.get("Extra") or ""):
+                warnings.append(f"filesort: {info.get('table')}")
+        else:
+            detail = row[0]
+            plan.append(detail)
+            if "Seq Scan" in detail:
+                warnings.append(f"full scan: {detail.strip()}")
+    return plan, warnings
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-url", default="sqlite:///bench.db")
+    parser.add_argument("--emails", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--services", type=int, default=5000)
+    parser.add_argument("--links-per-user", type=int, default=40)
+    parser.add_argument("--runs", type=int, default=50, help="쿼리별 실행 횟수")
+    parser.add_argument("--drop-indexes", action="store_true", help="조회용 복합 인덱스를 지우고 측정")
+    args = parser.parse_args()
+
+    engine = create_engine(args.db_url)
+    Base.metadata.create_all(bind=engine)
+    seed(engine, args.users, args.services, args.emails, args.links_per_user)
+
+    if args.drop_indexes:
+        drop_query_indexes(engine)
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            conn.execute(text("ANALYZE"))
+
+    rng = random.Random(7)
+    total_warnings = 0
+    with engine.connect() as conn:
+        for name, endpoint, sql in QUERIES:
+            params = random_params(conn, rng, args.users, args.emails)
+            plan, warnings = explain(conn, render(sql, rng, args.emails), params)
+
+            samples = []
+            for _ in range(args.runs):
+                params = random_params(conn, rng, args.users, args.emails)
+                statement = text(render(sql, rng, args.emails))
+                started = time.perf_counter()
+                conn.execute(statement, params).fetchall()
+                samples.append((time.perf_counter() - started) * 1000)
+
+            total_warnings += len(warnings)
+            status = "WARN" if warnings else "OK"
+            print(f"[{status}] {name:<26} {endpoint}")
+            print(f"       p50 {statistics.median(samples):8.2f} ms   p95 {percentile(samples, 95):8.2f} ms")
+            for line in plan:
+                print(f"       | {line}")
+            for warning in warnings:
+                print(f"       ! {warning}")
+
+    print(f"\n경고 {total_warnings}건")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+규칙 기반 사전 분류기 벤치마크.
+
+라벨링된 샘플(data/labelled_emails.jsonl)을 RuleClassifier에 통과시켜
+로컬에서 확정된 비율, 로컬 판정의 정확도, 줄어든 classifier() 호출 수를 출력합니다.
+
+    cd backend
+    python benchmarks/bench_rule_classifier.py --known-domains netflix.com,coupang.co.kr,github.com
+"""
+import argparse
+import json
+import math
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.services.rule_classifier import rule_classifier
+
+DEFAULT_SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "labelled_emails.jsonl")
+DEFAULT_KNOWN_DOMAINS = "netflix.com,coupang.co.kr,github.com,spotify.com,toss.im,musinsa.com,amazon.com"
+
+
+def load_samples(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sample", default=DEFAULT_SAMPLE)
+    parser.add_argument("--known-domains", default=DEFAULT_KNOWN_DOMAINS)
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--chunk-size", type=int, default=20, help="AI_CLASSIFY_CHUNK_SIZE와 같은 값")
+    args = parser.parse_args()
+
+    samples = load_samples(args.sample)
+    known_domains = {d.strip().lower() for d in args.known_domains.split(",") if d.strip()}
+    labels = {s["id"]: s["label"] for s in samples}
+
+    decisions, remaining = rule_classifier.classify(samples, known_domains, args.threshold)
+
+    correct = sum(1 for email_id, c in decisions.items() if labels[email_id] == c)
+    calls_before = math.ceil(len(samples) / args.chunk_size)
+    calls_after = math.ceil(len(remaining) / args.chunk_size)
+
+    print(f"samples            : {len(samples)}")
+    print(f"decided locally    : {len(decisions)} ({len(decisions) / len(samples):.1%})")
+    print(f"local accuracy     : {correct}/{len(decisions)}" + (f" ({correct / len(decisions):.1%})" if decisions else ""))
+    print(f"sent to LLM        : {len(remaining)}")
+    print(f"classifier() calls : {calls_before} -> {calls_after} (chunk size {args.chunk_size})")
+
+    wrong = [(email_id, c) for email_id, c in decisions.items() if labels[email_id] != c]
+    for email_id, c in wrong:
+        sample = next(s for s in samples if s["id"] == email_id)
+        print(f"  mismatch #{email_id}: rule={c} label={sample['label']} subject={sample['subject']!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+"""
+오프라인 벤치마크용 가짜 외부 서버 (표준 라이브러리 http.server만 사용).
+
+- FakeGmailServer: Gmail API v1 중 동기화에 쓰는 부분
+  (users.getProfile, messages.list, messages.get, history.list, /batch/gmail/v1 배치 요청)
+- FakeOrchestrateServer: IBM IAM 토큰 발급과 Watson Orchestrate chat/completions
+  (메일 분류 에이전트 / 개인정보 처리방침 평가 에이전트 응답을 흉내 냄)
+
+두 서버 모두 요청마다 지연(latency_ms ± jitter)과 실패율(failure_rate)을 줄 수 있고,
+요청 수/주입한 실패 수를 stats()로 확인할 수 있습니다.
+"""
+import base64
+import json
+import random
+import re
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from email.utils import format_datetime
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+SENDER_DOMAINS = [
+    "netflix.com", "coupang.co.kr", "github.com", "spotify.com", "toss.im",
+    "musinsa.com", "amazon.com", "notion.so", "slack.com", "figma.com",
+    "newsletter-hub.io", "shop-mailer.net", "promo-deals.kr", "weekly-digest.com",
+]
+SUBJECTS = [
+    "{name} 회원가입을 환영합니다", "Welcome to {name}!", "Verify your email for {name}",
+    "{name} 본인확인 인증번호", "[광고] {name} 이번 주 할인 쿠폰", "{name} 주문이 배송되었습니다",
+    "Your {name} receipt", "{name} weekly digest", "{name} 계정 보안 알림", "{name} 새로운 기능 소개",
+]
+SIGNUP_PATTERN = re.compile(r"가입|환영|인증|본인확인|welcome|verify", re.IGNORECASE)
+
+
+class _FakeServer:
+    """지연/실패 주입과 요청 통계를 공유하는 ThreadingHTTPServer 래퍼"""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, failure_rate=0.0, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._stats = {"requests": 0, "injected_failures": 0}
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def stats(self):
+        return dict(self._stats)
+
+    def _count(self, key, amount=1):
+        with self._rng_lock:
+            self._stats[key] = self._stats.get(key, 0) + amount
+
+    def _random(self):
+        with self._rng_lock:
+            return self._rng.random()
+
+    def _delay(self):
+        if self.latency_ms <= 0 and self.jitter_ms <= 0:
+            return
+        with self._rng_lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        time.sleep(max(0.0, self.latency_ms + jitter) / 1000)
+
+    def _should_fail(self):
+        if self.failure_rate > 0 and self._random() < self.failure_rate:
+            self._count("injected_failures")
+            return True
+        return False
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _read_body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+            def _send(self, status, body, content_type="application/json", headers=None):
+                if isinstance(body, (dict, list)):
+                    body = json.dumps(body, ensure_ascii=False)
+                if isinstance(body, str):
+                    body = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+                return len(body)
+
+            def _dispatch(self, method):
+                fake._count("requests")
+                fake._delay()
+                body = self._read_body() if method == "POST" else b""
+                status, payload, content_type, headers = fake.handle(method, self.path, self.headers, body)
+                fake._count("response_bytes", self._send(status, payload, content_type, headers))
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+        return Handler
+
+    def handle(self, method, path, headers, body):
+        raise NotImplementedError
+
+
+class FakeGmailServer(_FakeServer):
+    """
+    메시지 n_messages개가 들어 있는 가짜 메일함. 최신 메시지부터 목록을 반환하고,
+    add_messages()로 새 메일을 넣으면 history.list에 messagesAdded로 나타납니다.
+    failure_rate는 배치 안의 개별 messages.get 응답(429)에만 적용됩니다.
+    """
+
+    def __init__(self, n_messages=1000, **kwargs):
+        super().__init__(**kwargs)
+        self._messages = []
+        self._messages_lock = threading.Lock()
+        self._base_time = datetime(2026, 1, 1)
+        self.add_messages(n_messages)
+
+    def add_messages(self, count):
+        with self._messages_lock:
+            for _ in range(count):
+                index = len(self._messages) + 1
+                domain = SENDER_DOMAINS[index % len(SENDER_DOMAINS)]
+                name = domain.split(".")[0].capitalize()
+                subject = SUBJECTS[(index * 7) % len(SUBJECTS)].format(name=name)
+                received_at = self._base_time + timedelta(minutes=index)
+                self._messages.append({
+                    "id": f"{index:016x}",
+                    "historyId": str(index),
+                    "sender": f"{name} <no-reply@mail.{domain}>",
+                    "subject": subject,
+                    "date": format_datetime(received_at),
+                    "internal_date": str(int(received_at.timestamp() * 1000)),
+                    "snippet": f"{subject} - 본문 미리보기",
+                    "body": f"{subject}\n\n" + "본문 내용입니다. " * 40,
+                })
+
+    def _message_resource(self, message, fmt, metadata_headers=None):
+        # 실제 메일처럼 Received/DKIM 등 부가 헤더가 많이 붙어 있다고 가정합니다.
+        headers = [
+            {"name": "Subject", "value": message["subject"]},
+            {"name": "From", "value": message["sender"]},
+            {"name": "Date", "value": message["date"]},
+        ] + [{"name": f"X-Header-{i}", "value": "x" * 40} for i in range(20)]
+        resource = {
+            "id": message["id"],
+            "threadId": message["id"],
+            "historyId": message["historyId"],
+            "internalDate": message["internal_date"],
+            "snippet": message["snippet"],
+            "sizeEstimate": len(message["body"]),
+            "payload": {"mimeType": "text/plain", "headers": headers},
+        }
+        if fmt == "minimal":
+            # format=minimal에는 payload가 없습니다.
+            del resource["payload"]
+        elif fmt == "metadata":
+            # metadataHeaders를 지정하면 그 헤더만 돌려줍니다.
+            if metadata_headers:
+                wanted = {name.lower() for name in metadata_headers}
+                resource["payload"]["headers"] = [h for h in headers if h["name"].lower() in wanted]
+        else:
+            # format=full에는 본문이 포함됩니다.
+            resource["payload"]["body"] = {
+                "size": len(message["body"]),
+                "data": base64.urlsafe_b64encode(message["body"].encode("utf-8")).decode("ascii"),
+            }
+        return resource
+
+    def _get_message(self, message_id, fmt, metadata_headers=None):
+        with self._messages_lock:
+            index = int(message_id, 16) - 1 if re.fullmatch(r"[0-9a-f]{16}", message_id) else -1
+            message = self._messages[index] if 0 <= index < len(self._messages) else None
+        if message is None:
+            return 404, {"error": {"code": 404, "message": "Requested entity was not found."}}
+        return 200, self._message_resource(message, fmt, metadata_headers)
+
+    def _route(self, method, path):
+        parsed = urlparse(path)
+        params = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        route = parsed.path
+
+        with self._messages_lock:
+            total = len(self._messages)
+
+        if route.endswith("/users/me/profile"):
+            return 200, {"emailAddress": "bench@example.com", "messagesTotal": total, "historyId": str(total)}
+
+        if route.endswith("/users/me/messages"):
+            offset = int(params.get("pageToken") or 0)
+            page_size = int(params.get("maxResults") or 100)
+            with self._messages_lock:
+                newest_first = self._messages[::-1][offset:offset + page_size]
+            page = {"messages": [{"id": m["id"], "threadId": m["id"]} for m in newest_first],
+                    "resultSizeEstimate": total}
+            if offset + page_size < total:
+                page["nextPageToken"] = str(offset + page_size)
+            return 200, page
+
+        match = re.search(r"/users/me/messages/([^/]+)$", route)
+        if match:
+            return self._get_message(
+                match.group(1), params.get("format", "full"), parse_qs(parsed.query).get("metadataHeaders")
+            )
+
+        if route.endswith("/users/me/history"):
+            start = int(params.get("startHistoryId") or 0)
+            with self._messages_lock:
+                added = self._messages[start:]
+            return 200, {
+                "history": [{"id": m["historyId"], "messagesAdded": [{"message": {"id": m["id"]}}]} for m in added],
+                "historyId": str(total),
+            }
+
+        return 404, {"error": {"code": 404, "message": f"Unknown route {route}"}}
+
+    def _handle_batch(self, headers, body):
+        parsed = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {headers.get('Content-Type')}\r\n\r\n".encode("utf-8") + body
+        )
+        boundary = f"batch_{random.getrandbits(64):x}"
+        parts = []
+        for part in parsed.iter_parts():
+            content_id = part.get("Content-ID", "<x+0>").strip("<>")
+            request_line = part.get_payload().lstrip().splitlines()[0]
+            method, path = request_line.split(" ")[:2]
+
+            if self._should_fail():
+                status, payload = 429, {"error": {"code": 429, "message": "Too many concurrent requests for user"}}
+            else:
+                status, payload = self._route(method, path)
+
+            reason = {200: "OK", 404: "Not Found", 429: "Too Many Requests"}.get(status, "Error")
+            inner = json.dumps(payload, ensure_ascii=False)
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json; charset=UTF-8\r\n\r\n{inner}\r\n"
+            )
+        parts.append(f"--{boundary}--\r\n")
+        return 200, "".join(parts), f"multipart/mixed; boundary={boundary}", None
+
+    def handle(self, method, path, headers, body):
+        if urlparse(path).path.startswith("/batch/"):
+            self._count("batch_requests")
+            return self._handle_batch(headers, body)
+        status, payload = self._route(method, path)
+        return status, payload, "application/json", None
+
+
+class FakeOrchestrateServer(_FakeServer):
+    """
+    IAM 토큰(/identity/token)과 chat/completions를 흉내 냅니다.
+    - 메일 분류 요청({"emails": [...]}): 제목 키워드로 signup Y/N 판정
+    - 그 외(약관 텍스트): checklist_size개 항목의 PASS/FAIL/N/A 결과 JSON
+    failure_rate는 chat/completions에만 적용되며 503과 Retry-After를 반환합니다.
+    요청 본문의 "stream"이 true면 같은 응답을 SSE delta 조각으로 나눠 보냅니다.
+    """
+
+    def __init__(self, checklist_size=10, token_ttl=3600, **kwargs):
+        super().__init__(**kwargs)
+        self.checklist_size = checklist_size
+        self.token_ttl = token_ttl
+
+    def _classify(self, request):
+        results = []
+        for email in request.get("emails", []):
+            results.append({
+                "id": email.get("id"),
+                "sender": email.get("sender"),
+                "signup": "Y" if SIGNUP_PATTERN.search(email.get("subject") or "") else "N",
+            })
+        return {"results": results}
+
+    def _evaluate(self, text):
+        rng = random.Random(len(text))
+        return {
+            str(i): {
+                "result": rng.choice(["PASS", "PASS", "FAIL", "N/A"]),
+                "evidence": text[:40],
+                "reason": "벤치마크용 가짜 판정",
+            }
+            for i in range(1, self.checklist_size + 1)
+        }
+
+    def _sse(self, text, pieces=4):
+        """응답 텍스트를 delta 조각으로 나눈 SSE 본문 (data: {...} 줄, 마지막은 data: [DONE])"""
+        size = max(1, -(-len(text) // pieces))
+        lines = [
+            "data: " + json.dumps({"choices": [{"delta": {"content": text[i:i + size]}}]}, ensure_ascii=False)
+            for i in range(0, len(text), size)
+        ]
+        return "\n\n".join(lines + ["data: [DONE]"]) + "\n\n"
+
+    def handle(self, method, path, headers, body):
+        route = urlparse(path).path
+        if route.endswith("/identity/token"):
+            self._count("token_requests")
+            return 200, {"access_token": f"fake-token-{time.time()}", "expires_in": self.token_ttl}, \
+                "application/json", None
+
+        if route.endswith("/chat/completions"):
+            self._count("completions")
+            if self._should_fail():
+                return 503, {"error": "service unavailable"}, "application/json", {"Retry-After": "1"}
+
+            content = json.loads(body or b"{}").get("messages", [{}])[-1].get("content", "")
+            try:
+                request = json.loads(content)
+            except (TypeError, ValueError):
+                request = None
+
+            if isinstance(request, dict) and "emails" in request:
+                answer = self._classify(request)
+            else:
+                answer = self._evaluate(content)
+
+            if json.loads(body or b"{}").get("stream"):
+                self._count("streamed_completions")
+                return 200, self._sse(json.dumps(answer, ensure_ascii=False)), "text/event-stream", None
+            return 200, {"choices": [{"message": {"role": "assistant", "content": json.dumps(answer, ensure_ascii=False)}}]}, \
+                "application/json", None
+
+        return 404, {"error": f"Unknown route {route}"}, "application/json", None
@@ -0,0 +1,72 @@
+"""baseline schema (기존 create_all로 만들던 테이블)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("user_id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("nickname", sa.String(50)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_users_user_id", "users", ["user_id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "services",
+        sa.Column("service_id", sa.Integer(), primary_key=True),
+        sa.Column("service_name", sa.String(100), nullable=False),
+        sa.Column("domain", sa.String(255)),
+        sa.Column("risk_level", sa.String(10), nullable=True),
+        sa.Column("security_score", sa.Float(), nullable=True),
+        sa.Column("security_report", sa.Text(), nullable=True),
+        sa.Column("evaluated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_services_service_id", "services", ["service_id"])
+    op.create_index("ix_services_domain", "services", ["domain"])
+
+    op.create_table(
+        "emails",
+        sa.Column("email_id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.user_id"), nullable=False),
+        sa.Column("provider", sa.String(20)),
+        sa.Column("message_id", sa.String(255)),
+        sa.Column("sender", sa.String(255)),
+        sa.Column("subject", sa.String(255)),
+        sa.Column("snippet", sa.Text()),
+        sa.Column("received_at", sa.DateTime()),
+        sa.Column("classification", sa.String(50)),
+    )
+    op.create_index("ix_emails_email_id", "emails", ["email_id"])
+    op.create_index("ix_emails_message_id", "emails", ["message_id"], unique=True)
+
+    op.create_table(
+        "user_services",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.user_id"), nullable=False),
+        sa.Column("service_id", sa.Integer(), sa.ForeignKey("services.service_id"), nullable=False),
+        sa.Column("email_id", sa.Integer(), sa.ForeignKey("emails.email_id"), nullable=True),
+        sa.Column("subscription_date", sa.Date(), nullable=True),
+        sa.Column("status", sa.String(20)),
+    )
+    op.create_index("ix_user_services_id", "user_services", ["id"])
+
+
+def downgrade():
+    op.drop_table("user_services")
+    op.drop_table("emails")
+    op.drop_table("services")
+    op.drop_table("users")
@@ -0,0 +1,75 @@
+"""Gmail 동기화 커서, 분류/평가 캐시 테이블, 분류 출처, user_services 중복 방지
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("emails", sa.Column("classification_source", sa.String(10), nullable=True))
+
+    op.create_table(
+        "gmail_sync_states",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.user_id"), nullable=False),
+        sa.Column("query_hash", sa.String(64), nullable=False),
+        sa.Column("history_id", sa.String(32), nullable=True),
+        sa.Column("last_synced_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("user_id", "query_hash", name="uq_gmail_sync_user_query"),
+    )
+    op.create_index("ix_gmail_sync_states_id", "gmail_sync_states", ["id"])
+
+    op.create_table(
+        "classification_cache",
+        sa.Column("fingerprint", sa.String(64), primary_key=True),
+        sa.Column("sender_domain", sa.String(255)),
+        sa.Column("subject_template", sa.String(255)),
+        sa.Column("classification", sa.String(50), nullable=False),
+        sa.Column("hit_count", sa.Integer()),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("last_hit_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_classification_cache_last_hit_at", "classification_cache", ["last_hit_at"])
+
+    op.create_table(
+        "policy_evaluation_cache",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("content_hash", sa.String(64), nullable=False),
+        sa.Column("checklist_version", sa.String(64), nullable=False),
+        sa.Column("risk_level", sa.String(10), nullable=False),
+        sa.Column("security_score", sa.Float(), nullable=False),
+        sa.Column("security_report", sa.Text(), nullable=True),
+        sa.Column("evidence", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("content_hash", "checklist_version", name="uq_policy_eval_hash_version"),
+    )
+    op.create_index("ix_policy_evaluation_cache_id", "policy_evaluation_cache", ["id"])
+
+    # 중복 (user_id, service_id) 링크는 가장 먼저 만든 것만 남기고 UNIQUE 제약을 겁니다.
+    op.execute(
+        "DELETE FROM user_services WHERE id NOT IN ("
+        "SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM user_services GROUP BY user_id, service_id) AS keep)"
+    )
+    with op.batch_alter_table("user_services") as batch_op:
+        batch_op.create_unique_constraint("uq_user_service", ["user_id", "service_id"])
+
+
+def downgrade():
+    with op.batch_alter_table("user_services") as batch_op:
+        batch_op.drop_constraint("uq_user_service", type_="unique")
+
+    op.drop_table("policy_evaluation_cache")
+    op.drop_table("classification_cache")
+    op.drop_table("gmail_sync_states")
+
+    with op.batch_alter_table("emails") as batch_op:
+        batch_op.drop_column("classification_source")
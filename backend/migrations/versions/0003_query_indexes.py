@@ -0,0 +1,39 @@
+"""실제 조회 패턴에 맞춘 복합 인덱스
+
+- GET /api/emails: (received_at, email_id) 키셋, user_id / classification 필터
+- GET /api/users/me/services: user_id 필터 + subscription_date 정렬
+- GET /api/admin/services: risk_level 필터 (PENDING / COMPLETED)
+- 분류 캐시 TTL 정리: created_at
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_emails_received", "emails", ["received_at", "email_id"])
+    op.create_index("ix_emails_user_received", "emails", ["user_id", "received_at", "email_id"])
+    op.create_index("ix_emails_class_received", "emails", ["classification", "received_at", "email_id"])
+
+    op.create_index("ix_user_services_user_subscribed", "user_services", ["user_id", "subscription_date"])
+
+    op.create_index("ix_services_risk_level", "services", ["risk_level"])
+
+    op.create_index("ix_classification_cache_created_at", "classification_cache", ["created_at"])
+
+
+def downgrade():
+    op.drop_index("ix_classification_cache_created_at", table_name="classification_cache")
+    op.drop_index("ix_services_risk_level", table_name="services")
+    op.drop_index("ix_user_services_user_subscribed", table_name="user_services")
+    op.drop_index("ix_emails_class_received", table_name="emails")
+    op.drop_index("ix_emails_user_received", table_name="emails")
+    op.drop_index("ix_emails_received", table_name="emails")
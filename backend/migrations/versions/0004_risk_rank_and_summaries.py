@@ -0,0 +1,66 @@
+"""services.risk_rank(숫자 등급)와 사용자별 위험도 집계 테이블
+
+기존 데이터는 services.risk_level과 user_services로 한 번 채워 넣습니다.
+이후에는 서비스 연결 추가/등급 변경 시 애플리케이션이 증감으로 갱신합니다.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# app.services.risk_summary_service.GRADES와 같은 값 (마이그레이션은 앱 코드에 의존하지 않습니다)
+RANK_CASE = (
+    "CASE UPPER(risk_level) WHEN 'A' THEN 1 WHEN 'B' THEN 2 WHEN 'C' THEN 3 "
+    "WHEN 'D' THEN 4 WHEN 'E' THEN 5 WHEN 'F' THEN 5 ELSE NULL END"
+)
+
+
+def _count_if(condition):
+    return f"SUM(CASE WHEN {condition} THEN 1 ELSE 0 END)"
+
+
+def upgrade():
+    with op.batch_alter_table("services") as batch_op:
+        batch_op.add_column(sa.Column("risk_rank", sa.Integer(), nullable=True))
+        batch_op.create_index("ix_services_risk_rank", ["risk_rank"])
+    op.execute(f"UPDATE services SET risk_rank = {RANK_CASE}")
+
+    op.create_table(
+        "user_risk_summaries",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.user_id"), primary_key=True),
+        sa.Column("service_count", sa.Integer(), nullable=False),
+        sa.Column("grade_a_count", sa.Integer(), nullable=False),
+        sa.Column("grade_b_count", sa.Integer(), nullable=False),
+        sa.Column("grade_c_count", sa.Integer(), nullable=False),
+        sa.Column("grade_d_count", sa.Integer(), nullable=False),
+        sa.Column("grade_f_count", sa.Integer(), nullable=False),
+        sa.Column("unrated_count", sa.Integer(), nullable=False),
+        sa.Column("score_sum", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+
+    op.execute(
+        "INSERT INTO user_risk_summaries (user_id, service_count, grade_a_count, grade_b_count, grade_c_count, "
+        "grade_d_count, grade_f_count, unrated_count, score_sum, updated_at) "
+        "SELECT us.user_id, COUNT(*), "
+        f"{_count_if('s.risk_rank = 1')}, {_count_if('s.risk_rank = 2')}, {_count_if('s.risk_rank = 3')}, "
+        f"{_count_if('s.risk_rank = 4')}, {_count_if('s.risk_rank = 5')}, {_count_if('s.risk_rank IS NULL')}, "
+        "SUM(CASE WHEN s.risk_rank IS NULL THEN 0 ELSE 120 - 20 * s.risk_rank END), CURRENT_TIMESTAMP "
+        "FROM user_services us JOIN services s ON s.service_id = us.service_id "
+        "GROUP BY us.user_id"
+    )
+
+
+def downgrade():
+    op.drop_table("user_risk_summaries")
+    with op.batch_alter_table("services") as batch_op:
+        batch_op.drop_index("ix_services_risk_rank")
+        batch_op.drop_column("risk_rank")
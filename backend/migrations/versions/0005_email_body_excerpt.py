@@ -0,0 +1,27 @@
+"""emails.body_excerpt: 본문 포함 동기화에서 저장하는 본문 앞부분
+
+기본 Gmail 동기화는 format='metadata'(Subject/From/Date 헤더 + snippet)로 바뀌어 본문을 받지 않습니다.
+include_body로 동기화한 메일만 GMAIL_BODY_MAX_BYTES 크기까지의 본문을 저장하고, 나머지는 NULL입니다.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("emails") as batch_op:
+        batch_op.add_column(sa.Column("body_excerpt", sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("emails") as batch_op:
+        batch_op.drop_column("body_excerpt")
@@ -0,0 +1,43 @@
+"""
+API 테스트 공통 설정. secret_db.json/MySQL 없이 임시 SQLite 파일에 마이그레이션을 적용해 실행합니다.
+
+    cd backend
+    python -m pytest -q tests
+"""
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(BACKEND_DIR))  # ai 패키지
+
+# app을 import하기 전에 설정해야 엔진이 임시 DB를 사용합니다.
+_db_dir = tempfile.mkdtemp(prefix="mai1-test-")
+os.environ["DB_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = os.path.join(_db_dir, "test.db")
+os.environ.setdefault("METRICS_ENABLED", "false")
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app.core.init_db import init_db
+    from app.main import app
+
+    init_db()
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db(client):
+    from app.core.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
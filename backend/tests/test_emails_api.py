@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+from app.models.email import Email
+from app.models.user import User
+
+
+def _seed_emails(db, dated, undated):
+    db.query(Email).delete()
+    if not db.get(User, 1):
+        db.add(User(user_id=1, email="demo@gmail.com", nickname="DemoUser"))
+    base = datetime(2026, 1, 1)
+    rows = [
+        Email(user_id=1, message_id=f"dated-{i}", sender="no-reply@example.com", subject=f"dated {i}",
+              received_at=base - timedelta(hours=i // 2), classification="OTHER")
+        for i in range(dated)
+    ]
+    rows += [
+        Email(user_id=1, message_id=f"undated-{i}", sender="no-reply@example.com", subject=f"undated {i}",
+              received_at=None, classification="OTHER")
+        for i in range(undated)
+    ]
+    db.add_all(rows)
+    db.commit()
+    return {row.email_id for row in rows}
+
+
+def test_cursor_pages_cross_null_received_at(client, db):
+    """날짜 있는 메일 뒤에 received_at이 NULL인 메일까지 중복/누락 없이 이어서 읽습니다."""
+    expected = _seed_emails(db, dated=13, undated=9)
+
+    seen = []
+    received = []
+    cursor = None
+    while True:
+        params = {"limit": 5, "include_total": "false"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/emails", params=params)
+        assert response.status_code == 200, response.text
+        data = response.json()["data"]
+        seen += [email["email_id"] for email in data["emails"]]
+        received += [email["received_at"] for email in data["emails"]]
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == len(set(seen))
+    assert set(seen) == expected
+    # 날짜 있는 메일이 모두 먼저 나오고 NULL은 맨 뒤
+    assert received[:13] == sorted(received[:13], reverse=True)
+    assert received[13:] == [None] * 9
+
+
+def test_cursor_and_skip_paths_agree(client, db):
+    _seed_emails(db, dated=4, undated=3)
+
+    by_skip = client.get("/api/emails", params={"limit": 10, "skip": 0, "include_total": "false"})
+    page_1 = client.get("/api/emails", params={"limit": 5, "include_total": "false"}).json()["data"]
+    page_2 = client.get(
+        "/api/emails", params={"limit": 5, "include_total": "false", "cursor": page_1["next_cursor"]}
+    ).json()["data"]
+
+    skip_ids = [email["email_id"] for email in by_skip.json()["data"]["emails"]]
+    cursor_ids = [email["email_id"] for email in page_1["emails"] + page_2["emails"]]
+    assert skip_ids == cursor_ids
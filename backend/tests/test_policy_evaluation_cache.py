@@ -0,0 +1,28 @@
+from app.models.policy_evaluation import PolicyEvaluationCache
+from app.services.ai_service import ai_service, privacy_checklist_version
+
+
+def test_store_evaluation_upserts_when_row_exists(db):
+    """먼저 저장한 요청이 있어도 UNIQUE 충돌 없이 최신 결과로 덮어씁니다."""
+    content_hash = "f" * 64
+    db.query(PolicyEvaluationCache).filter(PolicyEvaluationCache.content_hash == content_hash).delete()
+    db.commit()
+
+    ai_service.store_evaluation(db, content_hash, {"grade": "B", "score": 0.6, "report": "first"})
+    db.commit()
+    ai_service.store_evaluation(db, content_hash, {"grade": "A", "score": 0.9, "report": "second"})
+    db.commit()
+
+    rows = db.query(PolicyEvaluationCache).filter(
+        PolicyEvaluationCache.content_hash == content_hash,
+        PolicyEvaluationCache.checklist_version == privacy_checklist_version()
+    ).all()
+    assert [(row.risk_level, row.security_report) for row in rows] == [("A", "second")]
+    assert ai_service.get_cached_evaluation(db, content_hash)["grade"] == "A"
+
+
+def test_store_evaluation_skips_unrated(db):
+    content_hash = "e" * 64
+    ai_service.store_evaluation(db, content_hash, {"grade": "Unrated", "score": 0.0, "report": "failed"})
+    db.commit()
+    assert db.query(PolicyEvaluationCache).filter(PolicyEvaluationCache.content_hash == content_hash).count() == 0
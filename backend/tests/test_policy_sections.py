@@ -0,0 +1,28 @@
+from ai.AI import _merge_section_results
+
+
+def _section(index):
+    return {"index": index, "title": f"제{index}조"}
+
+
+def test_merge_prefers_covering_section_na_over_fail():
+    """다루지 않는 섹션의 FAIL이 그 항목을 다룬 섹션의 N/A를 덮어쓰지 않습니다."""
+    merged = _merge_section_results([
+        (_section(1), {"1": {"result": "FAIL"}, "2": {"result": "PASS"}, "3": {"result": "FAIL"}}),
+        (_section(2), {"1": {"result": "N/A"}, "2": {"result": "FAIL"}, "3": {"result": "FAIL"}}),
+        (_section(3), {"1": {"result": "FAIL"}, "2": {"result": "N/A"}, "3": {"result": "FAIL"}}),
+    ])
+
+    assert {key: value["result"] for key, value in merged.items()} == {"1": "N/A", "2": "PASS", "3": "FAIL"}
+    assert (merged["1"]["section"], merged["1"]["section_title"]) == (2, "제2조")
+    assert merged["2"]["section"] == 1
+    # 모두 FAIL이면 처음 응답한 섹션을 근거로 남깁니다.
+    assert merged["3"]["section"] == 1
+
+
+def test_merge_keeps_first_section_item_order():
+    merged = _merge_section_results([
+        (_section(1), {"2": {"result": "FAIL"}, "1": {"result": "FAIL"}}),
+        (_section(2), {"1": {"result": "PASS"}, "2": {"result": "N/A"}}),
+    ])
+    assert list(merged) == ["2", "1"]
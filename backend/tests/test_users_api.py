@@ -0,0 +1,33 @@
+import pytest
+
+from app.core.config import settings
+from app.models.risk_summary import UserRiskSummary
+from app.models.user import User
+
+
+def _seed_summary(db):
+    if not db.get(User, 1):
+        db.add(User(user_id=1, email="demo@gmail.com", nickname="DemoUser"))
+    db.query(UserRiskSummary).filter(UserRiskSummary.user_id == 1).delete()
+    db.add(UserRiskSummary(
+        user_id=1, service_count=3, grade_a_count=1, grade_b_count=1, grade_c_count=0,
+        grade_d_count=0, grade_f_count=0, unrated_count=1, score_sum=180
+    ))
+    db.commit()
+
+
+@pytest.mark.parametrize("async_enabled", [False, True])
+def test_risk_summary_sync_and_async_sessions_agree(client, db, monkeypatch, async_enabled):
+    """DB_ASYNC_ENABLED면 get_async_db(aiosqlite) 세션으로, 아니면 스레드풀의 동기 세션으로 같은 집계를 읽습니다."""
+    if async_enabled:
+        pytest.importorskip("greenlet", reason="SQLAlchemy asyncio에는 greenlet이 필요합니다. (sqlalchemy[asyncio])")
+        pytest.importorskip("aiosqlite")
+    _seed_summary(db)
+    monkeypatch.setattr(settings, "DB_ASYNC_ENABLED", async_enabled)
+
+    response = client.get("/api/users/me/risk-summary")
+
+    assert response.status_code == 200, response.text
+    data = response.json()["data"]
+    assert (data["service_count"], data["rated_count"], data["score"], data["grade"]) == (3, 2, 90, "A")
+    assert data["grade_counts"]["Unrated"] == 1